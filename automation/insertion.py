@@ -0,0 +1,113 @@
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import pyautogui
+
+PASTE = 'paste'
+TYPE = 'type'
+
+# macOS uses Command instead of Ctrl for select-all/paste
+MODIFIER = 'command' if sys.platform == 'darwin' else 'ctrl'
+
+
+class InsertionStats:
+    """Latency of each insertion, per strategy actually used."""
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.total_ms: Dict[str, float] = {}
+        self.last_ms = 0.0
+        self.last_strategy: Optional[str] = None
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def record(self, strategy: str, elapsed_ms: float):
+        with self._lock:
+            self.counts[strategy] = self.counts.get(strategy, 0) + 1
+            self.total_ms[strategy] = self.total_ms.get(strategy, 0.0) + elapsed_ms
+            self.last_ms = elapsed_ms
+            self.last_strategy = strategy
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'last_ms': self.last_ms,
+                'last_strategy': self.last_strategy,
+                'fallbacks': self.fallbacks,
+                'avg_ms': {s: self.total_ms[s] / self.counts[s] for s in self.counts},
+                'count': dict(self.counts),
+            }
+
+
+class TextInserter:
+    """Puts plate text into the focused field, by clipboard paste or by direct typing.
+
+    The paste path sets the clipboard, pastes, and restores the previous clipboard
+    contents once the target has had time to read it, even if the paste fails. Non-text
+    clipboard contents cannot be read back, so they are left replaced by the plate. If the clipboard is unavailable
+    it falls back to typing. All pyautogui calls skip pyautogui's global PAUSE
+    and use the settle times configured here instead.
+    """
+    def __init__(self, strategy: str = TYPE, click_settle: float = 0.05, select_settle: float = 0.02,
+                 paste_settle: float = 0.05, typing_interval: float = 0.0):
+        self.strategy = strategy
+        self.click_settle = click_settle
+        self.select_settle = select_settle
+        self.paste_settle = paste_settle
+        self.typing_interval = typing_interval
+        self.stats = InsertionStats()
+        # One insertion at a time so keys from two plates never interleave
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'TextInserter':
+        return cls(
+            strategy=getattr(config, 'INSERTION_STRATEGY', TYPE),
+            click_settle=getattr(config, 'INSERTION_CLICK_SETTLE', 0.05),
+            select_settle=getattr(config, 'INSERTION_SELECT_SETTLE', 0.02),
+            paste_settle=getattr(config, 'INSERTION_PASTE_SETTLE', 0.05),
+            typing_interval=getattr(config, 'INSERTION_TYPING_INTERVAL', 0.0),
+        )
+
+    def _paste(self, text: str):
+        import pyperclip
+        previous = pyperclip.paste()
+        pyperclip.copy(text)
+        try:
+            pyautogui.hotkey(MODIFIER, 'v', _pause=False)
+            # The target reads the clipboard asynchronously; restoring too early pastes the old contents
+            time.sleep(self.paste_settle)
+        finally:
+            # paste() gives '' for non-text contents such as an image; copying that back would wipe them
+            if previous:
+                try:
+                    pyperclip.copy(previous)
+                except Exception:
+                    pass
+
+    def _type(self, text: str):
+        pyautogui.typewrite(text, interval=self.typing_interval, _pause=False)
+
+    def insert(self, text: str, position: Optional[Tuple[int, int]] = None) -> float:
+        """Replace the field's contents with text; returns the insertion latency in ms."""
+        with self._lock:
+            start = time.perf_counter()
+            if position:
+                pyautogui.click(position, _pause=False)
+                time.sleep(self.click_settle)
+            # Clear existing text
+            pyautogui.hotkey(MODIFIER, 'a', _pause=False)
+            time.sleep(self.select_settle)
+            strategy = self.strategy
+            if strategy == PASTE:
+                try:
+                    self._paste(text)
+                except Exception:
+                    self.stats.fallbacks += 1
+                    strategy = TYPE
+            if strategy == TYPE:
+                self._type(text)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats.record(strategy, elapsed_ms)
+            return elapsed_ms
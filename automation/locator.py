@@ -0,0 +1,164 @@
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def _grab_gray(region: Tuple[int, int, int, int]) -> np.ndarray:
+    import pyautogui
+    return cv2.cvtColor(np.asarray(pyautogui.screenshot(region=region)), cv2.COLOR_RGB2GRAY)
+
+
+def _to_gray(image) -> np.ndarray:
+    image = np.asarray(image)
+    if image.ndim == 3:
+        code = cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+        image = cv2.cvtColor(image, code)
+    return image
+
+
+class FieldLocator:
+    """Template locator for the target text field that remembers where it was last seen.
+
+    A locate first re-checks a small neighbourhood around the last match. On a miss it
+    runs a coarse-to-fine search: template matching on a downscaled copy of the screen
+    the field was last seen on, then full-resolution verification around the best
+    coarse candidates. Other screens are only searched if that screen has no match.
+    """
+    def __init__(self, threshold: float = 0.8, neighbourhood: int = 32, pyramid_levels: int = 3,
+                 coarse_candidates: int = 3, grab: Optional[Callable[[Tuple[int, int, int, int]], np.ndarray]] = None):
+        self.threshold = threshold
+        self.neighbourhood = neighbourhood
+        self.pyramid_levels = pyramid_levels
+        self.coarse_candidates = coarse_candidates
+        self.grab = grab or _grab_gray
+        self.screens: List[Tuple[int, int, int, int]] = []
+        self.template: Optional[np.ndarray] = None
+        self.last_match: Optional[Tuple[int, int]] = None
+        self.last_screen: Optional[int] = None
+        self.last_locate_ms = 0.0
+
+    def set_screens(self, screens: List[Tuple[int, int, int, int]]):
+        """Screen geometries as (x, y, width, height) in desktop coordinates."""
+        self.screens = [tuple(int(v) for v in s) for s in screens]
+        self.last_screen = None
+
+    def set_template(self, template):
+        gray = _to_gray(template)
+        if self.template is None or gray.shape != self.template.shape or not np.array_equal(gray, self.template):
+            self.template = gray
+            self.last_match = None
+
+    def _screen_list(self) -> List[Tuple[int, int, int, int]]:
+        if self.screens:
+            return self.screens
+        import pyautogui
+        width, height = pyautogui.size()
+        return [(0, 0, int(width), int(height))]
+
+    def _match(self, image: np.ndarray, template: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+        if image.shape[0] < template.shape[0] or image.shape[1] < template.shape[1]:
+            return -1.0, (0, 0)
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+
+    def screen_at(self, x: int, y: int) -> Optional[Tuple[int, int, int, int]]:
+        """The screen containing desktop point (x, y), or None if it is on none of them."""
+        for screen in self._screen_list():
+            sx, sy, sw, sh = screen
+            if sx <= x < sx + sw and sy <= y < sy + sh:
+                return screen
+        return None
+
+    def clip_to_screen(self, region: Tuple[int, int, int, int], point: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """region cut down to the screen containing point; None if point is on no screen."""
+        screen = self.screen_at(*point)
+        if screen is None:
+            return None
+        x, y, w, h = region
+        sx, sy, sw, sh = screen
+        left, top = max(x, sx), max(y, sy)
+        right, bottom = min(x + w, sx + sw), min(y + h, sy + sh)
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right - left, bottom - top
+
+    def _check_neighbourhood(self) -> Optional[Tuple[int, int]]:
+        th, tw = self.template.shape[:2]
+        x, y = self.last_match
+        pad = self.neighbourhood
+        # Clip to the screen the field is on; desktop coordinates are negative left of or above the primary screen
+        region = self.clip_to_screen((x - pad, y - pad, tw + 2 * pad, th + 2 * pad), (x, y))
+        if region is None:
+            return None
+        image = self.grab(region)
+        score, (mx, my) = self._match(image, self.template)
+        if score >= self.threshold:
+            return region[0] + mx, region[1] + my
+        return None
+
+    def _coarse_level(self) -> int:
+        th, tw = self.template.shape[:2]
+        level = 0
+        # Stop downscaling before the template loses its structure
+        while level < self.pyramid_levels and min(th, tw) >> (level + 1) >= 8:
+            level += 1
+        return level
+
+    def _search_screen(self, screen: Tuple[int, int, int, int]) -> Optional[Tuple[int, int]]:
+        image = self.grab(screen)
+        level = self._coarse_level()
+        scale = 1 << level
+        th, tw = self.template.shape[:2]
+        if level == 0:
+            score, loc = self._match(image, self.template)
+            return (screen[0] + loc[0], screen[1] + loc[1]) if score >= self.threshold else None
+        small = cv2.resize(image, (image.shape[1] // scale, image.shape[0] // scale), interpolation=cv2.INTER_AREA)
+        small_tpl = cv2.resize(self.template, (tw // scale, th // scale), interpolation=cv2.INTER_AREA)
+        if small.shape[0] < small_tpl.shape[0] or small.shape[1] < small_tpl.shape[1]:
+            return None
+        result = cv2.matchTemplate(small, small_tpl, cv2.TM_CCOEFF_NORMED)
+        margin = 2 * scale
+        for _ in range(self.coarse_candidates):
+            _, coarse_score, _, (cx, cy) = cv2.minMaxLoc(result)
+            if coarse_score < self.threshold * 0.5:
+                break
+            # Suppress this peak so the next iteration finds a different candidate
+            result[max(0, cy - 2):cy + 3, max(0, cx - 2):cx + 3] = -1.0
+            x0, y0 = max(0, cx * scale - margin), max(0, cy * scale - margin)
+            window = image[y0:y0 + th + 2 * margin, x0:x0 + tw + 2 * margin]
+            score, (mx, my) = self._match(window, self.template)
+            if score >= self.threshold:
+                return screen[0] + x0 + mx, screen[1] + y0 + my
+        return None
+
+    def locate(self, template=None) -> Optional[Tuple[int, int]]:
+        """Return the top-left desktop position of the template, or None if not on screen."""
+        if template is not None:
+            self.set_template(template)
+        if self.template is None:
+            return None
+        start = time.perf_counter()
+        try:
+            if self.last_match is not None:
+                found = self._check_neighbourhood()
+                if found is not None:
+                    self.last_match = found
+                    return found
+            screens = self._screen_list()
+            order = list(range(len(screens)))
+            if self.last_screen is not None and self.last_screen < len(screens):
+                order.remove(self.last_screen)
+                order.insert(0, self.last_screen)
+            for index in order:
+                found = self._search_screen(screens[index])
+                if found is not None:
+                    self.last_match = found
+                    self.last_screen = index
+                    return found
+            self.last_match = None
+            return None
+        finally:
+            self.last_locate_ms = (time.perf_counter() - start) * 1000
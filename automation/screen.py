@@ -3,12 +3,30 @@ import pyautogui
 import cv2
 import numpy as np
 import time
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from automation.insertion import TextInserter
+from automation.locator import FieldLocator, _to_gray
+
+FIELD_TEMPLATE_SIZE = (240, 60)  # snapshot around the target field used to find it again
 
 class ScreenAutomation:
-    def __init__(self):
+    def __init__(self, inserter: Optional[TextInserter] = None):
         self.target_field: Optional[Tuple[int, int]] = None
         self.field_template = None
+        self.field_offset: Tuple[int, int] = (0, 0)  # target field's click point within field_template
+        self.locator = FieldLocator()
+        self.inserter = inserter or TextInserter()
+
+    def set_screens(self, screens: List[Tuple[int, int, int, int]]):
+        """Screen geometries (x, y, width, height) used to limit field searches to one screen"""
+        self.locator.set_screens(screens)
+
+    def screen_origin(self, screen: int) -> Tuple[int, int]:
+        """Desktop position of a screen's top-left corner; (0, 0) if its geometry is unknown"""
+        screens = self.locator.screens
+        if 0 <= screen < len(screens):
+            return screens[screen][0], screens[screen][1]
+        return 0, 0
 
     def capture_screen_region(self, region=None):
         """Capture screen or specific region"""
@@ -16,25 +34,62 @@ class ScreenAutomation:
             return pyautogui.screenshot(region=region)
         return pyautogui.screenshot()
 
+    def capture_regions(self, scan_regions) -> List[np.ndarray]:
+        """Capture several ScanRegions with one screenshot per screen; returns images in input order"""
+        by_screen: Dict[int, List[int]] = {}
+        for i, scan_region in enumerate(scan_regions):
+            by_screen.setdefault(scan_region.screen, []).append(i)
+        images: List[np.ndarray] = [None] * len(scan_regions)  # type: ignore
+        for screen, indices in by_screen.items():
+            # Regions are relative to their screen; pyautogui wants desktop coordinates
+            ox, oy = self.screen_origin(screen)
+            boxes = [(x + ox, y + oy, w, h) for x, y, w, h in (scan_regions[i].region for i in indices)]
+            if len(boxes) == 1:
+                images[indices[0]] = np.asarray(self.capture_screen_region(boxes[0]))
+                continue
+            left = min(x for x, _, _, _ in boxes)
+            top = min(y for _, y, _, _ in boxes)
+            right = max(x + w for x, _, w, _ in boxes)
+            bottom = max(y + h for _, y, _, h in boxes)
+            grab = np.asarray(pyautogui.screenshot(region=(left, top, right - left, bottom - top)))
+            # Crops are views into the single grab, no per-region copy
+            for i, (x, y, w, h) in zip(indices, boxes):
+                images[i] = grab[y - top:y - top + h, x - left:x - left + w]
+        return images
+
+    def set_target_field(self, position: Tuple[int, int]):
+        """Remember the target field and a snapshot of its surroundings, so it is found again if its window moves"""
+        x, y = self.target_field = (int(position[0]), int(position[1]))
+        tw, th = FIELD_TEMPLATE_SIZE
+        region = self.locator.clip_to_screen((x - tw // 2, y - th // 2, tw, th), (x, y))
+        self.field_template = None
+        if region is None:
+            return
+        template = _to_gray(self.capture_screen_region(region))
+        # A blank patch matches anywhere; keep the fixed position instead
+        if template.std() < 8:
+            return
+        self.field_template = template
+        self.field_offset = (x - region[0], y - region[1])
+        self.locator.set_template(template)
+        self.locator.last_match = (region[0], region[1])
+
     def find_text_field(self, template_image=None):
-        """Find text input field on screen"""
-        if template_image:
-            # Use template matching
-            screenshot = np.array(pyautogui.screenshot())
-            template = np.array(template_image)
-            result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-            if max_val > 0.8:  # Good match
-                return max_loc
+        """Find text input field on screen; without a template, returns the target field's current click point"""
+        if template_image is not None:
+            match = self.locator.locate(template_image)
+            if match is not None:
+                return match
+        elif self.field_template is not None:
+            # Cached neighbourhood check first, then a coarse-to-fine search of the last screen
+            match = self.locator.locate(self.field_template)
+            if match is not None:
+                return match[0] + self.field_offset[0], match[1] + self.field_offset[1]
+        if self.target_field is not None:
+            return self.target_field
         # Fallback: look for cursor or active field
         return pyautogui.position()  # Return current mouse position
 
     def click_and_type(self, text, position=None):
-        """Click on position and type text"""
-        if position:
-            pyautogui.click(position)
-        # Clear existing text
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(0.1)
-        # Type new text
-        pyautogui.typewrite(text)
+        """Click on position and replace the field's text; returns the insertion latency in ms"""
+        return self.inserter.insert(text, position)
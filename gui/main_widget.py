@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit, QLineEdit
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from .dialogs import ClickCaptureDialog
 from .region_helpers import show_region_selector
 
@@ -10,31 +10,64 @@ import time
 from .region_selector_dialog import RegionSelectorDialog
 from .screen_picker_dialog import ScreenPickerDialog
 from .notifier import Notifier
-from .settings_manager import load_settings, save_settings
+from .settings_manager import DEFAULT_SCAN_INTERVAL, MIN_SCAN_INTERVAL, SettingsStore, get_settings_store, scan_regions_from
 from .logger import log_info, log_error
 from utils.state_filters import is_state_name_or_abbreviation
+from models import ScanRegion
+from ocr.base import DEFAULT_PROFILE, PROFILES
 
 class MainWidget(QWidget):
-    def __init__(self, recognizer, screen_automation):
+    def __init__(self, recognizer, screen_automation, settings: Optional[SettingsStore] = None):
         """Initialize the main widget and UI."""
         super().__init__()
         self.recognizer = recognizer
         self.screen_automation = screen_automation
-        settings = load_settings()
-        self.scan_region: Tuple[int, int, int, int] = tuple(settings.get('scan_region', (100, 100, 200, 60)))
+        self.settings = settings or get_settings_store()
+        settings = self.settings.snapshot()
+        self.scan_regions: List[ScanRegion] = scan_regions_from(settings)
         self.target_field: Optional[Tuple[int, int]] = None
         self.input_mode = settings.get('input_mode', 'browser_extension')
+        config = getattr(recognizer, 'config', None)
+        self.engine_profile = settings.get('engine_profile', getattr(config, 'ENGINE_PROFILE', DEFAULT_PROFILE))
         self._init_ui()
         self._setup_shortcuts()
+        self._sync_screen_geometry()
         from .recognition_controller import RecognitionController
         self.recognition_controller = RecognitionController(self)
         self.recognition_controller.result_signal.connect(self.log_result)
         self.recognition_controller.error_signal.connect(self.show_error)
         self.recognition_controller.status_signal.connect(self.show_status)
+        self.recognition_controller.stats_signal.connect(self.show_pipeline_stats)
         self.recognition_running = False
+        if config is not None and self.engine_profile != getattr(config, 'ENGINE_PROFILE', DEFAULT_PROFILE):
+            self._apply_profile(self.engine_profile)
         # Set initial state of Set Target Field button based on input mode
         self._update_set_field_btn_state()
 
+    def _sync_screen_geometry(self):
+        """Tell the automation layer where each monitor is so field searches stay on one screen."""
+        if not self.screen_automation or not hasattr(self.screen_automation, 'set_screens'):
+            return
+        from PyQt5.QtWidgets import QApplication
+        geometries = []
+        for screen in QApplication.screens():
+            geo = screen.geometry()
+            geometries.append((geo.x(), geo.y(), geo.width(), geo.height()))
+        self.screen_automation.set_screens(geometries)
+
+    @property
+    def scan_region(self) -> Tuple[int, int, int, int]:
+        """First scan region, for code that only handles one."""
+        return self.scan_regions[0].region
+
+    def _save_scan_regions(self):
+        first = self.scan_regions[0]
+        self.settings.update({
+            'scan_region': first.region,
+            'scan_screen': int(first.screen),
+            'scan_regions': [r.to_dict() for r in self.scan_regions],
+        })
+
     def toggle_recognition_hotkey(self):
         """Toggle recognition on hotkey press."""
         # Use controller state for toggling
@@ -57,10 +90,16 @@ class MainWidget(QWidget):
         self.set_field_btn.setToolTip('Click to select the field where results will be inserted')
         self.set_region_btn = QPushButton(QIcon.fromTheme('view-grid'), 'Set Scan Region')
         self.set_region_btn.setToolTip('Select the screen region to scan for license plates')
+        self.add_region_btn = QPushButton(QIcon.fromTheme('list-add'), 'Add Scan Region')
+        self.add_region_btn.setToolTip('Add another named region to scan, on any screen')
+        self.clear_regions_btn = QPushButton(QIcon.fromTheme('edit-clear'), 'Clear Regions')
+        self.clear_regions_btn.setToolTip('Remove all scan regions except the first')
         hbox.addWidget(self.start_btn)
         hbox.addWidget(self.stop_btn)
         hbox.addWidget(self.set_field_btn)
         hbox.addWidget(self.set_region_btn)
+        hbox.addWidget(self.add_region_btn)
+        hbox.addWidget(self.clear_regions_btn)
 
         # Input mode selector
         from PyQt5.QtWidgets import QComboBox
@@ -73,8 +112,22 @@ class MainWidget(QWidget):
         vbox.addWidget(QLabel('Input Mode:'))
         vbox.addWidget(self.input_mode_combo)
 
+        # Engine performance profile, applied without restarting
+        self.profile_combo = QComboBox()
+        for profile in PROFILES:
+            self.profile_combo.addItem(profile.capitalize(), profile)
+        self.profile_combo.setCurrentIndex(PROFILES.index(self.engine_profile) if self.engine_profile in PROFILES else len(PROFILES) - 1)
+        self.profile_combo.setToolTip('Fast uses lighter OCR models and smaller inputs; Accurate uses each library\'s full models')
+        self.profile_combo.currentIndexChanged.connect(self._on_profile_changed)
+        vbox.addWidget(QLabel('Engine Profile:'))
+        vbox.addWidget(self.profile_combo)
+
         self.status_label = QLabel('Status: Ready')
         self.status_label.setToolTip('Shows the current status of the recognition system')
+        self.pipeline_label = QLabel('Pipeline: idle')
+        self.pipeline_label.setToolTip('Queue depth and average wait time per pipeline stage')
+        self.engine_state_label = QLabel('Engines: -')
+        self.engine_state_label.setToolTip('Circuit breaker state per OCR engine')
         self.results_text = QTextEdit()
         self.results_text.setReadOnly(True)
         self.results_text.setToolTip('Recognition results and logs')
@@ -84,14 +137,17 @@ class MainWidget(QWidget):
         self.interval_label.setToolTip('How often to scan for license plates (in seconds)')
         self.interval_entry = QLineEdit()
         self.interval_entry.setFixedWidth(50)
-        self.interval_entry.setText('2.0')
+        self.interval_entry.setText(str(self.settings.get('scan_interval', DEFAULT_SCAN_INTERVAL)))
         self.interval_entry.setToolTip('Enter the scan interval in seconds')
+        self.interval_entry.editingFinished.connect(self._on_interval_changed)
         self.interval_unit = QLabel('seconds')
         interval_hbox.addWidget(self.interval_label)
         interval_hbox.addWidget(self.interval_entry)
         interval_hbox.addWidget(self.interval_unit)
         vbox.addLayout(hbox)
         vbox.addWidget(self.status_label)
+        vbox.addWidget(self.pipeline_label)
+        vbox.addWidget(self.engine_state_label)
         vbox.addWidget(self.results_text)
         vbox.addLayout(interval_hbox)
         self.setLayout(vbox)
@@ -106,10 +162,39 @@ class MainWidget(QWidget):
     def _on_input_mode_changed(self, idx):
         mode = self.input_mode_combo.currentData()
         self.input_mode = mode
-        save_settings({'input_mode': mode})
+        self.settings.update(input_mode=mode)
         self._update_set_field_btn_state()
         self.log_result(f"Input mode changed to: {self.input_mode_combo.currentText()}")
 
+    def _on_profile_changed(self, idx):
+        profile = self.profile_combo.currentData()
+        if profile == self.engine_profile:
+            return
+        self.engine_profile = profile
+        self.settings.update(engine_profile=profile)
+        self.log_result(f"Engine profile changed to: {self.profile_combo.currentText()}")
+        self._apply_profile(profile)
+
+    def _on_interval_changed(self):
+        previous = self.settings.get('scan_interval', DEFAULT_SCAN_INTERVAL)
+        try:
+            interval = max(MIN_SCAN_INTERVAL, float(self.interval_entry.text()))
+        except ValueError:
+            self.interval_entry.setText(str(previous))
+            self.log_result(f"Invalid scan interval; keeping {previous} seconds")
+            return
+        self.interval_entry.setText(str(interval))
+        if interval != previous:
+            self.settings.update(scan_interval=interval)
+            self.log_result(f"Scan interval set to {interval} seconds")
+
+    def _apply_profile(self, profile: str):
+        """Switch in the background: it waits for a running engine call and may unload models."""
+        recognizer = self.recognizer
+        if recognizer is None or not hasattr(recognizer, 'set_profile'):
+            return
+        threading.Thread(target=recognizer.set_profile, args=(profile,), name='profile-switch', daemon=True).start()
+
     def _update_set_field_btn_state(self):
         # Disable Set Target Field button in extension mode, enable in keystroke mode
         if self.input_mode == 'browser_extension':
@@ -135,6 +220,8 @@ class MainWidget(QWidget):
         self.stop_btn.clicked.connect(self.stop_recognition)
         self.set_field_btn.clicked.connect(self.set_target_field)
         self.set_region_btn.clicked.connect(self.set_scan_region)
+        self.add_region_btn.clicked.connect(self.add_scan_region)
+        self.clear_regions_btn.clicked.connect(self.clear_scan_regions)
 
     def set_target_field(self):
         """Show overlay and capture the next mouse click position for the target field."""
@@ -142,27 +229,68 @@ class MainWidget(QWidget):
         Notifier.info(self, 'Click anywhere on the screen to set the target field position.')
         if dialog.exec_() == dialog.Accepted and dialog.clicked_pos:
             self.target_field = dialog.clicked_pos
+            if hasattr(self.screen_automation, 'set_target_field'):
+                from PyQt5.QtWidgets import QApplication
+                # Let the overlay disappear before the field's surroundings are captured
+                QApplication.processEvents()
+                time.sleep(0.1)
+                self.screen_automation.set_target_field(self.target_field)
             self.log_result(f'Target field set at {self.target_field}')
             Notifier.info(self, f'Target field set at {self.target_field}')
         else:
             self.log_result('Target field selection cancelled.')
 
-    def set_scan_region(self):
-        """Show dialogs to select the scan region on a chosen screen."""
-        settings = load_settings()
-        last_screen_index = settings.get('scan_screen', 0)
-        last_region = settings.get('scan_region', None)
+    def _select_region(self, last_region=None, last_screen_index=0):
         from PyQt5.QtWidgets import QApplication
         screens = QApplication.screens()
-        region, screen_index = show_region_selector(self, screens, last_region, last_screen_index)
+        return show_region_selector(self, screens, last_region, last_screen_index)
+
+    def set_scan_region(self):
+        """Show dialogs to select the scan region on a chosen screen."""
+        first = self.scan_regions[0]
+        region, screen_index = self._select_region(first.region, first.screen)
         if region is not None and screen_index is not None:
-            self.scan_region = region
-            save_settings({'scan_region': self.scan_region, 'scan_screen': int(screen_index)})
+            self.scan_regions = [ScanRegion('default', tuple(region), int(screen_index))]
+            self._save_scan_regions()
             self.log_result(f'Scan region set to {self.scan_region} on screen {int(screen_index)+1}')
             Notifier.info(self, f'Scan region set to {self.scan_region} on screen {int(screen_index)+1}')
         else:
             self.log_result('Scan region selection cancelled or not implemented.')
 
+    def add_scan_region(self):
+        """Add another named scan region, optionally with its own keystroke target field."""
+        from PyQt5.QtWidgets import QInputDialog, QMessageBox
+        name, ok = QInputDialog.getText(self, 'Add Scan Region', 'Region name:', text=f'region{len(self.scan_regions) + 1}')
+        if not ok or not name.strip():
+            self.log_result('Add scan region cancelled.')
+            return
+        name = name.strip()
+        if any(r.name == name for r in self.scan_regions):
+            Notifier.warn(self, f'A scan region named "{name}" already exists.')
+            return
+        last = self.scan_regions[-1]
+        region, screen_index = self._select_region(None, last.screen)
+        if region is None or screen_index is None:
+            self.log_result('Add scan region cancelled.')
+            return
+        target = None
+        if self.input_mode == 'keystroke':
+            answer = QMessageBox.question(self, 'Output Target', f'Set a separate target field for "{name}"?')
+            if answer == QMessageBox.Yes:
+                dialog = ClickCaptureDialog(self)
+                if dialog.exec_() == dialog.Accepted and dialog.clicked_pos:
+                    target = dialog.clicked_pos
+        self.scan_regions.append(ScanRegion(name, tuple(region), int(screen_index), target))
+        self._save_scan_regions()
+        target_info = f', target {target}' if target else ''
+        self.log_result(f'Added scan region "{name}" {tuple(region)} on screen {int(screen_index)+1}{target_info}')
+
+    def clear_scan_regions(self):
+        """Drop every scan region except the first."""
+        self.scan_regions = self.scan_regions[:1]
+        self._save_scan_regions()
+        self.log_result(f'Scan regions cleared; scanning {self.scan_region} only.')
+
     def start_recognition(self):
         """Start the recognition thread (via RecognitionController)."""
         if not self.recognition_running:
@@ -190,6 +318,32 @@ class MainWidget(QWidget):
     def show_status(self, message: str):
         Notifier.info(self, message)
 
+    def show_pipeline_stats(self, stats: dict):
+        """Show queue depths and per-stage wait times from the recognition pipeline."""
+        stages = stats['stages']
+        text = (
+            f"Pipeline: frames queued {stats['frame_queue']['depth']} (dropped {stats['frame_queue']['dropped']}), "
+            f"outputs queued {stats['dispatch_queue']['depth']} | wait ms: "
+            + ', '.join(f"{name} {stage['avg_wait_ms']:.0f}" for name, stage in stages.items())
+        )
+        tracking = stats.get('tracking')
+        if tracking:
+            counts = tracking['counts']
+            text += f" | tracked reads {counts.get('tracked', 0)}, full {counts.get('full', 0)}, lost {counts.get('lost', 0)}"
+        self.pipeline_label.setText(text)
+        breakers = stats.get('breakers') or {}
+        if breakers:
+            self.engine_state_label.setText('Engines: ' + ', '.join(
+                f"{name} {'ok' if b['state'] == 'closed' else b['state']}"
+                + (f" (retry in {b['retry_in']:.0f}s)" if b['state'] == 'open' else '')
+                for name, b in breakers.items()
+            ))
+            self.engine_state_label.setToolTip('\n'.join(
+                f"{name}: {b['failures']}/{b['calls']} failed, {b['timeouts']} timeouts"
+                + (f", last error: {b['last_error']}" if b['last_error'] else '')
+                for name, b in breakers.items()
+            ))
+
     def log_result(self, message: str):
         """Append a message to the results log."""
         self.results_text.append(message)
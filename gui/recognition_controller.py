@@ -1,66 +1,243 @@
 
 import threading
 import time
+from collections import Counter
 from utils.state_filters import is_state_name_or_abbreviation
+from utils.pipeline import BoundedQueue, QueueClosed, StageStats, Stopwatch
+from utils.history_store import open_history_store
+from utils.watchlist import open_watchlist
 from .notifier import Notifier
 from .logger import log_info, log_error
+from .settings_manager import PipelineSettings
 from PyQt5.QtCore import QObject, pyqtSignal
 
 
 from utils.chrome_messaging import send_plate_to_chrome
 
+FRAME_QUEUE_SIZE = 2
+DISPATCH_QUEUE_SIZE = 16
+DISPATCH_PUT_TIMEOUT = 5.0  # recognition waits this long for room before a plate is given up (and logged)
+QUEUE_POLL_SECONDS = 0.2
+STATS_INTERVAL_SECONDS = 1.0  # pipeline stats are sent to the GUI at most this often
+
+
 class RecognitionController(QObject):
     result_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str)
     status_signal = pyqtSignal(str)
+    stats_signal = pyqtSignal(dict)
+
+    """Runs capture, recognition and output dispatch as three threads joined by bounded queues.
 
-    """Handles the recognition thread and logic for license plate detection."""
+    Capturing frame N+1 overlaps with OCR on frame N; the frame queue drops the oldest
+    frame when recognition falls behind. Recognized plates are never dropped silently:
+    when typing/Chrome dispatch falls behind, recognition waits for room in its queue,
+    and a plate that still cannot be queued is logged.
+    """
     def __init__(self, main_widget):
         super().__init__()
         self.main_widget = main_widget
-        self._thread = None
+        # The pipeline threads read scan regions and interval from this frozen view, never from the widgets
+        self.settings = main_widget.settings
+        self.pipeline_settings = PipelineSettings.from_settings(self.settings.snapshot())
+        self._unsubscribe = self.settings.subscribe(self._on_settings_changed)
+        self._threads = []
         self.running = False
+        self.frame_queue = BoundedQueue(FRAME_QUEUE_SIZE, drop_oldest=True)
+        self.dispatch_queue = BoundedQueue(DISPATCH_QUEUE_SIZE)
+        self.stage_stats = {name: StageStats(name) for name in ('capture', 'recognize', 'dispatch')}
+        self._stats_sent = 0.0
+        config = main_widget.recognizer.config
+        self.burst_frames = int(getattr(config, 'BURST_FRAMES', 0) or 0)
+        self.burst_spacing = getattr(config, 'BURST_SPACING_MS', 40) / 1000.0
+        # Low-confidence readings 'resolved' by a burst, or still 'failed' after it
+        self.burst_counts = Counter()
+        self.history = None
+        try:
+            self.history = open_history_store(main_widget.recognizer.config, log_error)
+        except Exception as e:
+            log_error(f"Detection history unavailable: {e}")
+        self.watchlist = None
+        try:
+            self.watchlist = open_watchlist(main_widget.recognizer.config, log_info)
+        except Exception as e:
+            log_error(f"Watchlist unavailable: {e}")
 
     def start(self):
         if not self.running:
             self.running = True
-            self._thread = threading.Thread(target=self._loop, daemon=True)
-            self._thread.start()
+            self.frame_queue = BoundedQueue(FRAME_QUEUE_SIZE, drop_oldest=True)
+            self.dispatch_queue = BoundedQueue(DISPATCH_QUEUE_SIZE)
+            self.stage_stats = {name: StageStats(name) for name in ('capture', 'recognize', 'dispatch')}
+            # Engines evicted while idle start reloading before the first frame arrives
+            self.main_widget.recognizer.prefetch_engines()
+            self._threads = [
+                threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+                threading.Thread(target=self._recognize_loop, name='recognize', daemon=True),
+                threading.Thread(target=self._dispatch_loop, name='dispatch', daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
 
     def stop(self):
         self.running = False
+        self.frame_queue.close()
+        self.dispatch_queue.close()
+
+    def pipeline_stats(self) -> dict:
+        """Queue depths, drop counts and per-stage wait/busy times."""
+        # A service client has no local engines until it falls back
+        residency = getattr(self.main_widget.recognizer, 'residency', None)
+        resolutions = getattr(self.main_widget.recognizer, 'resolution_counts', None)
+        breaker_states = getattr(self.main_widget.recognizer, 'breaker_states', None)
+        crop_counts = getattr(self.main_widget.recognizer, 'crop_counts', None)
+        tracker = getattr(self.main_widget.recognizer, 'tracker', None)
+        return {
+            'stages': {name: stats.snapshot() for name, stats in self.stage_stats.items()},
+            'frame_queue': {'depth': self.frame_queue.depth, 'dropped': self.frame_queue.dropped},
+            'dispatch_queue': {'depth': self.dispatch_queue.depth, 'dropped': self.dispatch_queue.dropped},
+            'residency': residency.snapshot() if residency else None,
+            'resolutions': dict(resolutions) if resolutions is not None else None,
+            'breakers': breaker_states() if breaker_states else {},
+            'crop_mode': {name: dict(counts) for name, counts in crop_counts.items()} if crop_counts else None,
+            'tracking': tracker.snapshot() if tracker else None,
+            'burst': dict(self.burst_counts),
+            'fast_path': getattr(self.main_widget.recognizer, 'fast_path_count', None),
+            'history': {'written': self.history.written, 'dropped': self.history.dropped} if self.history else None,
+        }
+
+    def _on_settings_changed(self, snapshot, changed):
+        # Rebuilt from the latest snapshot, so concurrent updates cannot leave an older view in place
+        self.pipeline_settings = PipelineSettings.from_settings(self.settings.snapshot())
 
-    def _loop(self):
+    def _capture_loop(self):
+        stats = self.stage_stats['capture']
+        watch = Stopwatch()
         while self.running:
+            wait = watch.lap()
+            settings = self.pipeline_settings
             try:
                 if self.main_widget.screen_automation:
-                    img = self.main_widget.screen_automation.capture_screen_region(self.main_widget.scan_region)
-                    text, conf, alert = self.main_widget.recognizer.recognize_license_plate(img)
-                    now = time.strftime('%H:%M:%S')
-                    detected_state = None
-                    if text and is_state_name_or_abbreviation(text):
-                        detected_state = text
-                    if text:
-                        state_info = f" | State: {detected_state}" if detected_state else ""
-                        self.result_signal.emit(f"{now} - Detected: {text} (Conf: {conf:.2f}){state_info}")
-                        # Send recognized plate to Chrome extension
-                        send_plate_to_chrome(text)
-                        if not alert and self.main_widget.target_field:
-                            self.main_widget.screen_automation.click_and_type(text, self.main_widget.target_field)
-                            self.result_signal.emit(f"{now} - Auto-inserted: {text}")
-                        elif alert:
-                            self.result_signal.emit(f"{now} - Manual confirmation needed")
-                            self.status_signal.emit(f"Manual confirmation needed for: {text}")
-                    else:
-                        self.result_signal.emit(f"{now} - No plate detected.")
+                    regions = list(settings.scan_regions)
+                    images = self.main_widget.screen_automation.capture_regions(regions)
+                    self.frame_queue.put((time.strftime('%H:%M:%S'), regions, images))
                 else:
                     self.error_signal.emit("ScreenAutomation not available.")
+            except Exception as e:
+                self.error_signal.emit(f"Capture error: {e}")
+            busy = watch.lap()
+            stats.record(wait, busy)
+            # Sleep out the rest of the interval; capture time counts towards it
+            time.sleep(max(0.0, settings.scan_interval - busy))
+
+    def _recognize_loop(self):
+        stats = self.stage_stats['recognize']
+        watch = Stopwatch()
+        while self.running:
+            try:
+                item = self.frame_queue.get(timeout=QUEUE_POLL_SECONDS)
+            except QueueClosed:
+                break
+            if item is None:
+                continue
+            wait = watch.lap()
+            now, regions, images = item
+            try:
+                results = self.main_widget.recognizer.recognize_batch(images, [r.name for r in regions])
+                bursts = self._burst(regions, results)
+                for i, (scan_region, result) in enumerate(zip(regions, results)):
+                    self._handle_result(now, scan_region, result, tagged=len(regions) > 1, burst=bursts.get(i, 0))
             except Exception as e:
                 self.error_signal.emit(f"Recognition error: {e}")
+            stats.record(wait, watch.lap())
+            # Building the stats snapshots every frame costs more than the label is worth
+            if time.monotonic() - self._stats_sent >= STATS_INTERVAL_SECONDS:
+                self._stats_sent = time.monotonic()
+                self.stats_signal.emit(self.pipeline_stats())
+
+    def _burst(self, regions, results) -> dict:
+        """Re-read low-confidence regions from a quick burst of fresh captures.
+
+        Only readings where some engine saw text qualify; an empty region is not worth
+        a burst. Each such result is replaced in place by the consensus over its own
+        readings and the burst's. Returns {result index: frames read}.
+        """
+        recognizer = self.main_widget.recognizer
+        screen = self.main_widget.screen_automation
+        if self.burst_frames <= 0 or screen is None or not hasattr(recognizer, 'combine'):
+            return {}
+        low = [i for i, r in enumerate(results) if r.alert and any(e.text for e in r.engine_results)]
+        if not low:
+            return {}
+        burst_regions = [regions[i] for i in low]
+        frames = []
+        for n in range(self.burst_frames):
+            if n and self.burst_spacing > 0:
+                time.sleep(self.burst_spacing)
+            frames.extend(screen.capture_regions(burst_regions))
+        burst = recognizer.recognize_batch(frames, [r.name for r in burst_regions] * self.burst_frames)
+        for k, i in enumerate(low):
+            results[i] = recognizer.combine([results[i]] + burst[k::len(low)])
+            self.burst_counts['failed' if results[i].alert else 'resolved'] += 1
+        return {i: self.burst_frames + 1 for i in low}
+
+    def _handle_result(self, now, scan_region, result, tagged=False, burst=0):
+        text, conf, alert = result.text, result.confidence, result.alert
+        if self.history and (text or any(r.text for r in result.engine_results)):
+            self.history.record(result)
+        tag = f" [{scan_region.name}]" if tagged else ""
+        detected_state = None
+        if text and is_state_name_or_abbreviation(text):
+            detected_state = text
+        if text:
+            state_info = f" | State: {detected_state}" if detected_state else ""
+            burst_info = f" | Burst of {burst} frames" if burst else ""
+            self.result_signal.emit(f"{now}{tag} - Detected: {text} (Conf: {conf:.2f}){state_info}{burst_info}")
+            self._check_watchlist(now, tag, text)
+            target = scan_region.target or self.main_widget.target_field
+            if not self.dispatch_queue.put((f"{now}{tag}", text, alert, target), timeout=DISPATCH_PUT_TIMEOUT) \
+                    and self.running:
+                message = f"{now}{tag} - Output queue full, {text} was not typed or sent to Chrome"
+                log_error(message)
+                self.error_signal.emit(message)
+        else:
+            self.result_signal.emit(f"{now}{tag} - No plate detected.")
+
+    def _check_watchlist(self, now, tag, text):
+        if not self.watchlist:
+            return
+        for hit in self.watchlist.match(text):
+            match = "exact match" if hit.distance == 0 else f"matches listed {hit.listed} ({hit.distance} char diff)"
+            note = f" - {hit.note}" if hit.note else ""
+            self.result_signal.emit(f"{now}{tag} - WATCHLIST HIT: {text} {match}{note}")
+            self.status_signal.emit(f"Watchlist hit: {text} {match}{note}")
+
+    def _dispatch_loop(self):
+        stats = self.stage_stats['dispatch']
+        watch = Stopwatch()
+        while self.running:
             try:
-                interval = float(self.main_widget.interval_entry.text())
-                if interval < 0.1:
-                    interval = 0.1
-            except Exception:
-                interval = 2.0
-            time.sleep(interval)
+                item = self.dispatch_queue.get(timeout=QUEUE_POLL_SECONDS)
+            except QueueClosed:
+                break
+            if item is None:
+                continue
+            wait = watch.lap()
+            now, text, alert, target = item
+            try:
+                # Send recognized plate to Chrome extension
+                send_plate_to_chrome(text)
+                if not alert and target:
+                    screen = self.main_widget.screen_automation
+                    if target == self.main_widget.target_field and hasattr(screen, 'find_text_field'):
+                        # The shared target field may have moved with its window; per-region targets are fixed points
+                        target = screen.find_text_field()
+                    latency_ms = screen.click_and_type(text, target)
+                    latency_info = f" ({latency_ms:.0f} ms)" if latency_ms is not None else ""
+                    self.result_signal.emit(f"{now} - Auto-inserted: {text}{latency_info}")
+                elif alert:
+                    self.result_signal.emit(f"{now} - Manual confirmation needed")
+                    self.status_signal.emit(f"Manual confirmation needed for: {text}")
+            except Exception as e:
+                self.error_signal.emit(f"Dispatch error: {e}")
+            stats.record(wait, watch.lap())
@@ -1,14 +1,189 @@
+"""Operator settings, kept in memory and written to SETTINGS_FILE in the background.
+
+``SettingsStore`` holds the settings as an immutable snapshot (read-only mappings and
+tuples all the way down). ``update()`` merges a partial change into a new snapshot and
+tells subscribers which keys changed. It then schedules a write ``write_delay`` seconds
+later, so a burst of changes costs one write. The file is written to a temporary
+name and renamed over the old one, so a crash never leaves it truncated.
+Threads that must not touch Qt widgets, such as the recognition pipeline, read
+``snapshot()`` or a ``PipelineSettings`` built from it.
+"""
+import atexit
 import json
 import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, List, Mapping, Optional, Tuple
+
+from models import ScanRegion
+from .logger import log_error
 
 SETTINGS_FILE = os.path.expanduser('~/.license_plate_detector_settings.json')
+DEFAULT_SCAN_INTERVAL = 2.0
+MIN_SCAN_INTERVAL = 0.1
+
+Subscriber = Callable[[Mapping[str, Any], Mapping[str, Any]], None]  # (snapshot, changed keys -> new values)
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Plain dicts and lists again, for JSON and for callers that edit what they get."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class SettingsStore:
+    def __init__(self, path: Optional[str] = SETTINGS_FILE, write_delay: float = 0.5,
+                 initial: Optional[Mapping[str, Any]] = None):
+        """path: None keeps the settings in memory only."""
+        self.path = path
+        self.write_delay = write_delay
+        self.writes = 0
+        self._lock = threading.Lock()
+        # Held across snapshot-and-write, so a later write never lands before an earlier one
+        self._write_lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        settings = self._read() if path else {}
+        settings.update(initial or {})
+        self._snapshot: Mapping[str, Any] = _freeze(settings)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r') as f:
+                settings = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log_error(f"Could not read settings from {self.path}, using defaults: {e}")
+            return {}
+        return settings if isinstance(settings, dict) else {}
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """The current settings; never changes, so it can be read from any thread without locking."""
+        return self._snapshot
+
+    def get(self, key: str, default=None):
+        return self._snapshot.get(key, default)
+
+    def update(self, changes: Optional[Mapping[str, Any]] = None, **values):
+        """Merge changes into the settings; keys not mentioned keep their values."""
+        changes = dict(changes or {}, **values)
+        with self._lock:
+            current = self._snapshot
+            changed = {key: _freeze(value) for key, value in changes.items()}
+            changed = {key: value for key, value in changed.items() if key not in current or current[key] != value}
+            if not changed:
+                return
+            self._snapshot = MappingProxyType({**current, **changed})
+            snapshot, subscribers = self._snapshot, list(self._subscribers)
+            self._schedule_write()
+        changed = MappingProxyType(changed)
+        for callback in subscribers:
+            try:
+                callback(snapshot, changed)
+            except Exception as e:
+                log_error(f"Settings subscriber failed: {e}")
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Call callback(snapshot, changed) after every change, on the thread that made it; returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _schedule_write(self):
+        # Caller holds _lock
+        if not self.path:
+            return
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                settings = _thaw(self._snapshot)
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(settings, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self.writes += 1
+            except OSError as e:
+                with self._lock:
+                    self._dirty = True
+                log_error(f"Could not save settings to {self.path}: {e}")
+
+
+@dataclass(frozen=True)
+class PipelineSettings:
+    """What the recognition threads need from the settings, built once per change."""
+    scan_regions: Tuple[ScanRegion, ...]
+    scan_interval: float
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> 'PipelineSettings':
+        try:
+            interval = max(MIN_SCAN_INTERVAL, float(settings.get('scan_interval', DEFAULT_SCAN_INTERVAL)))
+        except (TypeError, ValueError):
+            interval = DEFAULT_SCAN_INTERVAL
+        return cls(tuple(scan_regions_from(settings)), interval)
+
+
+def scan_regions_from(settings: Mapping[str, Any]) -> List[ScanRegion]:
+    """Named scan regions, falling back to the single legacy scan_region/scan_screen keys."""
+    regions = [ScanRegion.from_dict(r) for r in settings.get('scan_regions', [])]
+    if not regions:
+        regions = [ScanRegion('default', tuple(settings.get('scan_region', (100, 100, 200, 60))), int(settings.get('scan_screen', 0)))]
+    return regions
+
+
+_store: Optional[SettingsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_settings_store() -> SettingsStore:
+    """The application's store for SETTINGS_FILE; pending changes are written at exit."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SettingsStore(SETTINGS_FILE)
+            atexit.register(_store.flush)
+        return _store
+
 
 def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+    return _thaw(get_settings_store().snapshot())
+
 
 def save_settings(settings):
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=2)
+    """Merge settings into the stored ones; keys not passed keep their values."""
+    get_settings_store().update(settings)
@@ -1,12 +1,24 @@
 import sys
+from recognizer.config import CONFIGURATION
+from utils.thread_budget import ThreadBudget
+
+# Must run before numpy or any ML framework is imported so their thread pools honour it
+thread_budget = ThreadBudget.from_config(CONFIGURATION)
+thread_budget.apply_environment()
+
 from PyQt5.QtWidgets import QApplication
 from gui.main_window import LicensePlateMainWindow
-from recognizer.recognizer import LicensePlateRecognizer, CONFIGURATION, ScreenAutomation
+from recognizer.recognizer import ScreenAutomation
+from recognizer.remote import create_recognizer
+from automation.insertion import TextInserter
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    recognizer = LicensePlateRecognizer(CONFIGURATION)
-    screen_automation = ScreenAutomation()
+    # Uses the shared recognition service when RECOGNITION_SERVICE_URL is set
+    recognizer = create_recognizer(CONFIGURATION, thread_budget=thread_budget)
+    screen_automation = ScreenAutomation(TextInserter.from_config(CONFIGURATION))
     window = LicensePlateMainWindow(recognizer, screen_automation)
     window.show()
-    sys.exit(app.exec_())
+    status = app.exec_()
+    recognizer.close()
+    sys.exit(status)
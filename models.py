@@ -1,7 +1,39 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
 
 @dataclass
 class OCRResult:
     text: str
     confidence: float
     source: str
+    box: Optional[Tuple[int, int, int, int]] = None  # (x, y, w, h) of the text within the frame it was read from
+
+@dataclass
+class RecognitionResult:
+    text: str
+    confidence: float
+    alert: bool
+    region: Optional[str] = None
+    engine_results: List[OCRResult] = field(default_factory=list)
+    resolution: str = 'native'  # pass that decided it: 'coarse', 'native' or 'upscaled'
+    track: Optional[int] = None  # ROI track the frame was read through (recognizer/tracker.py)
+
+@dataclass
+class ScanRegion:
+    name: str
+    region: Tuple[int, int, int, int]
+    screen: int = 0
+    target: Optional[Tuple[int, int]] = None  # keystroke output position; None uses the global target field
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ScanRegion':
+        target = data.get('target')
+        return cls(
+            name=data.get('name', 'default'),
+            region=tuple(data['region']),
+            screen=int(data.get('screen', 0)),
+            target=tuple(target) if target else None,
+        )
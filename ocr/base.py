@@ -1,7 +1,189 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from models import OCRResult
-from typing import Any
+
+# Performance profiles, lightest first. 'accurate' is each library's default architecture.
+PROFILES = ('fast', 'balanced', 'accurate')
+DEFAULT_PROFILE = 'accurate'
+
+
+@dataclass(frozen=True)
+class EngineCapabilities:
+    """What an engine declares about itself so the recognizer can plan around it.
+
+    Latency and memory are rough CPU figures for one plate-sized image; they only
+    need to be right relative to the other engines.
+    """
+    batch: bool = False  # recognize_batch is genuinely faster than a loop over recognize
+    thread_safe: bool = False  # one loaded instance may be called from several threads at once
+    latency_ms: float = 100.0
+    memory_mb: float = 100.0
+    framework: str = 'openmp'  # runtime whose thread pool it uses (utils/thread_budget.FRAMEWORKS)
+    color: str = 'rgb'  # preferred input: 'rgb', 'gray' or 'any'
+    min_height: int = 0  # smallest text height in pixels it reads reliably; 0 = no preference
+    recognition_only: bool = False  # recognize_crop skips text detection and angle classification
+    learns: bool = False  # learn() improves it from readings the recognizer has confirmed
+
 
 class BaseOCREngine:
+    name = ''
+    capabilities = EngineCapabilities()
+    # Profile name -> engine settings (architectures, input sizes, decoder options)
+    profiles: Dict[str, Dict[str, Any]] = {}
+    # Settings that only take effect when the models are (re)loaded
+    reload_settings: Tuple[str, ...] = ()
+    profile = DEFAULT_PROFILE
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result: Optional[Callable[[str], None]] = None) -> 'BaseOCREngine':
+        """Build an unloaded engine from the recognizer configuration."""
+        return cls()
+
+    @property
+    def loaded(self) -> bool:
+        return True
+
+    def load(self):
+        """Load models into memory. Called before the first recognize; must be idempotent."""
+
+    def unload(self):
+        """Release models; a later load() must bring the engine back."""
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        return self.profiles.get(self.profile, {})
+
+    def set_profile(self, profile: str) -> bool:
+        """Switch profile; returns True if loaded models must be reloaded for it to take effect.
+
+        Engines without that profile keep their current settings.
+        """
+        if profile not in self.profiles or profile == self.profile:
+            return False
+        previous = self.settings
+        self.profile = profile
+        return self.loaded and any(previous.get(key) != self.settings.get(key) for key in self.reload_settings)
+
     def recognize(self, image: Any) -> OCRResult:
-        """Recognize text from image and return OCRResult."""
+        """Recognize text from image and return OCRResult.
+
+        An empty OCRResult means no plate was read; failures should raise so the
+        recognizer's circuit breaker can tell a broken engine from a blank frame.
+        """
         raise NotImplementedError()
+
+    def recognize_batch(self, images: List[Any]) -> List[OCRResult]:
+        """Recognize several images; engines with capabilities.batch override this with a single call."""
+        return [self.recognize(image) for image in images]
+
+    def recognize_crop(self, image: Any) -> OCRResult:
+        """Read an image that is already a tight plate crop with the recognition model alone."""
+        return self.recognize(image)
+
+    def recognize_crop_batch(self, images: List[Any]) -> List[OCRResult]:
+        return [self.recognize_crop(image) for image in images]
+
+    def learn(self, image: Any, text: str) -> bool:
+        """Learn from an image whose plate text has been confirmed; engines with capabilities.learns override this."""
+        return False
+
+
+def plate_result(text: str, confidence: float, source: str, box: Optional[Tuple[int, int, int, int]] = None) -> OCRResult:
+    """OCRResult for raw engine text: jurisdiction words stripped, cleaned, state names rejected."""
+    from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
+    from utils.validation import clean_license_plate
+    cleaned = clean_license_plate(strip_jurisdiction_text(text or '').replace(' ', ''))
+    if cleaned and not is_state_name_or_abbreviation(cleaned):
+        return OCRResult(cleaned, float(confidence), source, box)
+    return OCRResult('', 0.0, source)
+
+
+def polygon_box(points, scale: float = 1.0) -> Optional[Tuple[int, int, int, int]]:
+    """(x, y, w, h) bounding a detector's corner points, optionally scaled back to the input image."""
+    try:
+        xs = [float(p[0]) * scale for p in points]
+        ys = [float(p[1]) * scale for p in points]
+    except (TypeError, IndexError):
+        return None
+    if not xs:
+        return None
+    x, y = int(min(xs)), int(min(ys))
+    return x, y, max(1, int(round(max(xs))) - x), max(1, int(round(max(ys))) - y)
+
+
+def union_box(boxes) -> Optional[Tuple[int, int, int, int]]:
+    """Smallest (x, y, w, h) containing every box that is not None."""
+    boxes = [b for b in boxes if b is not None]
+    if not boxes:
+        return None
+    x0, y0 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+    x1, y1 = max(b[0] + b[2] for b in boxes), max(b[1] + b[3] for b in boxes)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+@dataclass(frozen=True)
+class CropPolicy:
+    """When to read a frame with recognition only (see EngineCapabilities.recognition_only).
+
+    In 'auto' mode a frame counts as a tight crop when its aspect ratio is within
+    ``aspect`` and it is at most ``max_height`` pixels tall, i.e. a plate-sized
+    region rather than a wider view with a plate somewhere in it. A crop-mode
+    reading that is empty or below ``min_confidence`` is redone with full detection.
+    """
+    mode: str = 'never'  # 'never', 'auto' or 'always'
+    aspect: Tuple[float, float] = (1.5, 6.0)
+    max_height: int = 200
+    min_confidence: float = 0.5
+
+    @classmethod
+    def from_config(cls, config) -> 'CropPolicy':
+        return cls(
+            mode=getattr(config, 'CROP_MODE', 'never'),
+            aspect=tuple(getattr(config, 'CROP_MODE_ASPECT', (1.5, 6.0))),
+            max_height=getattr(config, 'CROP_MODE_MAX_HEIGHT', 200),
+            min_confidence=getattr(config, 'CROP_MODE_MIN_CONFIDENCE', 0.5),
+        )
+
+    def is_tight(self, image: Any) -> bool:
+        if self.mode == 'never':
+            return False
+        if self.mode == 'always':
+            return True
+        height, width = image.shape[:2]
+        if not height or height > self.max_height:
+            return False
+        return self.aspect[0] <= width / height <= self.aspect[1]
+
+
+def run_engine(engine: BaseOCREngine, frames: List[Any], batched: bool, policy: Optional[CropPolicy] = None,
+               counts: Optional[Counter] = None) -> List[OCRResult]:
+    """One result per frame, reading tight crops with recognition only where the engine supports it.
+
+    counts, if given, is incremented per outcome: 'crop' (crop-mode result kept),
+    'fallback' (redone with detection) and 'full' (detection from the start).
+    """
+    def read(images, crop):
+        if crop:
+            return engine.recognize_crop_batch(images) if batched else [engine.recognize_crop(i) for i in images]
+        return engine.recognize_batch(images) if batched else [engine.recognize(i) for i in images]
+
+    outputs: List[Optional[OCRResult]] = [None] * len(frames)
+    tight = []
+    if policy is not None and engine.capabilities.recognition_only:
+        tight = [i for i, frame in enumerate(frames) if policy.is_tight(frame)]
+    if tight:
+        for i, result in zip(tight, read([frames[i] for i in tight], crop=True)):
+            if result.text and result.confidence >= policy.min_confidence:
+                outputs[i] = result
+    rest = [i for i, output in enumerate(outputs) if output is None]
+    if rest:
+        for i, result in zip(rest, read([frames[i] for i in rest], crop=False)):
+            outputs[i] = result
+    if counts is not None:
+        kept = len(frames) - len(rest)
+        counts['crop'] += kept
+        counts['fallback'] += len(tight) - kept
+        counts['full'] += len(frames) - len(tight)
+    return outputs
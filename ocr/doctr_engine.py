@@ -1,26 +1,127 @@
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities, plate_result, polygon_box
+from utils.model_bundle import open_bundle
 import numpy as np
-from doctr.io import DocumentFile
-from doctr.models import ocr_predictor
 
 def doctr_ocr(image, doctr_predictor, clean_license_plate: Callable[[str], str], log_result: Optional[Callable[[str], None]] = None) -> OCRResult:
     if not doctr_predictor:
         return OCRResult('', 0.0, 'doctr')
     try:
-        from utils.state_filters import is_state_name_or_abbreviation
-        # Doctr expects a numpy array
-        doc = DocumentFile.from_images(np.array(image))
-        result = doctr_predictor(doc)
-        json_output = result.export()
+        return _predict(image, doctr_predictor, clean_license_plate, log_result)
+    except Exception as e:
+        error_msg = f"Doctr error: {e}"
+        print(error_msg)
+        if log_result:
+            log_result(error_msg)
+        return OCRResult('', 0.0, 'doctr')
+
+def doctr_ocr_batch(images, doctr_predictor, clean_license_plate: Callable[[str], str], log_result: Optional[Callable[[str], None]] = None) -> List[OCRResult]:
+    """Recognize several images as the pages of one document in a single predictor call."""
+    if not doctr_predictor:
+        return [OCRResult('', 0.0, 'doctr') for _ in images]
+    try:
+        return _predict_batch(images, doctr_predictor, clean_license_plate, log_result)
+    except Exception as e:
+        error_msg = f"Doctr error: {e}"
+        print(error_msg)
+        if log_result:
+            log_result(error_msg)
+        return [OCRResult('', 0.0, 'doctr') for _ in images]
+
+def _predict(image, doctr_predictor, clean_license_plate: Callable[[str], str], log_result=None) -> OCRResult:
+    from doctr.io import DocumentFile
+    # Doctr expects a numpy array
+    doc = DocumentFile.from_images(np.array(image))
+    json_output = doctr_predictor(doc).export()
+    return _best_word(json_output['pages'], clean_license_plate, log_result)
 
-        words = [word for page in json_output['pages'] for block in page['blocks'] for line in block['lines'] for word in line['words']]
+def _predict_batch(images, doctr_predictor, clean_license_plate: Callable[[str], str], log_result=None) -> List[OCRResult]:
+    pages = doctr_predictor([np.array(image) for image in images]).export()['pages']
+    return [_best_word([page], clean_license_plate, log_result) for page in pages]
+
+class DoctrEngine(BaseOCREngine):
+    name = 'doctr'
+    capabilities = EngineCapabilities(batch=True, latency_ms=600, memory_mb=700, framework='torch', color='rgb', min_height=10,
+                                      recognition_only=True)
+    profiles = {
+        'fast': {'det_arch': 'db_mobilenet_v3_large', 'reco_arch': 'crnn_mobilenet_v3_small'},
+        'balanced': {'det_arch': 'db_mobilenet_v3_large', 'reco_arch': 'crnn_mobilenet_v3_large'},
+        'accurate': {'det_arch': 'db_resnet50', 'reco_arch': 'crnn_vgg16_bn'},
+    }
+    reload_settings = ('det_arch', 'reco_arch')
+
+    def __init__(self, clean_license_plate: Optional[Callable[[str], str]] = None, log_result: Optional[Callable[[str], None]] = None,
+                 bundle=None):
+        from utils.validation import clean_license_plate as default_clean
+        self.clean_license_plate = clean_license_plate or default_clean
+        self.log_result = log_result
+        self.bundle = bundle
+        self.predictor = None
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None):
+        return cls(log_result=log_result, bundle=open_bundle(config))
+
+    @property
+    def loaded(self):
+        return self.predictor is not None
+
+    def load(self):
+        if self.predictor is None:
+            from doctr.models import ocr_predictor
+            settings = self.settings
+            det_arch, reco_arch = settings.get('det_arch', 'db_resnet50'), settings.get('reco_arch', 'crnn_vgg16_bn')
+            if self.bundle is None:
+                self.predictor = ocr_predictor(det_arch=det_arch, reco_arch=reco_arch, pretrained=True)
+                return
+            # pretrained_backbone would download ImageNet weights that the bundled ones replace anyway
+            predictor = ocr_predictor(det_arch=det_arch, reco_arch=reco_arch, pretrained=False, pretrained_backbone=False)
+            _load_weights(predictor.det_predictor.model, self.bundle.path_for('doctr', f'{det_arch}.pt'))
+            _load_weights(predictor.reco_predictor.model, self.bundle.path_for('doctr', f'{reco_arch}.pt'))
+            self.predictor = predictor
+
+    def unload(self):
+        self.predictor = None
+
+    def recognize(self, image) -> OCRResult:
+        self.load()
+        return _predict(image, self.predictor, self.clean_license_plate, self.log_result)
+
+    def recognize_batch(self, images) -> List[OCRResult]:
+        self.load()
+        return _predict_batch(images, self.predictor, self.clean_license_plate, self.log_result)
+
+    def recognize_crop(self, image) -> OCRResult:
+        return self.recognize_crop_batch([image])[0]
+
+    def recognize_crop_batch(self, images) -> List[OCRResult]:
+        self.load()
+        # The OCR predictor's own recognition stage, without the detection model in front of it
+        predictions = self.predictor.reco_predictor([np.array(image) for image in images])
+        return [plate_result(text, conf, 'doctr') for text, conf in predictions]
+
+def _load_weights(model, path: str):
+    """Load a state dict memory-mapped, so pages come from the bundle file on demand and are shared between processes."""
+    import torch
+    try:
+        state = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+        model.load_state_dict(state, assign=True)
+    except TypeError:
+        # torch < 2.1 has neither mmap loading nor assign
+        model.load_state_dict(torch.load(path, map_location='cpu'))
+
+def _best_word(pages, clean_license_plate: Callable[[str], str], log_result: Optional[Callable[[str], None]] = None) -> OCRResult:
+    try:
+        from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
+        words = [(word, page.get('dimensions')) for page in pages for block in page['blocks']
+                 for line in block['lines'] for word in line['words']]
 
         if not words:
             return OCRResult('', 0.0, 'doctr')
 
         # Find the word with the highest confidence
-        best_word = max(words, key=lambda w: w['confidence'])
+        best_word, dimensions = max(words, key=lambda w: w[0]['confidence'])
         text = best_word['value']
         conf = best_word['confidence']
 
@@ -29,7 +130,7 @@ def doctr_ocr(image, doctr_predictor, clean_license_plate: Callable[[str], str],
         if log_result:
             log_result(debug_msg)
 
-        cleaned = clean_license_plate(text)
+        cleaned = clean_license_plate(strip_jurisdiction_text(text))
         debug_cleaned = f"Doctr cleaned: '{cleaned}'"
         print(debug_cleaned)
         if log_result:
@@ -37,7 +138,7 @@ def doctr_ocr(image, doctr_predictor, clean_license_plate: Callable[[str], str],
 
         # Filter out state names/abbreviations
         if cleaned and not is_state_name_or_abbreviation(cleaned):
-            return OCRResult(cleaned, conf, 'doctr')
+            return OCRResult(cleaned, conf, 'doctr', _word_box(best_word, dimensions))
 
         return OCRResult('', 0.0, 'doctr')
     except Exception as e:
@@ -46,3 +147,10 @@ def doctr_ocr(image, doctr_predictor, clean_license_plate: Callable[[str], str],
         if log_result:
             log_result(error_msg)
         return OCRResult('', 0.0, 'doctr')
+
+def _word_box(word, dimensions):
+    """Pixel box of a word; DocTR geometry is relative to the page's (height, width)."""
+    if not dimensions or not word.get('geometry'):
+        return None
+    height, width = dimensions[:2]
+    return polygon_box([(x * width, y * height) for x, y in word['geometry']])
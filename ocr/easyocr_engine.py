@@ -1,29 +1,82 @@
 def easyocr_ocr(image, reader=None, clean_license_plate=None, log_result=None):
     engine = EasyOCREngine()
-    return engine.recognize(image, reader)
+    try:
+        return engine.recognize(image, reader)
+    except Exception:
+        return OCRResult('', 0, 'easyocr')
 from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities, plate_result, polygon_box
+from utils.model_bundle import open_bundle
 
-class EasyOCREngine:
-    def recognize(self, image, reader=None):
-        try:
+class EasyOCREngine(BaseOCREngine):
+    name = 'easyocr'
+    capabilities = EngineCapabilities(latency_ms=350, memory_mb=450, framework='torch', color='rgb', min_height=12,
+                                      recognition_only=True)
+    # Detection canvas and decoder; all apply per call, so switching never reloads the reader
+    profiles = {
+        'fast': {'canvas_size': 640, 'mag_ratio': 1.0, 'decoder': 'greedy', 'beam_width': 1},
+        'balanced': {'canvas_size': 1280, 'mag_ratio': 1.0, 'decoder': 'greedy', 'beam_width': 1},
+        'accurate': {'canvas_size': 2560, 'mag_ratio': 1.0, 'decoder': 'greedy', 'beam_width': 5},
+    }
+
+    def __init__(self, reader=None, model_dir=None):
+        """model_dir: bundled detector and recognizer weights; None lets EasyOCR use (and fill) its own cache."""
+        self.reader = reader
+        self.model_dir = model_dir
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None):
+        bundle = open_bundle(config)
+        return cls(model_dir=bundle.path_for('easyocr') if bundle is not None else None)
+
+    @property
+    def loaded(self):
+        return self.reader is not None
+
+    def load(self):
+        if self.reader is None:
             import easyocr
-            from utils.state_filters import is_state_name_or_abbreviation
-            from utils.validation import clean_license_plate
-            if reader is None:
-                reader = easyocr.Reader(['en'])
-            results = reader.readtext(image)
-            if results:
-                best_result = max(results, key=lambda x: tuple(x)[2] if len(x) > 2 else 0)
-                _, text, confidence = best_result
-                text = text.upper().replace(' ', '')
-                cleaned = clean_license_plate(text)
-                if cleaned and not is_state_name_or_abbreviation(cleaned):
-                    return OCRResult(cleaned, float(confidence), 'easyocr')
-                else:
-                    return OCRResult('', 0, 'easyocr')
+            if self.model_dir:
+                self.reader = easyocr.Reader(['en'], gpu=False, model_storage_directory=self.model_dir,
+                                             download_enabled=False)
+            else:
+                self.reader = easyocr.Reader(['en'], gpu=False)
+
+    def unload(self):
+        self.reader = None
+
+    def recognize(self, image, reader=None):
+        from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
+        from utils.validation import clean_license_plate
+        if reader is None:
+            self.load()
+            reader = self.reader
+        settings = self.settings
+        results = reader.readtext(image, decoder=settings.get('decoder', 'greedy'), beamWidth=settings.get('beam_width', 5),
+                                  canvas_size=settings.get('canvas_size', 2560), mag_ratio=settings.get('mag_ratio', 1.0))
+        if results:
+            best_result = max(results, key=lambda x: tuple(x)[2] if len(x) > 2 else 0)
+            bbox, text, confidence = best_result
+            text = strip_jurisdiction_text(text).replace(' ', '')
+            cleaned = clean_license_plate(text)
+            if cleaned and not is_state_name_or_abbreviation(cleaned):
+                return OCRResult(cleaned, float(confidence), 'easyocr', polygon_box(bbox))
             else:
                 return OCRResult('', 0, 'easyocr')
-        except ImportError:
+        else:
             return OCRResult('', 0, 'easyocr')
-        except Exception:
+
+    def recognize_crop(self, image):
+        import cv2
+        import numpy as np
+        self.load()
+        frame = np.asarray(image)
+        grey = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY) if frame.ndim == 3 else frame
+        # Without boxes, Reader.recognize reads the whole image as one text line; no CRAFT detection
+        settings = self.settings
+        results = self.reader.recognize(grey, detail=1, paragraph=False, decoder=settings.get('decoder', 'greedy'),
+                                        beamWidth=settings.get('beam_width', 5))
+        if not results:
             return OCRResult('', 0, 'easyocr')
+        _, text, confidence = max(results, key=lambda x: x[2])
+        return plate_result(text, confidence, 'easyocr')
@@ -0,0 +1,303 @@
+"""Lightweight character recognizer for clean, high-contrast screen-rendered plates.
+
+The frame is binarized with ``preprocess_image``, characters are segmented as the
+connected components of the dominant text line (touching characters are split at
+their thinnest columns), and each one is classified by
+k-nearest-neighbour cosine similarity against a glyph bank, all glyphs of a frame
+in one matrix product. The bank starts from glyphs rendered in OpenCV's built-in
+fonts and grows with readings the recognizer has confirmed (``learn``), saved to
+``GLYPH_BANK_PATH``. A frame takes a few milliseconds on one core, so it runs ahead
+of the neural engines and can settle clean frames on its own (``FAST_PATH_ENGINE``).
+"""
+import os
+import string
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities, plate_result, union_box
+from utils.image_processing import preprocess_image, resize_to_height
+
+CHARSET = string.ascii_uppercase + string.digits
+GLYPH_SIZE = 16  # glyphs are compared as GLYPH_SIZE x GLYPH_SIZE binary images
+SEED_FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_COMPLEX, cv2.FONT_HERSHEY_TRIPLEX)
+# A learned glyph this similar to one already in the bank with the same label adds nothing
+DUPLICATE_SIMILARITY = 0.97
+MAX_GLYPH_ASPECT = 1.05  # width / height; wider components are split into several characters
+CHAR_PITCH = 0.72  # typical plate character advance as a fraction of its height
+# Subtracted from a split's mean similarity per piece, so a wide letter is not read as two narrow ones (H -> II)
+SPLIT_PENALTY = 0.03
+WORKING_HEIGHT = 150  # shorter frames are upscaled to this before binarizing; thin strokes would close up otherwise
+
+Box = Tuple[int, int, int, int]
+
+
+def binarize(image) -> np.ndarray:
+    """preprocess_image output with the characters white, whichever way round the plate is printed."""
+    frame = np.asarray(image)
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    elif frame.shape[2] == 4:
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
+    if frame.shape[0] < WORKING_HEIGHT:
+        frame = resize_to_height(frame, WORKING_HEIGHT)
+    binary = preprocess_image(np.ascontiguousarray(frame))
+    # Characters cover less of a plate than its background
+    if cv2.countNonZero(binary) > binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+
+def components(binary: np.ndarray) -> List[Tuple[Box, Optional[np.ndarray]]]:
+    """Connected components of the dominant text line, left to right, as (box, mask).
+
+    mask is set for components too wide for one character, i.e. touching characters
+    (preprocess_image's closing joins tightly spaced glyphs), and None otherwise.
+    """
+    height = binary.shape[0]
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    candidates = []
+    for i, (x, y, w, h, area) in enumerate(stats[1:count], 1):
+        # Specks, the plate border and outlines are not characters
+        if h < max(8, 0.2 * height) or h > 0.95 * height or area < 0.1 * w * h or w > 12 * h:
+            continue
+        mask = labels[y:y + h, x:x + w] == i if w > MAX_GLYPH_ASPECT * h else None
+        candidates.append(((int(x), int(y), int(w), int(h)), mask))
+    if not candidates:
+        return []
+    median_height = float(np.median([box[3] for box, _ in candidates]))
+    line = [c for c in candidates if abs(c[0][3] - median_height) <= 0.25 * median_height]
+    if not line:
+        return []
+    centre = float(np.median([box[1] + box[3] / 2 for box, _ in line]))
+    line = [c for c in line if abs(c[0][1] + c[0][3] / 2 - centre) <= 0.5 * median_height]
+    return sorted(line, key=lambda c: c[0][0])
+
+
+def split(mask: np.ndarray, x0: int, y0: int, pieces: int) -> List[Box]:
+    """Cut a component into pieces at the column with the least ink near each even boundary."""
+    height, width = mask.shape
+    if pieces <= 1:
+        return [(x0, y0, width, height)]
+    profile = mask.sum(axis=0)
+    pitch = width / pieces
+    cuts = [0]
+    for k in range(1, pieces):
+        lo = max(cuts[-1] + 1, int(k * pitch - 0.35 * pitch))
+        hi = min(width - 1, int(k * pitch + 0.35 * pitch) + 1)
+        if lo < hi:
+            cuts.append(lo + int(np.argmin(profile[lo:hi])))
+    cuts.append(width)
+    boxes = []
+    for left, right in zip(cuts, cuts[1:]):
+        part = mask[:, left:right]
+        rows, cols = np.flatnonzero(part.any(axis=1)), np.flatnonzero(part.any(axis=0))
+        if len(rows):
+            boxes.append((x0 + left + int(cols[0]), y0 + int(rows[0]), int(cols[-1] - cols[0] + 1),
+                          int(rows[-1] - rows[0] + 1)))
+    return boxes
+
+
+def glyph_vectors(binary: np.ndarray, boxes: List[Box]) -> np.ndarray:
+    """(len(boxes), GLYPH_SIZE**2) zero-mean, unit-length vectors, one per character box."""
+    vectors = np.zeros((len(boxes), GLYPH_SIZE * GLYPH_SIZE), np.float32)
+    for row, (x, y, w, h) in enumerate(boxes):
+        side = max(w, h)
+        # Centre on a square canvas so narrow glyphs (1, I) keep their shape
+        canvas = np.zeros((side, side), np.uint8)
+        canvas[(side - h) // 2:(side - h) // 2 + h, (side - w) // 2:(side - w) // 2 + w] = binary[y:y + h, x:x + w]
+        vectors[row] = cv2.resize(canvas, (GLYPH_SIZE, GLYPH_SIZE), interpolation=cv2.INTER_AREA).ravel()
+    vectors -= vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-6)
+
+
+def seed_bank() -> Tuple[np.ndarray, np.ndarray]:
+    """Glyph vectors and label indices for every character in each built-in font and two stroke weights."""
+    vectors, labels = [], []
+    for font in SEED_FONTS:
+        for thickness in (2, 4):
+            for label, char in enumerate(CHARSET):
+                canvas = np.zeros((64, 64), np.uint8)
+                cv2.putText(canvas, char, (8, 52), font, 1.5, 255, thickness, cv2.LINE_AA)
+                _, binary = cv2.threshold(canvas, 127, 255, cv2.THRESH_BINARY)
+                points = cv2.findNonZero(binary)
+                if points is None:
+                    continue
+                vectors.append(glyph_vectors(binary, [cv2.boundingRect(points)])[0])
+                labels.append(label)
+    return np.array(vectors, np.float32), np.array(labels, np.int32)
+
+
+class GlyphEngine(BaseOCREngine):
+    name = 'glyph'
+    # The bank is swapped atomically on learning, so concurrent reads are safe
+    capabilities = EngineCapabilities(thread_safe=True, latency_ms=3, memory_mb=5, framework='opencv', color='any',
+                                      min_height=16, learns=True)
+
+    def __init__(self, bank_path: Optional[str] = None, k: int = 3, min_similarity: float = 0.6,
+                 per_char: int = 50, save_seconds: float = 30.0, log_result=None):
+        """
+        min_similarity: below this for any character the frame is left to the other engines.
+        per_char: learned glyphs kept per character; the oldest are dropped first.
+        """
+        self.bank_path = os.path.expanduser(bank_path) if bank_path else None
+        self.k = max(1, int(k))
+        self.min_similarity = min_similarity
+        self.per_char = per_char
+        self.save_seconds = save_seconds
+        self.log_result = log_result
+        self._bank: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._seed: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._learned_vectors = np.zeros((0, GLYPH_SIZE * GLYPH_SIZE), np.float32)
+        self._learned_labels = np.zeros(0, np.int32)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None):
+        return cls(
+            bank_path=getattr(config, 'GLYPH_BANK_PATH', None),
+            min_similarity=getattr(config, 'GLYPH_MIN_SIMILARITY', 0.6),
+            log_result=log_result,
+        )
+
+    @property
+    def loaded(self):
+        return self._bank is not None
+
+    def load(self):
+        if self._bank is not None:
+            return
+        self._seed = seed_bank()
+        if self.bank_path and os.path.exists(self.bank_path):
+            try:
+                with np.load(self.bank_path) as data:
+                    vectors, labels = data['vectors'].astype(np.float32), data['labels'].astype(np.int32)
+                if vectors.ndim == 2 and vectors.shape[1] == GLYPH_SIZE * GLYPH_SIZE and len(vectors) == len(labels):
+                    self._learned_vectors, self._learned_labels = vectors, labels
+            except (OSError, KeyError, ValueError) as e:
+                self._log(f"Glyph bank {self.bank_path} unreadable, starting from the built-in glyphs: {e}")
+        self._rebuild()
+
+    def unload(self):
+        self.save()
+        self._bank = None
+        self._seed = None
+
+    def _log(self, message: str):
+        print(message)
+        if self.log_result:
+            self.log_result(message)
+
+    def _rebuild(self):
+        seed_vectors, seed_labels = self._seed
+        self._bank = (np.concatenate([seed_vectors, self._learned_vectors]),
+                      np.concatenate([seed_labels, self._learned_labels]))
+
+    def segment(self, binary: np.ndarray) -> List[Box]:
+        """Character boxes, splitting touching characters into whichever count reads best against the bank."""
+        boxes = []
+        for box, mask in components(binary):
+            if mask is None:
+                boxes.append(box)
+                continue
+            x, y, w, h = box
+            estimate = max(1, int(round(w / (CHAR_PITCH * h))))
+            options = [split(mask, x, y, n) for n in range(max(1, estimate - 1), estimate + 2)]
+            boxes.extend(max(options, key=lambda o: self._split_score(binary, o)))
+        return boxes
+
+    def _split_score(self, binary: np.ndarray, boxes: List[Box]) -> float:
+        if not boxes:
+            return -1.0
+        return float(self.classify(glyph_vectors(binary, boxes))[1].mean()) - SPLIT_PENALTY * len(boxes)
+
+    def classify(self, vectors: np.ndarray) -> Tuple[str, np.ndarray]:
+        """Characters and their similarity scores for a stack of glyph vectors."""
+        bank_vectors, bank_labels = self._bank
+        similarity = vectors @ bank_vectors.T
+        k = min(self.k, similarity.shape[1])
+        nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        rows = np.arange(len(vectors))[:, None]
+        weights = similarity[rows, nearest]
+        votes = np.zeros((len(vectors), len(CHARSET)), np.float32)
+        np.add.at(votes, (np.broadcast_to(rows, nearest.shape), bank_labels[nearest]), np.maximum(weights, 0))
+        labels = votes.argmax(axis=1)
+        # Score each character by its closest bank glyph with the winning label
+        scores = np.where(bank_labels[nearest] == labels[:, None], weights, -1.0).max(axis=1)
+        return ''.join(CHARSET[i] for i in labels), scores
+
+    def recognize(self, image) -> OCRResult:
+        self.load()
+        binary = binarize(image)
+        boxes = self.segment(binary)
+        if not 3 <= len(boxes) <= 10:
+            return OCRResult('', 0.0, self.name)
+        # binarize and preprocess_image may have upscaled the frame
+        scale = np.asarray(image).shape[0] / binary.shape[0]
+        # Upscaling does not restore detail; characters this small match the wrong glyph confidently
+        if np.median([h for _, _, _, h in boxes]) * scale < self.capabilities.min_height:
+            return OCRResult('', 0.0, self.name)
+        text, scores = self.classify(glyph_vectors(binary, boxes))
+        confidence = float(scores.min())
+        if confidence < self.min_similarity:
+            return OCRResult('', 0.0, self.name)
+        box = union_box(boxes)
+        box = tuple(int(round(v * scale)) for v in box)
+        return plate_result(text, confidence, self.name, box)
+
+    def learn(self, image, text: str) -> bool:
+        """Add the glyphs of a confirmed reading; False if the frame does not segment into len(text) characters."""
+        if not text or any(ch not in CHARSET for ch in text):
+            return False
+        self.load()
+        binary = binarize(image)
+        boxes = self.segment(binary)
+        if len(boxes) != len(text):
+            return False
+        vectors = glyph_vectors(binary, boxes)
+        labels = np.array([CHARSET.index(ch) for ch in text], np.int32)
+        with self._lock:
+            bank_vectors, bank_labels = self._bank
+            similarity = vectors @ bank_vectors.T
+            same = bank_labels[None, :] == labels[:, None]
+            novel = np.where(same, similarity, -1.0).max(axis=1) < DUPLICATE_SIMILARITY
+            if not novel.any():
+                return True
+            learned_vectors = np.concatenate([self._learned_vectors, vectors[novel]])
+            learned_labels = np.concatenate([self._learned_labels, labels[novel]])
+            # Keep only the newest per_char glyphs of each character
+            keep = np.ones(len(learned_labels), bool)
+            for label in np.unique(labels[novel]):
+                indices = np.flatnonzero(learned_labels == label)
+                keep[indices[:-self.per_char]] = False
+            self._learned_vectors, self._learned_labels = learned_vectors[keep], learned_labels[keep]
+            self._rebuild()
+            self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_seconds:
+            self.save()
+        return True
+
+    def save(self):
+        """Write the learned glyphs to bank_path if they changed; atomically, so a crash never leaves half a file."""
+        if not self.bank_path or not self._dirty:
+            return
+        with self._lock:
+            vectors, labels = self._learned_vectors, self._learned_labels
+            self._dirty = False
+        self._saved_at = time.monotonic()
+        tmp_path = f"{self.bank_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.bank_path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, vectors=vectors, labels=labels)
+            os.replace(tmp_path, self.bank_path)
+        except OSError as e:
+            self._dirty = True
+            self._log(f"Could not save glyph bank to {self.bank_path}: {e}")
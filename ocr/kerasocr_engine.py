@@ -1,26 +1,99 @@
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities, plate_result, polygon_box, union_box
+from utils.model_bundle import open_bundle
 import numpy as np
-import keras_ocr
+
+# keras-ocr's pretrained weights ('clovaai_general' detector, 'kurapan' recognizer) under their download names
+DETECTOR_WEIGHTS = 'craft_mlt_25k.h5'
+RECOGNIZER_WEIGHTS = 'crnn_kurapan.h5'
 
 def kerasocr_ocr(image, kerasocr_pipeline, clean_license_plate: Callable[[str], str], log_result: Optional[Callable[[str], None]] = None) -> OCRResult:
+    return kerasocr_ocr_batch([image], kerasocr_pipeline, clean_license_plate, log_result)[0]
+
+def kerasocr_ocr_batch(images, kerasocr_pipeline, clean_license_plate: Callable[[str], str], log_result: Optional[Callable[[str], None]] = None) -> List[OCRResult]:
+    """Recognize several images with a single pipeline.recognize call."""
     if not kerasocr_pipeline:
-        return OCRResult('', 0.0, 'keras-ocr')
+        return [OCRResult('', 0.0, 'keras-ocr') for _ in images]
     try:
-        from utils.state_filters import is_state_name_or_abbreviation
-        # Keras-OCR expects a list of numpy arrays
-        images = [np.array(image)]
-        prediction_groups = kerasocr_pipeline.recognize(images)
+        return _predict_batch(images, kerasocr_pipeline, clean_license_plate, log_result)
+    except Exception as e:
+        error_msg = f"Keras-OCR error: {e}"
+        print(error_msg)
+        if log_result:
+            log_result(error_msg)
+        return [OCRResult('', 0.0, 'keras-ocr') for _ in images]
+
+def _predict_batch(images, kerasocr_pipeline, clean_license_plate: Callable[[str], str], log_result=None) -> List[OCRResult]:
+    # Keras-OCR expects a list of numpy arrays
+    prediction_groups = kerasocr_pipeline.recognize([np.array(image) for image in images])
+    prediction_groups = list(prediction_groups or [])
+    prediction_groups += [[]] * (len(images) - len(prediction_groups))
+    return [_best_candidate(predictions, clean_license_plate, log_result) for predictions in prediction_groups]
 
-        # We only sent one image, so we only care about the first group
-        if not prediction_groups:
-            return OCRResult('', 0.0, 'keras-ocr')
+class KerasOCREngine(BaseOCREngine):
+    name = 'keras-ocr'
+    capabilities = EngineCapabilities(batch=True, latency_ms=900, memory_mb=900, framework='tensorflow', color='rgb', min_height=12,
+                                      recognition_only=True)
+    # Detector input scaling; Pipeline reads these on every call, so no reload is needed
+    profiles = {
+        'fast': {'scale': 1, 'max_size': 1024},
+        'balanced': {'scale': 1.5, 'max_size': 1536},
+        'accurate': {'scale': 2, 'max_size': 2048},
+    }
 
-        predictions = prediction_groups[0]
+    def __init__(self, clean_license_plate: Optional[Callable[[str], str]] = None, log_result: Optional[Callable[[str], None]] = None,
+                 bundle=None):
+        from utils.validation import clean_license_plate as default_clean
+        self.clean_license_plate = clean_license_plate or default_clean
+        self.log_result = log_result
+        self.bundle = bundle
+        self.pipeline = None
 
-        if not predictions:
-            return OCRResult('', 0.0, 'keras-ocr')
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None):
+        return cls(log_result=log_result, bundle=open_bundle(config))
 
+    @property
+    def loaded(self):
+        return self.pipeline is not None
+
+    def load(self):
+        if self.pipeline is None:
+            import keras_ocr
+            if self.bundle is None:
+                self.pipeline = keras_ocr.pipeline.Pipeline()
+                return
+            # Built without weights so keras-ocr does not fetch them, then loaded from the bundle
+            detector = keras_ocr.detection.Detector(weights=None)
+            detector.model.load_weights(self.bundle.path_for('keras-ocr', DETECTOR_WEIGHTS))
+            recognizer = keras_ocr.recognition.Recognizer(weights=None)
+            recognizer.model.load_weights(self.bundle.path_for('keras-ocr', RECOGNIZER_WEIGHTS))
+            self.pipeline = keras_ocr.pipeline.Pipeline(detector=detector, recognizer=recognizer)
+
+    def unload(self):
+        self.pipeline = None
+
+    def recognize(self, image) -> OCRResult:
+        return self.recognize_batch([image])[0]
+
+    def recognize_batch(self, images) -> List[OCRResult]:
+        self.load()
+        self.pipeline.scale = self.settings.get('scale', 2)
+        self.pipeline.max_size = self.settings.get('max_size', 2048)
+        return _predict_batch(images, self.pipeline, self.clean_license_plate, self.log_result)
+
+    def recognize_crop(self, image) -> OCRResult:
+        self.load()
+        # The CRNN recognizer alone, skipping CRAFT detection; it reports no confidence
+        text = self.pipeline.recognizer.recognize(np.array(image))
+        return plate_result(text, 0.9, 'keras-ocr')
+
+def _best_candidate(predictions, clean_license_plate: Callable[[str], str], log_result: Optional[Callable[[str], None]] = None) -> OCRResult:
+    if not predictions:
+        return OCRResult('', 0.0, 'keras-ocr')
+    try:
+        from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
         candidates = []
         for pred in predictions:
             text = pred[0]
@@ -29,14 +102,14 @@ def kerasocr_ocr(image, kerasocr_pipeline, clean_license_plate: Callable[[str],
             print(debug_msg)
             if log_result:
                 log_result(debug_msg)
-            cleaned = clean_license_plate(text)
+            cleaned = clean_license_plate(strip_jurisdiction_text(text))
             debug_cleaned = f"Keras-OCR cleaned: '{cleaned}'"
             print(debug_cleaned)
             if log_result:
                 log_result(debug_cleaned)
             # Filter out state names/abbreviations and empty results
             if cleaned and not is_state_name_or_abbreviation(cleaned):
-                candidates.append((cleaned, conf))
+                candidates.append((cleaned, conf, polygon_box(pred[1]) if len(pred) > 1 else None))
 
         if candidates:
             # If two candidates, try joining them (for split plates like 'GHT' + '8670')
@@ -53,10 +126,10 @@ def kerasocr_ocr(image, kerasocr_pipeline, clean_license_plate: Callable[[str],
                 if log_result:
                     log_result(debug_cleaned)
                 if cleaned:
-                    return OCRResult(cleaned, joined_conf, 'keras-ocr')
+                    return OCRResult(cleaned, joined_conf, 'keras-ocr', union_box([candidates[0][2], candidates[1][2]]))
             # Otherwise, select the candidate with the longest cleaned text
             best = max(candidates, key=lambda x: len(x[0]))
-            return OCRResult(best[0], best[1], 'keras-ocr')
+            return OCRResult(best[0], best[1], 'keras-ocr', best[2])
 
         warn_msg = "Keras-OCR: No valid license plate candidates found."
         print(warn_msg)
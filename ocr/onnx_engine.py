@@ -0,0 +1,335 @@
+"""ONNX Runtime inference path for the neural OCR engines.
+
+Models are exported once with ``scripts/export_onnx_models.py`` into
+``<ONNX_MODEL_DIR>/<engine>/`` as ``det.onnx``, ``rec.onnx`` (plus optional
+``*.int8.onnx`` quantized copies) and a ``meta.json`` describing the
+pre/post-processing. ``OnnxOCREngine`` then runs them on CPU through
+onnxruntime without importing torch, paddle or tensorflow.
+"""
+import json
+import os
+import subprocess
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities, plate_result
+from utils.model_bundle import open_bundle
+
+ONNX_ENGINE_NAMES = ('easyocr', 'doctr', 'paddleocr')
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+def onnx_model_paths(model_dir: str, engine: str, quantized: bool = False) -> Dict[str, str]:
+    """Return the det/rec/meta file paths for an exported engine."""
+    base = os.path.join(model_dir, engine)
+    suffix = '.int8.onnx' if quantized else '.onnx'
+    return {
+        'det': os.path.join(base, 'det' + suffix),
+        'rec': os.path.join(base, 'rec' + suffix),
+        'meta': os.path.join(base, 'meta.json'),
+    }
+
+
+def onnx_model_dir(config) -> str:
+    """The bundled exports when the model bundle has any, else ONNX_MODEL_DIR."""
+    bundle = open_bundle(config)
+    if bundle is not None and bundle.has('onnx'):
+        return bundle.path_for('onnx')
+    return config.ONNX_MODEL_DIR
+
+
+def _write_meta(out_dir: str, meta: dict) -> str:
+    path = os.path.join(out_dir, 'meta.json')
+    with open(path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    return path
+
+
+def export_easyocr(reader, out_dir: str, opset: int = 13) -> str:
+    """Export an easyocr.Reader's CRAFT detector and CRNN recognizer to ONNX."""
+    import torch
+    os.makedirs(out_dir, exist_ok=True)
+    detector = getattr(reader.detector, 'module', reader.detector).eval()
+    recognizer = getattr(reader.recognizer, 'module', reader.recognizer).eval()
+
+    class _RecognizerWrapper(torch.nn.Module):
+        # EasyOCR's recognizer takes an unused ``text`` argument in CTC mode
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, x):
+            return self.model(x, None)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            detector, torch.randn(1, 3, 480, 640), os.path.join(out_dir, 'det.onnx'),
+            input_names=['input'], output_names=['score', 'feature'],
+            dynamic_axes={'input': {0: 'batch', 2: 'height', 3: 'width'}},
+            opset_version=opset,
+        )
+        torch.onnx.export(
+            _RecognizerWrapper(recognizer), torch.randn(1, 1, 64, 256), os.path.join(out_dir, 'rec.onnx'),
+            input_names=['input'], output_names=['logits'],
+            dynamic_axes={'input': {0: 'batch', 3: 'width'}, 'logits': {0: 'batch', 1: 'steps'}},
+            opset_version=opset,
+        )
+    labels = [''] + list(reader.character)
+    return _write_meta(out_dir, {
+        'engine': 'easyocr',
+        'det': {'type': 'craft', 'mean': IMAGENET_MEAN, 'std': IMAGENET_STD, 'max_side': 1280, 'threshold': 0.4},
+        'rec': {'height': 64, 'width': None, 'channels': 1, 'mean': [0.5], 'std': [0.5], 'output': 'logits'},
+        'labels': labels,
+        'blank_index': 0,
+    })
+
+
+def export_doctr(out_dir: str, det_arch: str = 'db_resnet50', reco_arch: str = 'crnn_vgg16_bn', opset: int = 14) -> str:
+    """Export pretrained DocTR detection/recognition architectures to ONNX."""
+    import torch
+    from doctr.models import detection, recognition
+    from doctr.models.utils import export_model_to_onnx
+    os.makedirs(out_dir, exist_ok=True)
+    det_model = detection.__dict__[det_arch](pretrained=True, exportable=True).eval()
+    reco_model = recognition.__dict__[reco_arch](pretrained=True, exportable=True).eval()
+    det_shape = det_model.cfg['input_shape']
+    reco_shape = reco_model.cfg['input_shape']
+    export_model_to_onnx(det_model, os.path.join(out_dir, 'det'), torch.rand((1, *det_shape)), opset_version=opset)
+    export_model_to_onnx(reco_model, os.path.join(out_dir, 'rec'), torch.rand((1, *reco_shape)), opset_version=opset)
+    vocab = reco_model.cfg['vocab']
+    return _write_meta(out_dir, {
+        'engine': 'doctr',
+        'det': {'type': 'db_logits', 'mean': det_model.cfg['mean'], 'std': det_model.cfg['std'],
+                'fixed_size': list(det_shape[1:]), 'threshold': 0.3},
+        'rec': {'height': reco_shape[1], 'width': reco_shape[2], 'channels': 3,
+                'mean': reco_model.cfg['mean'], 'std': reco_model.cfg['std'], 'output': 'logits'},
+        # CRNN heads put the CTC blank after the vocabulary
+        'labels': list(vocab) + [''],
+        'blank_index': len(vocab),
+    })
+
+
+def export_paddleocr(det_model_dir: str, rec_model_dir: str, rec_char_dict_path: str, out_dir: str, opset: int = 11) -> str:
+    """Convert PaddleOCR inference models to ONNX with the paddle2onnx CLI."""
+    os.makedirs(out_dir, exist_ok=True)
+    for model_dir, name in ((det_model_dir, 'det'), (rec_model_dir, 'rec')):
+        subprocess.run([
+            sys.executable, '-m', 'paddle2onnx',
+            '--model_dir', model_dir,
+            '--model_filename', 'inference.pdmodel',
+            '--params_filename', 'inference.pdiparams',
+            '--save_file', os.path.join(out_dir, f'{name}.onnx'),
+            '--opset_version', str(opset),
+        ], check=True)
+    with open(rec_char_dict_path, 'r', encoding='utf-8') as f:
+        chars = [line.rstrip('\n') for line in f]
+    return _write_meta(out_dir, {
+        'engine': 'paddleocr',
+        'det': {'type': 'db', 'mean': IMAGENET_MEAN, 'std': IMAGENET_STD, 'max_side': 960, 'threshold': 0.3},
+        'rec': {'height': 48, 'width': 320, 'channels': 3, 'mean': [0.5, 0.5, 0.5], 'std': [0.5, 0.5, 0.5], 'output': 'probs'},
+        # PP-OCR dictionaries are used with use_space_char=True
+        'labels': [''] + chars + [' '],
+        'blank_index': 0,
+    })
+
+
+def quantize_onnx_model(src_path: str, dst_path: Optional[str] = None) -> str:
+    """Write a dynamically int8-quantized copy of an ONNX model."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    if dst_path is None:
+        dst_path = src_path[:-len('.onnx')] + '.int8.onnx'
+    quantize_dynamic(src_path, dst_path, weight_type=QuantType.QInt8)
+    return dst_path
+
+
+def results_match(reference: OCRResult, candidate: OCRResult, tolerance: float = 0.05) -> bool:
+    """True if the ONNX result agrees with the framework result within tolerance."""
+    return reference.text == candidate.text and abs(reference.confidence - candidate.confidence) <= tolerance
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def ctc_greedy_decode(probs: np.ndarray, labels: List[str], blank_index: int) -> Tuple[str, float]:
+    """Collapse a (steps, classes) probability matrix into text and mean confidence."""
+    best = probs.argmax(axis=-1)
+    best_probs = probs.max(axis=-1)
+    chars = []
+    confs = []
+    prev = -1
+    for idx, p in zip(best, best_probs):
+        if idx != prev and idx != blank_index and idx < len(labels):
+            chars.append(labels[idx])
+            confs.append(float(p))
+        prev = idx
+    if not chars:
+        return '', 0.0
+    return ''.join(chars), float(np.mean(confs))
+
+
+class OnnxOCREngine(BaseOCREngine):
+    """Runs an exported det/rec model pair through onnxruntime on CPU."""
+    # InferenceSession.run may be called concurrently
+    capabilities = EngineCapabilities(thread_safe=True, latency_ms=80, memory_mb=150, framework='onnxruntime',
+                                      recognition_only=True)
+
+    def __init__(self, model_dir: str, source: str, quantized: bool = False, intra_op_threads: Optional[int] = None,
+                 use_detection: bool = True, log_result: Optional[Callable[[str], None]] = None):
+        self.name = source
+        self.source = f'{source}-onnx'
+        self.log_result = log_result
+        self.paths = onnx_model_paths(model_dir, source, quantized)
+        self.intra_op_threads = intra_op_threads
+        self.use_detection = use_detection
+        with open(self.paths['meta'], 'r') as f:
+            self.meta = json.load(f)
+        self.labels = self.meta['labels']
+        self.blank_index = self.meta['blank_index']
+        self.rec_session = None
+        self.det_session = None
+        self.load()
+
+    @property
+    def loaded(self):
+        return self.rec_session is not None
+
+    def load(self):
+        if self.rec_session is not None:
+            return
+        import onnxruntime as ort
+        paths = self.paths
+        intra_op_threads = self.intra_op_threads
+        use_detection = self.use_detection
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.inter_op_num_threads = 1
+        if intra_op_threads:
+            opts.intra_op_num_threads = int(intra_op_threads)
+        providers = ['CPUExecutionProvider']
+        self.rec_session = ort.InferenceSession(paths['rec'], sess_options=opts, providers=providers)
+        self.det_session = None
+        if use_detection and os.path.exists(paths['det']):
+            self.det_session = ort.InferenceSession(paths['det'], sess_options=opts, providers=providers)
+
+    def unload(self):
+        self.rec_session = None
+        self.det_session = None
+
+    def _log(self, message: str):
+        print(message)
+        if self.log_result:
+            self.log_result(message)
+
+    @staticmethod
+    def _normalize(image: np.ndarray, mean, std) -> np.ndarray:
+        x = image.astype(np.float32) / 255.0
+        x = (x - np.asarray(mean, dtype=np.float32)) / np.asarray(std, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[:, :, None]
+        return np.ascontiguousarray(x.transpose(2, 0, 1)[None])
+
+    def _detect(self, frame: np.ndarray) -> List[Tuple[np.ndarray, Optional[Tuple[int, int, int, int]]]]:
+        """Text crops with their (x, y, w, h) boxes in reading order; the whole frame if nothing is found."""
+        det = self.meta['det']
+        h, w = frame.shape[:2]
+        if det.get('fixed_size'):
+            th, tw = det['fixed_size']
+        else:
+            scale = min(1.0, det.get('max_side', 960) / max(h, w))
+            th = max(32, int(round(h * scale / 32)) * 32)
+            tw = max(32, int(round(w * scale / 32)) * 32)
+        resized = cv2.resize(frame, (tw, th))
+        outputs = self.det_session.run(None, {self.det_session.get_inputs()[0].name: self._normalize(resized, det['mean'], det['std'])})
+        if det['type'] == 'craft':
+            score = outputs[0][0, :, :, 0]
+        elif det['type'] == 'db_logits':
+            score = 1.0 / (1.0 + np.exp(-outputs[0][0, 0]))
+        else:
+            score = outputs[0][0, 0]
+        mask = (score > det.get('threshold', 0.3)).astype(np.uint8)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        sx, sy = w / score.shape[1], h / score.shape[0]
+        boxes = []
+        for contour in contours:
+            x, y, bw, bh = cv2.boundingRect(contour)
+            if bw < 2 or bh < 2:
+                continue
+            # Shrunk DB/CRAFT regions are expanded back by roughly half the text height
+            pad = int(bh * 0.5)
+            x0, y0 = max(0, int((x - pad) * sx)), max(0, int((y - pad) * sy))
+            x1, y1 = min(w, int((x + bw + pad) * sx)), min(h, int((y + bh + pad) * sy))
+            if x1 > x0 and y1 > y0:
+                boxes.append((x0, y0, x1, y1))
+        boxes.sort(key=lambda b: (b[1] // max(1, (b[3] - b[1])), b[0]))
+        return [(frame[y0:y1, x0:x1], (x0, y0, x1 - x0, y1 - y0)) for x0, y0, x1, y1 in boxes] or [(frame, None)]
+
+    def _recognize_crop(self, crop: np.ndarray) -> Tuple[str, float]:
+        rec = self.meta['rec']
+        if rec['channels'] == 1 and crop.ndim == 3:
+            crop = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        h, w = crop.shape[:2]
+        th = rec['height']
+        tw = max(1, int(round(w * th / max(1, h))))
+        if rec.get('width'):
+            tw = min(tw, rec['width'])
+        resized = cv2.resize(crop, (tw, th))
+        if rec.get('width') and tw < rec['width']:
+            pad = ((0, 0), (0, rec['width'] - tw)) + (((0, 0),) if resized.ndim == 3 else ())
+            resized = np.pad(resized, pad, mode='constant')
+        x = self._normalize(resized, rec['mean'], rec['std'])
+        out = self.rec_session.run(None, {self.rec_session.get_inputs()[0].name: x})[0][0]
+        probs = _softmax(out) if rec.get('output') == 'logits' else out
+        return ctc_greedy_decode(probs, self.labels, self.blank_index)
+
+    @staticmethod
+    def _rgb(image) -> np.ndarray:
+        frame = np.asarray(image)
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+        if frame.shape[2] == 4:
+            return cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
+        return frame
+
+    def recognize_crop(self, image) -> OCRResult:
+        self.load()
+        text, conf = self._recognize_crop(self._rgb(image))
+        return plate_result(text, conf, self.source)
+
+    def recognize(self, image) -> OCRResult:
+        from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
+        from utils.validation import clean_license_plate
+        self.load()
+        frame = self._rgb(image)
+        crops = self._detect(frame) if self.det_session is not None else [(frame, None)]
+        candidates = []
+        for crop, box in crops:
+            text, conf = self._recognize_crop(crop)
+            cleaned = clean_license_plate(strip_jurisdiction_text(text))
+            if cleaned and not is_state_name_or_abbreviation(cleaned):
+                candidates.append((cleaned, conf, box))
+        if not candidates:
+            return OCRResult('', 0.0, self.source)
+        text, conf, box = max(candidates, key=lambda c: c[1])
+        return OCRResult(text, conf, self.source, box)
+
+
+def load_onnx_engine(name: str, model_dir: str, quantized: bool = False, intra_op_threads: Optional[int] = None,
+                     log_result: Optional[Callable[[str], None]] = None) -> Optional[OnnxOCREngine]:
+    """Return an OnnxOCREngine for ``name`` if it has been exported, else None."""
+    if name not in ONNX_ENGINE_NAMES:
+        return None
+    paths = onnx_model_paths(model_dir, name, quantized)
+    if not (os.path.exists(paths['rec']) and os.path.exists(paths['meta'])):
+        return None
+    try:
+        return OnnxOCREngine(model_dir, name, quantized=quantized, intra_op_threads=intra_op_threads, log_result=log_result)
+    except ImportError:
+        return None
@@ -1,30 +1,82 @@
 from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities, plate_result, polygon_box
+from utils.model_bundle import open_bundle
 
-class PaddleOCREngine:
-    def recognize(self, image):
-        try:
+class PaddleOCREngine(BaseOCREngine):
+    name = 'paddleocr'
+    capabilities = EngineCapabilities(latency_ms=250, memory_mb=500, framework='paddle', color='rgb', min_height=10,
+                                      recognition_only=True)
+    # Detection input size and angle classification; both are fixed when PaddleOCR is built
+    profiles = {
+        'fast': {'det_limit_side_len': 320, 'use_angle_cls': False},
+        'balanced': {'det_limit_side_len': 640, 'use_angle_cls': False},
+        'accurate': {'det_limit_side_len': 960, 'use_angle_cls': True},
+    }
+    reload_settings = ('det_limit_side_len', 'use_angle_cls')
+
+    def __init__(self, cpu_threads=None, bundle=None):
+        self.cpu_threads = cpu_threads
+        self.bundle = bundle
+        self.ocr = None
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None):
+        cpu_threads = None
+        if thread_budget is not None:
+            cpu_threads = thread_budget.threads_for('paddle')
+            thread_budget.mark_configured('paddle', cpu_threads)
+        return cls(cpu_threads=cpu_threads, bundle=open_bundle(config))
+
+    @property
+    def loaded(self):
+        return self.ocr is not None
+
+    def load(self):
+        if self.ocr is None:
             from paddleocr import PaddleOCR
-            from utils.state_filters import is_state_name_or_abbreviation
-            from utils.validation import clean_license_plate
-            ocr = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
-            results = ocr.ocr(image, cls=True)
-            if results and results[0]:
-                best_result = max(results[0], key=lambda x: x[1][1])
-                text = best_result[1][0].upper().replace(' ', '')
-                confidence = best_result[1][1]
-                cleaned = clean_license_plate(text)
-                if cleaned and not is_state_name_or_abbreviation(cleaned):
-                    return OCRResult(cleaned, confidence, 'paddleocr')
-                else:
-                    return OCRResult('', 0, 'paddleocr')
+            settings = self.settings
+            kwargs = {'cpu_threads': self.cpu_threads} if self.cpu_threads else {}
+            if self.bundle is not None:
+                # PaddleOCR downloads any of the three models whose directory is empty, used or not
+                for model in ('det', 'rec', 'cls'):
+                    kwargs[f'{model}_model_dir'] = self.bundle.path_for('paddleocr', model)
+            self.ocr = PaddleOCR(use_angle_cls=settings.get('use_angle_cls', True), lang='en', show_log=False,
+                                 det_limit_side_len=settings.get('det_limit_side_len', 960), **kwargs)
+
+    def unload(self):
+        self.ocr = None
+
+    def recognize(self, image):
+        from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
+        from utils.validation import clean_license_plate
+        self.load()
+        results = self.ocr.ocr(image, cls=self.settings.get('use_angle_cls', True))
+        if results and results[0]:
+            best_result = max(results[0], key=lambda x: x[1][1])
+            text = strip_jurisdiction_text(best_result[1][0]).replace(' ', '')
+            confidence = best_result[1][1]
+            cleaned = clean_license_plate(text)
+            if cleaned and not is_state_name_or_abbreviation(cleaned):
+                return OCRResult(cleaned, confidence, 'paddleocr', polygon_box(best_result[0]))
             else:
                 return OCRResult('', 0, 'paddleocr')
-        except ImportError:
+        else:
             return OCRResult('', 0, 'paddleocr')
-        except Exception:
+
+    def recognize_crop(self, image):
+        self.load()
+        # Recognition model only: no DB text detection, no angle classifier
+        results = self.ocr.ocr(image, det=False, cls=False)
+        candidates = results[0] if results and results[0] else []
+        if not candidates:
             return OCRResult('', 0, 'paddleocr')
+        text, confidence = max(candidates, key=lambda x: x[1])
+        return plate_result(text, confidence, 'paddleocr')
 
 # Function wrapper for compatibility with main app
 def paddleocr_ocr(image, reader, clean_func, _=None):
     engine = PaddleOCREngine()
-    return engine.recognize(image)
+    try:
+        return engine.recognize(image)
+    except Exception:
+        return OCRResult('', 0, 'paddleocr')
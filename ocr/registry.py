@@ -0,0 +1,138 @@
+"""Registry of OCR engines: the built-in ones plus any installed through entry points.
+
+Third-party packages add an engine by exposing a ``BaseOCREngine`` subclass under the
+``license_plate_detector.ocr_engines`` entry-point group, e.g. in pyproject.toml::
+
+    [project.entry-points."license_plate_detector.ocr_engines"]
+    my-engine = "my_package.engine:MyEngine"
+
+Engines are referenced as ``module:Class`` and only imported when first needed, so
+listing the registry does not pull in torch or tensorflow.
+"""
+import importlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Type
+
+from ocr.base import BaseOCREngine, EngineCapabilities
+
+ENTRY_POINT_GROUP = 'license_plate_detector.ocr_engines'
+
+BUILTIN_ENGINES = {
+    'glyph': 'ocr.glyph_engine:GlyphEngine',
+    'tesseract': 'ocr.tesseract_engine:TesseractEngine',
+    'easyocr': 'ocr.easyocr_engine:EasyOCREngine',
+    'paddleocr': 'ocr.paddleocr_engine:PaddleOCREngine',
+    'doctr': 'ocr.doctr_engine:DoctrEngine',
+    'keras-ocr': 'ocr.kerasocr_engine:KerasOCREngine',
+}
+
+
+def _resolve(target: str) -> Type[BaseOCREngine]:
+    module_name, _, attr = target.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class EngineRegistry:
+    def __init__(self):
+        self._targets: Dict[str, object] = {}
+        self._classes: Dict[str, Type[BaseOCREngine]] = {}
+
+    def register(self, name: str, engine: object):
+        """Register an engine class, or a ``module:Class`` string resolved on first use."""
+        self._targets[name] = engine
+        self._classes.pop(name, None)
+
+    def discover(self, log: Optional[Callable[[str], None]] = None):
+        """Add engines advertised by installed packages; built-in names are not overridden."""
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:  # Python < 3.10
+            found = entry_points().get(ENTRY_POINT_GROUP, [])
+        for ep in found:
+            if ep.name in self._targets:
+                if log:
+                    log(f"Ignoring plugin engine {ep.name}: name already registered")
+                continue
+            self._targets[ep.name] = ep.value
+
+    def names(self) -> List[str]:
+        return list(self._targets)
+
+    def engine_class(self, name: str) -> Type[BaseOCREngine]:
+        """Import (if needed) and return the class registered under name; raises KeyError if unknown."""
+        cls = self._classes.get(name)
+        if cls is None:
+            target = self._targets[name]
+            cls = _resolve(target) if isinstance(target, str) else target
+            if not (isinstance(cls, type) and issubclass(cls, BaseOCREngine)):
+                raise TypeError(f"OCR engine {name} is not a BaseOCREngine subclass")
+            self._classes[name] = cls
+        return cls
+
+    def capabilities(self, name: str) -> EngineCapabilities:
+        return self.engine_class(name).capabilities
+
+    def create(self, name: str, config=None, thread_budget=None,
+               log_result: Optional[Callable[[str], None]] = None) -> BaseOCREngine:
+        """Build an (unloaded) engine instance."""
+        return self.engine_class(name).from_config(config, thread_budget=thread_budget, log_result=log_result)
+
+
+@dataclass
+class PlanStep:
+    name: str
+    batched: bool  # one recognize_batch call for all frames instead of one recognize per frame
+    color: str = 'any'  # input the engine is given: 'rgb', 'gray' or 'any' (frames as captured)
+    concurrent: bool = False  # may run alongside the following steps instead of before them
+
+
+def plan_execution(engines: Dict[str, BaseOCREngine], frame_count: int = 1,
+                   memory_budget_mb: Optional[float] = None) -> List[PlanStep]:
+    """Order engines cheapest first and decide per engine how to run it.
+
+    Ties in latency go to the engine that needs less memory. Thread-safe engines are
+    marked concurrent, since running them next to another engine cannot disturb
+    either. Engines that declare more memory than the whole budget are left out:
+    loading one would evict every other engine on each frame.
+    """
+    names = [name for name in engines
+             if not memory_budget_mb or engines[name].capabilities.memory_mb <= memory_budget_mb]
+    order = sorted(names, key=lambda name: (engines[name].capabilities.latency_ms, engines[name].capabilities.memory_mb))
+    return [
+        PlanStep(name, frame_count > 1 and engines[name].capabilities.batch, engines[name].capabilities.color,
+                 engines[name].capabilities.thread_safe)
+        for name in order
+    ]
+
+
+def convert_color(frame, color: str):
+    """frame (RGB, RGBA or grayscale, as captured) in the color an engine prefers."""
+    import cv2
+    import numpy as np
+    frame = np.asarray(frame)
+    if color == 'gray' and frame.ndim == 3:
+        return cv2.cvtColor(frame, cv2.COLOR_RGBA2GRAY if frame.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+    if color == 'rgb':
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+        if frame.shape[2] == 4:
+            return cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
+    return frame
+
+
+_default_registry: Optional[EngineRegistry] = None
+
+
+def get_registry() -> EngineRegistry:
+    """The process-wide registry: built-in engines plus discovered plugins."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = EngineRegistry()
+        for name, target in BUILTIN_ENGINES.items():
+            _default_registry.register(name, target)
+        try:
+            _default_registry.discover()
+        except Exception as e:
+            print(f"OCR engine plugin discovery failed: {e}")
+    return _default_registry
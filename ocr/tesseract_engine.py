@@ -1,28 +1,72 @@
 def tesseract_ocr(image, config=None, clean_license_plate=None, log_result=None):
     engine = TesseractEngine()
-    return engine.recognize(image)
+    try:
+        return engine.recognize(image)
+    except Exception:
+        return OCRResult('', 0, 'tesseract')
 from models import OCRResult
-import pytesseract
+from ocr.base import BaseOCREngine, EngineCapabilities, polygon_box, union_box
+from utils.model_bundle import open_bundle
+
+class TesseractEngine(BaseOCREngine):
+    name = 'tesseract'
+    # Runs as a subprocess per call, so it is safe to call concurrently
+    capabilities = EngineCapabilities(thread_safe=True, latency_ms=150, memory_mb=50, framework='openmp',
+                                      color='any', min_height=20)
+    # oem 1 is the LSTM engine alone; oem 3 lets tesseract also consult the legacy engine when installed
+    profiles = {
+        'fast': {'oem': 1, 'psm': 8, 'max_height': 48},
+        'balanced': {'oem': 1, 'psm': 8, 'max_height': None},
+        'accurate': {'oem': 3, 'psm': 8, 'max_height': None},
+    }
+
+    def __init__(self, tessdata_dir=None):
+        """tessdata_dir: bundled traineddata; None uses the system install's."""
+        self.tessdata_dir = tessdata_dir
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None):
+        bundle = open_bundle(config)
+        # Tesseract never downloads, so a bundle without traineddata just leaves it on the system's
+        return cls(tessdata_dir=bundle.path_for('tesseract') if bundle is not None and bundle.has('tesseract') else None)
+
+    def load(self):
+        # Fail at load time rather than returning empty results for every frame
+        import pytesseract  # noqa: F401
 
-class TesseractEngine:
     def recognize(self, image):
-        try:
-            from utils.state_filters import is_state_name_or_abbreviation
-            from utils.validation import clean_license_plate
-            custom_config = r'--oem 3 --psm 8 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-            data = pytesseract.image_to_data(image, config=custom_config, output_type=pytesseract.Output.DICT)
-            text_parts = []
-            confidences = []
-            for i in range(len(data['text'])):
-                if int(data['conf'][i]) > 0:
-                    text_parts.append(data['text'][i])
-                    confidences.append(int(data['conf'][i]))
-            text = ''.join(text_parts).strip()
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            cleaned = clean_license_plate(text)
-            if cleaned and not is_state_name_or_abbreviation(cleaned):
-                return OCRResult(cleaned, avg_confidence / 100, 'tesseract')
-            else:
-                return OCRResult('', 0, 'tesseract')
-        except Exception:
+        import pytesseract
+        from utils.state_filters import is_state_name_or_abbreviation, strip_jurisdiction_text
+        from utils.validation import clean_license_plate
+        settings = self.settings
+        max_height = settings.get('max_height')
+        scale = 1.0
+        if max_height:
+            import numpy as np
+            from utils.image_processing import resize_to_height
+            frame = np.asarray(image)
+            if frame.shape[0] > max_height:
+                scale = frame.shape[0] / max_height
+                image = resize_to_height(frame, max_height)
+        custom_config = (f"--oem {settings.get('oem', 3)} --psm {settings.get('psm', 8)} "
+                         "-c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+        if self.tessdata_dir:
+            import shlex
+            custom_config += f" --tessdata-dir {shlex.quote(self.tessdata_dir)}"
+        data = pytesseract.image_to_data(image, config=custom_config, output_type=pytesseract.Output.DICT)
+        text_parts = []
+        confidences = []
+        boxes = []
+        for i in range(len(data['text'])):
+            if int(data['conf'][i]) > 0:
+                text_parts.append(data['text'][i])
+                confidences.append(int(data['conf'][i]))
+                x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
+                boxes.append(polygon_box([(x, y), (x + w, y + h)], scale))
+        text = strip_jurisdiction_text(' '.join(text_parts))
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+        cleaned = clean_license_plate(text)
+        if cleaned and not is_state_name_or_abbreviation(cleaned):
+            return OCRResult(cleaned, avg_confidence / 100, 'tesseract', union_box(boxes))
+        else:
             return OCRResult('', 0, 'tesseract')
@@ -0,0 +1,202 @@
+"""Timeouts and circuit breakers around OCR engine calls.
+
+Each engine runs on its own thread (``EngineGuard``), so a call that hangs can be
+abandoned after ``timeout`` seconds instead of stalling recognition. Errors,
+timeouts and calls slower than ``slow_seconds`` per frame count as failures. The
+engine's ``CircuitBreaker`` opens after ``failure_threshold`` failures in a row, or when the
+failure rate over the last ``window`` calls reaches ``error_rate``. While it is open
+the engine is skipped. After ``cooldown`` seconds one probe call is let through:
+success closes the breaker, failure reopens it with the cooldown doubled (up to
+``max_cooldown``).
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Optional, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, error_rate: float = 0.5, window: int = 20,
+                 cooldown: float = 30.0, max_cooldown: float = 600.0, slow_seconds: Optional[float] = None,
+                 log: Optional[Callable[[str], None]] = None, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.log = log
+        self.clock = clock
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.retry_at = 0.0
+        self.consecutive_failures = 0
+        self.calls = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._outcomes = deque(maxlen=max(1, int(window)))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, name: str, config, log: Optional[Callable[[str], None]] = None) -> 'CircuitBreaker':
+        return cls(
+            name,
+            failure_threshold=getattr(config, 'ENGINE_BREAKER_FAILURES', 3),
+            error_rate=getattr(config, 'ENGINE_BREAKER_ERROR_RATE', 0.5),
+            window=getattr(config, 'ENGINE_BREAKER_WINDOW', 20),
+            cooldown=getattr(config, 'ENGINE_BREAKER_COOLDOWN_SECONDS', 30.0),
+            slow_seconds=getattr(config, 'ENGINE_SLOW_SECONDS', None),
+            log=log,
+        )
+
+    def allow(self) -> bool:
+        """Whether the engine should be called now; lets one probe through once the cooldown is over."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.retry_at:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self, seconds: float):
+        if self.slow_seconds is not None and seconds > self.slow_seconds:
+            self.record_failure(f"slow call ({seconds:.1f}s)")
+            return
+        with self._lock:
+            self.calls += 1
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.cooldown = self.base_cooldown
+                self._log(f"{self.name} recovered; back in rotation")
+
+    def record_failure(self, reason: str):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.last_error = reason
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open(f"probe failed: {reason}")
+            elif self.state == CLOSED and self._should_open():
+                self._open(reason)
+
+    def _should_open(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        # The rate only counts once the window holds enough calls to mean something
+        if len(self._outcomes) >= self._outcomes.maxlen // 2:
+            return self._outcomes.count(False) / len(self._outcomes) >= self.error_rate
+        return False
+
+    def _open(self, reason: str):
+        self.state = OPEN
+        self.retry_at = self.clock() + self.cooldown
+        self._outcomes.clear()
+        self._log(f"{self.name} taken out of rotation for {self.cooldown:.0f}s: {reason}")
+
+    def _log(self, message: str):
+        if self.log:
+            self.log(message)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'calls': self.calls,
+                'failures': self.failures,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in': max(0.0, self.retry_at - self.clock()) if self.state == OPEN else 0.0,
+                'last_error': self.last_error,
+            }
+
+
+class EngineGuard:
+    """Runs one engine's calls on a dedicated thread, with a timeout, behind its circuit breaker."""
+    def __init__(self, name: str, breaker: CircuitBreaker, timeout: Optional[float] = None):
+        self.name = name
+        self.breaker = breaker
+        self.timeout = timeout
+        self.timeouts = 0
+        self._calls = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Optional[Future] = None
+
+    def _run(self):
+        while True:
+            item = self._calls.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    @property
+    def busy(self) -> bool:
+        """A call that timed out is still running on the engine thread."""
+        return self._pending is not None and not self._pending.done()
+
+    def allow(self) -> bool:
+        # Never queue behind a hung call; it also still holds the engine
+        return not self.busy and self.breaker.allow()
+
+    def call(self, fn: Callable, *args, frames: int = 1):
+        """fn(*args) on the engine thread; None (recorded as a failure) if it raised or timed out."""
+        return self.wait(self.submit(fn, *args), frames=frames)
+
+    def submit(self, fn: Callable, *args) -> Tuple[Future, float]:
+        """Start fn(*args) on the engine thread without waiting; pass the result to wait()."""
+        if self._thread is None:
+            # Daemon, unlike a ThreadPoolExecutor worker, so a hung engine cannot block interpreter exit
+            self._thread = threading.Thread(target=self._run, name=f'ocr-{self.name}', daemon=True)
+            self._thread.start()
+        self._pending = Future()
+        self._calls.put((self._pending, fn, args))
+        return self._pending, time.perf_counter()
+
+    def wait(self, call: Tuple[Future, float], frames: int = 1):
+        """Result of a submitted call, with the timeout counted from when it was submitted."""
+        future, start = call
+        timeout = self.timeout * max(1, frames) if self.timeout else None
+        try:
+            result = future.result(max(0.0, start + timeout - time.perf_counter()) if timeout else None)
+        except FutureTimeout:
+            self.timeouts += 1
+            self.breaker.record_failure(f"timed out after {timeout:.1f}s")
+            return None
+        except Exception as e:
+            self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            return None
+        self.breaker.record_success((time.perf_counter() - start) / max(1, frames))
+        return result
+
+    def record_failure(self, reason: str):
+        self.breaker.record_failure(reason)
+
+    def snapshot(self) -> dict:
+        snapshot = self.breaker.snapshot()
+        snapshot['timeouts'] = self.timeouts
+        snapshot['busy'] = self.busy
+        return snapshot
+
+    def close(self, timeout: Optional[float] = 1.0):
+        """Stop the engine thread, waiting up to timeout for it to exit; a hung call is left behind."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._calls.put(None)
+            thread.join(timeout)
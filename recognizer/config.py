@@ -0,0 +1,96 @@
+# Recognizer configuration for License Plate Detector.
+# Kept free of heavy imports so main.py can read it before numpy or any ML framework loads.
+
+
+class CONFIGURATION:
+    MODEL_PATH = 'models/'
+    CONFIDENCE_THRESHOLD = 0.7
+    AGREEMENT_THRESHOLD = 0.5
+    ENABLED_ENGINES = ['glyph', 'tesseract', 'easyocr', 'paddleocr', 'doctr', 'keras-ocr']
+    # A reading from this engine at or above FAST_PATH_MIN_CONFIDENCE (and a valid plate format) settles the frame
+    # without running the others, e.g. 'glyph' for clean screen-rendered plates; None runs every engine on every frame
+    FAST_PATH_ENGINE = None
+    FAST_PATH_MIN_CONFIDENCE = 0.9
+    # Glyph engine (ocr/glyph_engine.py): learned glyphs are kept here; None keeps them in memory only
+    GLYPH_BANK_PATH = None  # e.g. '~/.license_plate_detector_glyphs.npz'
+    GLYPH_MIN_SIMILARITY = 0.6  # frames with a character matched below this are left to the other engines
+    # Resolution cascade: read a downscaled crop first, re-run at full (or upscaled) size only when it falls short
+    RESOLUTION_CASCADE = False
+    CASCADE_COARSE_HEIGHT = 32  # raised to the tallest min_height an enabled engine declares
+    CASCADE_FINE_MIN_HEIGHT = 50  # shorter frames are upscaled to this on the fine pass
+    # ROI tracking (recognizer/tracker.py): follow a plate moving inside a region and read only a crop around it
+    ROI_TRACKING = False
+    ROI_TRACKING_MIN_SCORE = 0.6  # template match score below which the region is read in full again
+    ROI_TRACKING_SEARCH_MARGIN = 0.5  # search this fraction of the plate's size around its last position
+    ROI_TRACKING_REDETECT_EVERY = 30  # tracked frames between full reads of the region
+    ROI_TRACKING_VOTE_WINDOW = 15  # readings per track in the confidence-weighted vote
+    # Burst capture: a reading below threshold triggers an immediate burst of frames, resolved together
+    BURST_FRAMES = 0  # extra frames per burst, e.g. 3; 0 disables
+    BURST_SPACING_MS = 40  # between burst captures
+    # Plate-format grammar used to correct confusable characters before consensus (utils/plate_grammar.py).
+    # Off by default: PLATE_FORMATS must cover the plates actually scanned, or other plates get 'corrected' into them
+    PLATE_GRAMMAR_ENABLED = False
+    PLATE_FORMATS = None  # None = utils.plate_grammar.DEFAULT_FORMATS; or {'TX': ['LLLDDDD'], ...}
+    # Detection history database (utils/history_store.py); None disables it
+    HISTORY_DB_PATH = None  # e.g. '~/.license_plate_detector_history.db'
+    HISTORY_RETENTION_DAYS = 90
+    HISTORY_MAX_ROWS = 1_000_000
+    HISTORY_BATCH_SIZE = 256
+    HISTORY_FLUSH_SECONDS = 1.0
+    # Hotlist of plates to flag (utils/watchlist.py): text or CSV, plate in the first column, optional note in the second
+    WATCHLIST_PATH = None
+    WATCHLIST_MAX_DISTANCE = 1  # OCR character errors tolerated when matching (0-2); 2 needs ~3.5x the index memory
+    WATCHLIST_RELOAD_SECONDS = 30.0
+    # Model profile per engine: 'fast', 'balanced' or 'accurate' (each library's default models); switchable in the GUI
+    ENGINE_PROFILE = 'accurate'
+    ENGINE_PROFILE_OVERRIDES = {}  # e.g. {'doctr': 'fast'}
+    # Recognition-only mode: plate-sized crops skip text detection and angle classification (ocr/base.CropPolicy)
+    CROP_MODE = 'never'  # 'never', 'auto' (by crop geometry) or 'always'
+    CROP_MODE_ASPECT = (1.5, 6.0)  # width/height range treated as a tight plate crop
+    CROP_MODE_MAX_HEIGHT = 200
+    CROP_MODE_MIN_CONFIDENCE = 0.5  # below this the frame is read again with full detection
+    # Per-engine timeouts and circuit breakers (recognizer/breaker.py)
+    ENGINE_TIMEOUT_SECONDS = 20.0  # per frame; a hung call is abandoned after this. None disables
+    ENGINE_SLOW_SECONDS = None  # calls slower than this per frame count as failures
+    ENGINE_BREAKER_FAILURES = 3  # failures in a row that take an engine out of rotation
+    ENGINE_BREAKER_ERROR_RATE = 0.5  # ...or this failure rate over the last ENGINE_BREAKER_WINDOW calls
+    ENGINE_BREAKER_WINDOW = 20
+    ENGINE_BREAKER_COOLDOWN_SECONDS = 30.0  # before the first probe; doubles after each failed probe
+    # Model residency (recognizer/residency.py): None = keep every engine loaded
+    MEMORY_BUDGET_MB = None  # e.g. 2048 to keep at most ~2 GB of OCR models resident
+    ENGINE_IDLE_EVICT_SECONDS = None  # unload engines unused for this long
+    # Run each engine in its own process, fed frames through shared memory (recognizer/engine_workers.py)
+    ENGINE_WORKER_PROCESSES = False
+    ENGINE_WORKER_SLOTS = 8
+    ENGINE_WORKER_SLOT_BYTES = 8 * 1024 * 1024  # largest single region image, in bytes (a 1080p RGB region is 6.2 MB)
+    # Shared recognition service (scripts/recognition_service.py); clients fall back to in-process engines
+    RECOGNITION_SERVICE_URL = None  # e.g. 'http://127.0.0.1:8765'
+    SERVICE_HOST = '127.0.0.1'
+    SERVICE_PORT = 8765
+    SERVICE_BATCH_WINDOW_MS = 5.0
+    SERVICE_MAX_BATCH = 16
+    SERVICE_MAX_CONCURRENT = 32
+    SERVICE_MAX_PER_CLIENT = 4
+    # Frame record/replay ring file for reproducing misreads (utils/frame_recorder.py, scripts/replay_frames.py)
+    FRAME_RECORDER_PATH = None  # e.g. '~/.license_plate_detector_frames.ring'
+    FRAME_RECORDER_SLOTS = 256
+    FRAME_RECORDER_SLOT_BYTES = 512 * 1024  # per frame plus its results; larger regions are skipped (logged once)
+    # ONNX Runtime path for the neural engines (export with scripts/export_onnx_models.py)
+    USE_ONNX_RUNTIME = False
+    ONNX_MODEL_DIR = 'models/onnx'
+    ONNX_QUANTIZED = False
+    # Offline model bundle (utils/model_bundle.py, build with scripts/build_model_bundle.py). When set, engines load
+    # only from it and never download; None uses each library's own cache
+    MODEL_BUNDLE_PATH = None  # e.g. 'models/bundle'
+    MODEL_BUNDLE_VERIFY = 'quick'  # 'quick' re-hashes only files changed since the last check, 'full' every file, None skips
+    # CPU thread budget shared by all ML runtimes (see utils/thread_budget.py)
+    THREAD_BUDGET_TOTAL = None  # None = all logical cores
+    THREAD_BUDGET_SHARES = None  # e.g. {'torch': 0.5, 'tensorflow': 0.25, 'paddle': 0.25}
+    THREAD_BUDGET_INTER_OP = 1
+    ENGINE_CORE_AFFINITY = {}  # e.g. {'easyocr': [0, 1], 'keras-ocr': [2, 3]}
+    # Keystroke-mode insertion (see automation/insertion.py)
+    INSERTION_STRATEGY = 'type'  # 'type', or 'paste' (faster, but briefly replaces the clipboard, then restores it)
+    INSERTION_CLICK_SETTLE = 0.05
+    INSERTION_SELECT_SETTLE = 0.02
+    INSERTION_PASTE_SETTLE = 0.05
+    INSERTION_TYPING_INTERVAL = 0.0
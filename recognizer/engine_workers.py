@@ -0,0 +1,268 @@
+"""OCR engines in worker processes, fed through shared-memory frames.
+
+Each enabled engine runs in its own process with its own thread budget. A frame
+batch is copied once into a ``SharedFrameTransport``. Every worker reads it as a
+numpy view and returns only its small ``OCRResult`` list.
+
+Each worker sits behind the same kind of circuit breaker as an in-process engine
+(recognizer/breaker.py), with ``ENGINE_TIMEOUT_SECONDS`` per frame. A worker that
+times out keeps running but gets no new frames until it answers, and the frame
+slots it holds are taken back. An engine whose breaker is open is skipped.
+"""
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+import types
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import OCRResult
+from recognizer.breaker import HALF_OPEN, CircuitBreaker
+
+STOP = 'stop'
+WORKER_CHECK_SECONDS = 1.0  # how often a waiting run() checks that its workers are still alive
+
+
+def config_snapshot(config) -> types.SimpleNamespace:
+    """Picklable copy of the upper-case settings, including any changed at runtime."""
+    return types.SimpleNamespace(**{key: getattr(config, key) for key in dir(config) if key.isupper()})
+
+
+def _worker_main(transport, consumer: int, name: str, config, results):
+    # OMP_NUM_THREADS and friends are inherited from the parent, which applied the budget at startup
+    from utils.thread_budget import ThreadBudget
+    thread_budget = ThreadBudget.from_config(config)
+    # Before the engine's framework loads, so every thread it starts inherits the core set
+    thread_budget.pin_process(name)
+    from ocr.base import CropPolicy, run_engine
+    from ocr.registry import get_registry
+    try:
+        engine = None
+        if getattr(config, 'USE_ONNX_RUNTIME', False):
+            from ocr.onnx_engine import load_onnx_engine, onnx_model_dir
+            engine = load_onnx_engine(name, onnx_model_dir(config), quantized=config.ONNX_QUANTIZED,
+                                      intra_op_threads=thread_budget.threads_for('onnxruntime'))
+        if engine is None:
+            registry = get_registry()
+            thread_budget.configure_framework(registry.capabilities(name).framework)
+            engine = registry.create(name, config, thread_budget=thread_budget)
+        engine.load()
+    except Exception as e:
+        results.put((None, name, f"{type(e).__name__}: {e}"))
+        return
+    batch = engine.capabilities.batch
+    crop_policy = CropPolicy.from_config(config)
+    results.put((None, name, None))
+    while True:
+        message = transport.receive(consumer, timeout=1.0)
+        if message is None:
+            continue
+        descriptors, request_id = message
+        if request_id == STOP:
+            break
+        try:
+            with transport.frames(descriptors, consumer) as frames:
+                outputs = run_engine(engine, frames, batch and len(frames) > 1, crop_policy)
+        except Exception as e:
+            # No results rather than empty ones, so the engine does not count towards agreement
+            outputs = None
+            print(f"{name} worker error: {e}")
+        results.put((request_id, name, outputs))
+    transport.close()
+
+
+class EngineWorkerPool:
+    def __init__(self, config, engine_names: List[str], slot_count: int = 8, slot_size: int = 8 * 1024 * 1024,
+                 start_timeout: float = 300.0, log=None):
+        from utils.shm_frames import SharedFrameTransport
+        ctx = multiprocessing.get_context('spawn')
+        self.engine_names = list(engine_names)
+        self.log = log
+        self.breakers = {name: CircuitBreaker.from_config(name, config, log=self._log) for name in self.engine_names}
+        self.engine_timeout = getattr(config, 'ENGINE_TIMEOUT_SECONDS', None)
+        self.timeouts = {name: 0 for name in self.engine_names}
+        # Engine -> request it has not answered yet after timing out; it gets no frames until it does
+        self._outstanding: Dict[str, int] = {}
+        self.transport = SharedFrameTransport(len(self.engine_names), slot_count, slot_size, ctx=ctx)
+        self._results = ctx.Queue()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, dict] = {}
+        self._cond = threading.Condition()
+        self._copy_logged = False
+        snapshot = config_snapshot(config)
+        self._processes = [
+            ctx.Process(target=_worker_main, args=(self.transport, i, name, snapshot, self._results),
+                        name=f'ocr-{name}', daemon=True)
+            for i, name in enumerate(self.engine_names)
+        ]
+        for process in self._processes:
+            process.start()
+        self.ready = self._wait_ready(start_timeout)
+        for i, name in enumerate(self.engine_names):
+            if name not in self.ready:
+                self.transport.detach(i)
+        self._collector = threading.Thread(target=self._collect, name='engine-results', daemon=True)
+        self._collector.start()
+
+    def _log(self, message: str):
+        print(message)
+        if self.log:
+            self.log(message)
+
+    def _wait_ready(self, timeout: float) -> List[str]:
+        ready, waiting = [], set(self.engine_names)
+        deadline = time.monotonic() + timeout
+        while waiting:
+            try:
+                _, name, error = self._results.get(timeout=1.0)
+            except queue.Empty:
+                crashed = [p.name[len('ocr-'):] for p in self._processes if not p.is_alive()]
+                for name in waiting.intersection(crashed):
+                    self._log(f"{name} worker exited during startup")
+                waiting.difference_update(crashed)
+                if time.monotonic() > deadline:
+                    self._log(f"Engine workers did not start: {', '.join(sorted(waiting))}")
+                    break
+                continue
+            waiting.discard(name)
+            if error:
+                self._log(f"Failed to load {name} worker: {error}")
+            else:
+                ready.append(name)
+        return [name for name in self.engine_names if name in ready]
+
+    def _collect(self):
+        while True:
+            try:
+                request_id, name, outputs = self._results.get()
+            except (EOFError, OSError):
+                return
+            with self._cond:
+                if self._outstanding.get(name) == request_id:
+                    del self._outstanding[name]
+                pending = self._pending.get(request_id)
+                if pending is not None:
+                    pending[name] = outputs
+                    self._cond.notify_all()
+
+    def _reap(self) -> bool:
+        """Drop workers that have died since the last check and free the frame slots they held."""
+        dead = [i for i, name in enumerate(self.engine_names)
+                if name in self.ready and not self._processes[i].is_alive()]
+        for i in dead:
+            name = self.engine_names[i]
+            self.ready = [n for n in self.ready if n != name]
+            freed = self.transport.drop(i)
+            self._log(f"{name} worker exited (code {self._processes[i].exitcode}); "
+                      f"continuing without it, {freed} frame slots freed")
+        if dead:
+            with self._cond:
+                self._cond.notify_all()
+        return bool(dead)
+
+    def _allow(self, name: str) -> bool:
+        # Never queue behind a request the worker is still stuck on
+        with self._cond:
+            if name in self._outstanding:
+                return False
+        return self.breakers[name].allow()
+
+    def run(self, frames, timeout: float = 60.0) -> Optional[List[List[OCRResult]]]:
+        """Per-frame results from every ready engine whose breaker allows it, or None if the ring stayed full.
+
+        Engines are given ENGINE_TIMEOUT_SECONDS per frame (timeout overall if that is not set).
+        """
+        self._reap()
+        names = [name for name in self.ready if self._allow(name)]
+        for i, name in enumerate(self.engine_names):
+            if name in names:
+                self.transport.attach(i)
+            elif name in self.ready:
+                self.transport.detach(i)
+        if not names:
+            return [[] for _ in frames]
+        if self.engine_timeout:
+            timeout = min(timeout, self.engine_timeout * max(1, len(frames)))
+        request_id = next(self._ids)
+        with self._cond:
+            self._pending[request_id] = {}
+        start = time.monotonic()
+        deadline = start + timeout
+        try:
+            # Short waits, so a worker that dies while the ring is full or mid-request is noticed
+            while self.transport.send(frames, request_id, timeout=min(WORKER_CHECK_SECONDS, timeout)) is None:
+                if not self._reap() and time.monotonic() >= deadline:
+                    for name in names:
+                        # A probe that was never sent must not leave its breaker half-open
+                        if self.breakers[name].state == HALF_OPEN:
+                            self.breakers[name].record_failure("frame ring full")
+                    return None
+                if not self.ready:
+                    return [[] for _ in frames]
+            if self.transport.copied and not self._copy_logged:
+                self._copy_logged = True
+                largest = max(np.asarray(frame).nbytes for frame in frames)
+                self._log(f"Frame of {largest} bytes does not fit a {self.transport.slot_size}-byte worker slot; "
+                          f"copying it to the workers instead (raise ENGINE_WORKER_SLOT_BYTES to avoid this)")
+            while True:
+                with self._cond:
+                    done = self._cond.wait_for(
+                        lambda: all(n in self._pending[request_id] or n not in self.ready for n in names),
+                        min(WORKER_CHECK_SECONDS, max(0.0, deadline - time.monotonic())))
+                    by_engine = dict(self._pending[request_id])
+                if done or (not self._reap() and time.monotonic() >= deadline):
+                    break
+        finally:
+            with self._cond:
+                self._pending.pop(request_id, None)
+        seconds = time.monotonic() - start
+        alive = [name for name in names if name in self.ready]
+        late = [name for name in alive if name not in by_engine]
+        for name in alive:
+            if name in late:
+                self._time_out(name, request_id, timeout)
+            elif by_engine[name] is None:
+                self.breakers[name].record_failure("worker error")
+            else:
+                self.breakers[name].record_success(seconds / max(1, len(frames)))
+        if late:
+            self._log(f"Engine workers timed out after {timeout:.1f}s: {', '.join(late)}")
+        per_frame: List[List[OCRResult]] = [[] for _ in frames]
+        for name in alive:
+            for results, output in zip(per_frame, by_engine.get(name) or []):
+                results.append(output)
+        return per_frame
+
+    def _time_out(self, name: str, request_id: int, timeout: float):
+        """Count a late answer as a failure and take back the frame slots the worker still holds."""
+        self.timeouts[name] += 1
+        self.breakers[name].record_failure(f"timed out after {timeout:.1f}s")
+        with self._cond:
+            self._outstanding[name] = request_id
+        # The worker may still be reading them; whatever it returns for this request is ignored
+        self.transport.drop(self.engine_names.index(name))
+
+    def breaker_states(self) -> Dict[str, dict]:
+        states = {}
+        for name in self.engine_names:
+            state = self.breakers[name].snapshot()
+            state['timeouts'] = self.timeouts[name]
+            with self._cond:
+                state['busy'] = name in self._outstanding
+            if name not in self.ready:
+                state['state'] = 'exited'
+            states[name] = state
+        return states
+
+    def close(self):
+        for i, name in enumerate(self.engine_names):
+            if name in self.ready:
+                self.transport.notify(i, STOP)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.transport.close()
@@ -1,33 +1,362 @@
 # Recognizer configuration and main recognizer class for License Plate Detector (PyQt version)
+from collections import Counter
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from automation.screen import ScreenAutomation
+from models import OCRResult, RecognitionResult
+from ocr.base import BaseOCREngine, CropPolicy, run_engine
+from ocr.registry import EngineRegistry, convert_color, get_registry, plan_execution
+from recognizer.breaker import CircuitBreaker, EngineGuard
+from recognizer.config import CONFIGURATION
+from recognizer.residency import ResidencyManager
+from recognizer.tracker import RoiTracker, plate_box
+from utils.frame_recorder import open_recorder
+from utils.image_processing import resize_to_height
+from utils.model_bundle import BundleError, open_bundle
+from utils.plate_grammar import PlateGrammar, grammar_from_config
+from utils.thread_budget import ThreadBudget
+from utils.validation import combine_results, get_consensus_result
 
-class CONFIGURATION:
-    # Placeholder for configuration settings
-    # Add actual configuration fields as needed
-    MODEL_PATH = 'models/'
-    CONFIDENCE_THRESHOLD = 0.7
-    # ... add more as needed
 
 class LicensePlateRecognizer:
-    def __init__(self, config=None):
+    def __init__(self, config=None, log_result: Optional[Callable[[str], None]] = None,
+                 thread_budget: Optional[ThreadBudget] = None, registry: Optional[EngineRegistry] = None):
         self.config = config or CONFIGURATION()
-        # Initialize OCR engines, models, etc. here
-        # ...
+        self.log_result = log_result
+        self.thread_budget = thread_budget or ThreadBudget.from_config(self.config)
+        self.grammar: Optional[PlateGrammar] = grammar_from_config(self.config)
+        self.recorder = open_recorder(self.config, log=self._log)
+        self.bundle = self._open_bundle()
+        self.registry = registry or get_registry()
+        self.engines: Dict[str, BaseOCREngine] = {}
+        self.guards: Dict[str, EngineGuard] = {}
+        self.crop_policy = CropPolicy.from_config(self.config)
+        # Per engine: frames read with recognition only ('crop'), redone with detection ('fallback'), or 'full'
+        self.crop_counts: Dict[str, Counter] = {}
+        self.residency = ResidencyManager.from_config(self.config, log=self._log)
+        # Set when engines run in worker processes (ENGINE_WORKER_PROCESSES)
+        self.workers = None
+        self._load_engines()
+        self.coarse_height, self.fine_min_height = self._cascade_heights()
+        # How many results were decided at each resolution pass
+        self.resolution_counts = Counter()
+        self.tracker = RoiTracker.from_config(self.config)
+        self.fast_path = getattr(self.config, 'FAST_PATH_ENGINE', None)
+        self.fast_path_min_confidence = getattr(self.config, 'FAST_PATH_MIN_CONFIDENCE', 0.9)
+        # Frames the fast-path engine settled on its own
+        self.fast_path_count = 0
+        for line in self.thread_budget.report():
+            self._log(line)
+
+    def _log(self, message: str):
+        print(message)
+        if self.log_result:
+            self.log_result(message)
+
+    def _open_bundle(self):
+        try:
+            return open_bundle(self.config, log=self._log)
+        except BundleError as e:
+            # Each engine fails to load with the same error; none falls back to downloading
+            self._log(str(e))
+            return None
+
+    def _load_engines(self):
+        self.thread_budget.configure_framework('opencv')
+        if getattr(self.config, 'ENGINE_WORKER_PROCESSES', False):
+            from recognizer.engine_workers import EngineWorkerPool
+            self.workers = EngineWorkerPool(
+                self.config, list(self.config.ENABLED_ENGINES),
+                slot_count=getattr(self.config, 'ENGINE_WORKER_SLOTS', 8),
+                slot_size=getattr(self.config, 'ENGINE_WORKER_SLOT_BYTES', 8 * 1024 * 1024),
+                log=self.log_result,
+            )
+            self._log(f"OCR engine worker processes: {', '.join(self.workers.ready) or 'none'}")
+            return
+        for name in self.config.ENABLED_ENGINES:
+            try:
+                engine = self._load_engine(name)
+                if engine is None:
+                    continue
+                self.residency.register(name, engine)
+                budget = self.residency.budget_mb
+                if budget and engine.capabilities.memory_mb > budget:
+                    self._log(f"{name} needs {engine.capabilities.memory_mb:.0f} MB, more than the whole memory "
+                              f"budget of {budget:.0f} MB; it will not be run")
+                elif budget and self.residency.resident_mb() + engine.capabilities.memory_mb > budget:
+                    self._log(f"Deferring {name} until first use (memory budget {budget:.0f} MB)")
+                else:
+                    self.residency.ensure(name)
+            except Exception as e:
+                self.residency.remove(name)
+                self._log(f"Failed to load {name}: {e}")
+                continue
+            self.engines[name] = engine
+            self.guards[name] = self._make_guard(name)
+            self.crop_counts[name] = Counter()
+        self._log(f"Loaded OCR engines: {', '.join(self.engines) or 'none'}")
+
+    def _make_guard(self, name: str) -> EngineGuard:
+        breaker = CircuitBreaker.from_config(name, self.config, log=self._log)
+        return EngineGuard(name, breaker, timeout=getattr(self.config, 'ENGINE_TIMEOUT_SECONDS', None))
+
+    def _load_onnx_engine(self, name: str):
+        from ocr.onnx_engine import load_onnx_engine, onnx_model_dir
+        onnx_engine = load_onnx_engine(
+            name, onnx_model_dir(self.config), quantized=self.config.ONNX_QUANTIZED,
+            intra_op_threads=self.thread_budget.threads_for('onnxruntime'), log_result=self.log_result,
+        )
+        if onnx_engine is None:
+            self._log(f"No ONNX export found for {name}, using framework engine")
+            return None
+        self.thread_budget.mark_configured('onnxruntime', self.thread_budget.threads_for('onnxruntime'))
+        return onnx_engine
+
+    def _load_engine(self, name: str) -> Optional[BaseOCREngine]:
+        """Create one engine from the registry (or its ONNX export); loading is left to the residency manager."""
+        if self.config.USE_ONNX_RUNTIME:
+            onnx_engine = self._load_onnx_engine(name)
+            if onnx_engine is not None:
+                return onnx_engine
+        if name not in self.registry.names():
+            self._log(f"Unknown OCR engine: {name}")
+            return None
+        self.thread_budget.configure_framework(self.registry.capabilities(name).framework)
+        engine = self.registry.create(name, self.config, thread_budget=self.thread_budget, log_result=self.log_result)
+        engine.set_profile(self._profile_for(name, getattr(self.config, 'ENGINE_PROFILE', None)))
+        return engine
+
+    def _profile_for(self, name: str, profile: Optional[str]) -> Optional[str]:
+        return (getattr(self.config, 'ENGINE_PROFILE_OVERRIDES', None) or {}).get(name, profile)
+
+    def set_profile(self, profile: str) -> Dict[str, str]:
+        """Switch every engine to a performance profile (per-engine overrides still apply).
+
+        Engines whose models change are unloaded between calls and reload on next use,
+        in the background where the memory budget allows. Returns engine -> profile.
+        """
+        if self.workers is not None:
+            self._log("Profiles cannot be switched while engines run in worker processes; restart to apply")
+            return {}
+        applied = {}
+        for name, engine in self.engines.items():
+            if not engine.profiles:
+                continue
+            target = self._profile_for(name, profile)
+            if not self.residency.reconfigure(name, lambda e: e.set_profile(target)):
+                self._log(f"{name} is busy; profile left at {engine.profile}")
+            applied[name] = engine.profile
+        self.config.ENGINE_PROFILE = profile
+        self._log(f"Engine profile: {', '.join(f'{n} {p}' for n, p in applied.items())}")
+        self.prefetch_engines()
+        return applied
+
+    def run_engines(self, image) -> List[OCRResult]:
+        return self._run_engines_on([np.array(image)])[0]
+
+    def _settled(self, result: OCRResult) -> bool:
+        """A fast-path reading good enough that the other engines need not see the frame."""
+        if not result.text or result.confidence < self.fast_path_min_confidence:
+            return False
+        return self.grammar is None or bool(self.grammar.matches(result.text))
+
+    def _run_engines_on(self, frames: List[np.ndarray]) -> List[List[OCRResult]]:
+        """Every engine's result for each frame, following the execution plan.
+
+        Frames the fast-path engine reads confidently are not passed to the engines after it.
+        Concurrent (thread-safe) engines are started and collected once the rest have run.
+        Frames are converted once for each color some engine asks for.
+        """
+        if self.workers is not None:
+            return self.workers.run(frames) or [[] for _ in frames]
+        converted: Dict[str, List[np.ndarray]] = {'any': frames}
+        # (step, frame indices, outputs) in plan order; outputs is a submitted call until collected
+        calls = []
+        active = list(range(len(frames)))
+        for step in plan_execution(self.engines, len(frames), self.residency.budget_mb):
+            if not active:
+                break
+            guard = self.guards[step.name]
+            if not guard.allow():
+                continue
+            try:
+                # Loading is kept outside the call timeout
+                self.residency.ensure(step.name, 'on demand')
+            except Exception as e:
+                guard.record_failure(f"load failed: {e}")
+                continue
+            if step.color not in converted:
+                converted[step.color] = [convert_color(frame, step.color) for frame in frames]
+            images = [converted[step.color][i] for i in active]
+            if step.concurrent and step.name != self.fast_path:
+                calls.append((step, active, guard.submit(self._call_engine, step, images)))
+                continue
+            outputs = guard.call(self._call_engine, step, images, frames=len(active))
+            calls.append((step, active, outputs))
+            if outputs is not None and step.name == self.fast_path:
+                remaining = [i for i, output in zip(active, outputs) if not self._settled(output)]
+                self.fast_path_count += len(active) - len(remaining)
+                active = remaining
+        per_frame: List[List[OCRResult]] = [[] for _ in frames]
+        for step, indices, outputs in calls:
+            if step.concurrent and step.name != self.fast_path:
+                outputs = self.guards[step.name].wait(outputs, frames=len(indices))
+            if outputs is None:
+                continue
+            for i, output in zip(indices, outputs):
+                per_frame[i].append(output)
+        self.residency.evict_idle()
+        return per_frame
+
+    def _call_engine(self, step, frames: List[np.ndarray]) -> List[OCRResult]:
+        # Runs on the engine's guard thread
+        with self.residency.use(step.name) as engine, self.thread_budget.pinned(step.name):
+            return run_engine(engine, frames, step.batched, self.crop_policy, self.crop_counts[step.name])
+
+    def engine_count(self) -> int:
+        return len(self.workers.ready) if self.workers is not None else len(self.engines)
+
+    def close(self):
+        """Stop the engine threads and worker processes and close the frame recorder."""
+        for guard in self.guards.values():
+            guard.close()
+        if self.workers is not None:
+            self.workers.close()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def breaker_states(self) -> Dict[str, dict]:
+        """Circuit breaker state per engine, in-process or in a worker process."""
+        if self.workers is not None:
+            return self.workers.breaker_states()
+        return {name: guard.snapshot() for name, guard in self.guards.items()}
+
+    def prefetch_engines(self):
+        """Reload evicted engines in the background, e.g. when recognition is about to start."""
+        self.residency.prefetch(step.name for step in plan_execution(self.engines, memory_budget_mb=self.residency.budget_mb))
+
+    def _consensus(self, results: List[OCRResult], region: Optional[str] = None,
+                   resolution: str = 'native') -> RecognitionResult:
+        # Agreement is measured against the engines that answered: ones skipped by an
+        # open breaker or that failed on this frame do not count
+        text, confidence, alert = get_consensus_result(
+            results, max(1, len(results)),
+            self.config.AGREEMENT_THRESHOLD, self.config.CONFIDENCE_THRESHOLD, self.grammar,
+        )
+        return RecognitionResult(text, confidence, alert, region, results, resolution)
+
+    def combine(self, results: List[RecognitionResult]) -> RecognitionResult:
+        """One result from several readings of the same region, e.g. a burst of frames."""
+        return combine_results(results, self.config.AGREEMENT_THRESHOLD, self.config.CONFIDENCE_THRESHOLD, self.grammar)
+
+    def _cascade_heights(self):
+        """(coarse pass height, fine pass minimum height); (0, 0) when the cascade is off."""
+        if not getattr(self.config, 'RESOLUTION_CASCADE', False):
+            return 0, 0
+        if self.workers is not None:
+            known = self.registry.names()
+            min_heights = [self.registry.capabilities(n).min_height for n in self.workers.ready if n in known]
+        else:
+            min_heights = [engine.capabilities.min_height for engine in self.engines.values()]
+        coarse = max([int(getattr(self.config, 'CASCADE_COARSE_HEIGHT', 32))] + min_heights)
+        return coarse, int(getattr(self.config, 'CASCADE_FINE_MIN_HEIGHT', 50))
+
+    @staticmethod
+    def _scale_boxes(results: List[OCRResult], factor: float) -> List[OCRResult]:
+        """Engine boxes from a resized copy mapped back to the original frame."""
+        if factor == 1.0:
+            return results
+        return [replace(r, box=tuple(int(round(v * factor)) for v in r.box)) if r.box else r for r in results]
+
+    def _fine_frame(self, frame: np.ndarray):
+        if frame.shape[0] < self.fine_min_height:
+            return resize_to_height(frame, self.fine_min_height), 'upscaled'
+        return frame, 'native'
+
+    def _recognize_frames(self, frames: List[np.ndarray], regions: List[Optional[str]]) -> List[RecognitionResult]:
+        """Consensus for each frame, trying a downscaled copy first when the cascade is on.
+
+        Frames whose coarse reading is confident and agreed on stop there; the rest are
+        read again at native resolution, or upscaled if they are very small.
+        """
+        outcomes: List[Optional[RecognitionResult]] = [None] * len(frames)
+        if self.coarse_height:
+            coarse = [i for i, frame in enumerate(frames) if frame.shape[0] > self.coarse_height]
+            if coarse:
+                per_frame = self._run_engines_on([resize_to_height(frames[i], self.coarse_height) for i in coarse])
+                for i, results in zip(coarse, per_frame):
+                    results = self._scale_boxes(results, frames[i].shape[0] / self.coarse_height)
+                    outcome = self._consensus(results, regions[i], 'coarse')
+                    if not outcome.alert:
+                        outcomes[i] = outcome
+        pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        if pending:
+            fine = [self._fine_frame(frames[i]) for i in pending]
+            per_frame = self._run_engines_on([frame for frame, _ in fine])
+            for i, (frame, resolution), results in zip(pending, fine, per_frame):
+                results = self._scale_boxes(results, frames[i].shape[0] / frame.shape[0])
+                outcomes[i] = self._consensus(results, regions[i], resolution)
+        self.resolution_counts.update(outcome.resolution for outcome in outcomes)
+        return outcomes
+
+    def recognize_license_plate(self, image):
+        """Run every loaded engine on the image and return (text, confidence, alert)."""
+        result = self.recognize_batch([image])[0]
+        return result.text, result.confidence, result.alert
+
+    def recognize_batch(self, images, regions: Optional[List[str]] = None) -> List[RecognitionResult]:
+        """Recognize several images together; batch-capable engines see them in a single call.
+
+        With ROI tracking on, regions whose plate is being tracked are read through a crop around it.
+        """
+        frames = [np.array(image) for image in images]
+        regions = list(regions) if regions else [None] * len(frames)
+        if self.tracker is not None:
+            outcomes = self.tracker.recognize(frames, regions, self._recognize_frames)
+        else:
+            outcomes = self._recognize_frames(frames, regions)
+        for frame, outcome in zip(frames, outcomes):
+            self._record(frame, outcome)
+        self._teach(frames, outcomes)
+        return outcomes
+
+    def _teach(self, frames: List[np.ndarray], outcomes: List[RecognitionResult]):
+        """Pass confirmed readings to engines that learn from them and read the plate differently."""
+        learners = [(name, engine) for name, engine in self.engines.items()
+                    if engine.capabilities.learns and engine.loaded]
+        if not learners:
+            return
+        for frame, outcome in zip(frames, outcomes):
+            if outcome.alert or not outcome.text:
+                continue
+            box = plate_box(outcome)
+            if box is not None:
+                x, y, w, h = box
+                pad = h // 4
+                frame = frame[max(0, y - pad):y + h + pad, max(0, x - pad):x + w + pad]
+            for name, engine in learners:
+                if any(r.source == name and r.text == outcome.text for r in outcome.engine_results):
+                    continue
+                try:
+                    engine.learn(frame, outcome.text)
+                except Exception as e:
+                    self._log(f"{name} could not learn from {outcome.text}: {e}")
+
+    def _record(self, frame, result: RecognitionResult):
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.record(
+                frame, result.engine_results, region=result.region,
+                text=result.text, confidence=result.confidence, alert=result.alert,
+            )
+        except Exception as e:
+            self._log(f"Frame recorder error: {e}")
 
     def recognize(self, image):
-        # Implement the recognition logic using OCR engines
-        # Return recognized plate text and confidence
-        # ...
-        return 'ABC1234', 0.95
-
-class ScreenAutomation:
-    def __init__(self):
-        # Initialize automation tools (e.g., pyautogui)
-        pass
-
-    def set_target_field(self):
-        # Implement logic to set the target field for automation
-        pass
-
-    def insert_text(self, text):
-        # Implement logic to insert recognized text into the target field
-        pass
+        text, confidence, _ = self.recognize_license_plate(image)
+        return text, confidence
@@ -0,0 +1,216 @@
+"""Thin client for the local recognition service (recognizer/service.py).
+
+``RemoteRecognizer`` has the same recognize/recognize_batch interface as
+``LicensePlateRecognizer``. If the service is unreachable or times out, it loads an
+in-process recognizer and uses that instead, trying the service again every
+``retry_seconds`` and unloading the fallback once the service answers. A busy
+service (429/503) is retried with backoff rather than abandoned: loading every
+client's engines locally would only add to the load that made it busy.
+"""
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+from models import OCRResult, RecognitionResult
+from recognizer.service import encode_frames
+from utils.plate_grammar import grammar_from_config
+from utils.validation import combine_results
+
+
+BUSY_STATUSES = (429, 503)
+BUSY_RETRIES = 3
+BUSY_BACKOFF_SECONDS = 0.05  # doubled after each busy answer
+TIMEOUT_STATUSES = (504,)
+
+
+class ServiceUnavailable(Exception):
+    """The service could not be reached or did not answer in time."""
+
+
+class ServiceBusy(Exception):
+    """The service turned the request away (429/503)."""
+
+
+class ServiceError(Exception):
+    """The service answered, but could not recognize this request."""
+
+
+class RemoteRecognizer:
+    def __init__(self, url: str, config, fallback: Callable[[], object], log_result: Optional[Callable[[str], None]] = None,
+                 timeout: float = 30.0, retry_seconds: float = 30.0, client_id: Optional[str] = None):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 80
+        self.config = config
+        self.grammar = grammar_from_config(config)
+        self.log_result = log_result
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.client_id = client_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._fallback_factory = fallback
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+        self._remote_down_since: Optional[float] = None
+        # Frames the service answered for without a result since its last success
+        self._unread_since_success = 0
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config, thread_budget=None, log_result=None) -> 'RemoteRecognizer':
+        def fallback():
+            from recognizer.recognizer import LicensePlateRecognizer
+            return LicensePlateRecognizer(config, log_result=log_result, thread_budget=thread_budget)
+        return cls(config.RECOGNITION_SERVICE_URL, config, fallback, log_result=log_result)
+
+    def _log(self, message: str):
+        print(message)
+        if self.log_result:
+            self.log_result(message)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        # One keep-alive connection per calling thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _post(self, frames, regions) -> List[RecognitionResult]:
+        body = encode_frames(frames)
+        headers = {'Content-Type': 'application/octet-stream', 'X-Client': self.client_id,
+                   'X-Regions': json.dumps(regions)}
+        conn = self._connection()
+        try:
+            conn.request('POST', '/recognize', body=body, headers=headers)
+            response = conn.getresponse()
+            payload = json.loads(response.read() or b'{}')
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            conn.close()
+            self._local.conn = None
+            raise ServiceUnavailable(str(e))
+        if response.status in BUSY_STATUSES:
+            raise ServiceBusy(f"HTTP {response.status}: {payload.get('error', '')}")
+        if response.status in TIMEOUT_STATUSES:
+            raise ServiceUnavailable(f"HTTP {response.status}: {payload.get('error', '')}")
+        if response.status != 200:
+            raise ServiceError(f"HTTP {response.status}: {payload.get('error', '')}")
+        return [
+            RecognitionResult(r['text'], r['confidence'], r['alert'], r.get('region'),
+                              [OCRResult(**e) for e in r.get('engine_results', [])], r.get('resolution', 'native'),
+                              r.get('track'))
+            for r in payload['results']
+        ]
+
+    def _post_with_retry(self, frames, regions) -> List[RecognitionResult]:
+        delay = BUSY_BACKOFF_SECONDS
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                return self._post(frames, regions)
+            except ServiceBusy:
+                if attempt == BUSY_RETRIES:
+                    raise
+            time.sleep(delay)
+            delay *= 2
+
+    def _local_recognizer(self):
+        with self._fallback_lock:
+            if self._fallback is None:
+                self._log("Loading in-process engines as fallback")
+                self._fallback = self._fallback_factory()
+            return self._fallback
+
+    def _use_remote(self) -> bool:
+        down = self._remote_down_since
+        return down is None or time.monotonic() - down >= self.retry_seconds
+
+    def _drop_fallback(self):
+        with self._fallback_lock:
+            fallback, self._fallback = self._fallback, None
+        if fallback is not None:
+            self._log("Unloading in-process fallback engines")
+            fallback.close()
+
+    def _unread(self, frames, regions, reason: str) -> List[RecognitionResult]:
+        # Logged once per run of failures, not per frame
+        if not self._unread_since_success:
+            self._log(f"Recognition service could not read frames ({reason}); skipping them")
+        self._unread_since_success += len(frames)
+        return [RecognitionResult('', 0.0, True, region) for region in regions]
+
+    def recognize_batch(self, images, regions: Optional[List[str]] = None) -> List[RecognitionResult]:
+        frames = [np.asarray(image) for image in images]
+        regions = list(regions) if regions else [None] * len(frames)
+        if self._use_remote():
+            try:
+                results = self._post_with_retry(frames, regions)
+            except (ServiceBusy, ServiceError) as e:
+                return self._unread(frames, regions, str(e))
+            except ServiceUnavailable as e:
+                if self._remote_down_since is None:
+                    self._log(f"Recognition service unavailable ({e}); recognizing in-process")
+                self._remote_down_since = time.monotonic()
+            else:
+                self._unread_since_success = 0
+                if self._remote_down_since is not None:
+                    self._log("Recognition service reachable again")
+                    self._remote_down_since = None
+                    self._drop_fallback()
+                return results
+        return self._local_recognizer().recognize_batch(frames, regions)
+
+    def recognize_license_plate(self, image):
+        result = self.recognize_batch([image])[0]
+        return result.text, result.confidence, result.alert
+
+    def recognize(self, image):
+        text, confidence, _ = self.recognize_license_plate(image)
+        return text, confidence
+
+    def combine(self, results: List[RecognitionResult]) -> RecognitionResult:
+        return combine_results(results, self.config.AGREEMENT_THRESHOLD, self.config.CONFIDENCE_THRESHOLD, self.grammar)
+
+    def engine_count(self) -> int:
+        return self._fallback.engine_count() if self._fallback is not None else 0
+
+    def set_profile(self, profile: str):
+        # The service keeps its own profile; this only affects the in-process fallback
+        if self._fallback is not None:
+            return self._fallback.set_profile(profile)
+        self.config.ENGINE_PROFILE = profile
+        return {}
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        with self._fallback_lock:
+            if self._fallback is not None:
+                self._fallback.close()
+                self._fallback = None
+
+    def breaker_states(self):
+        return self._fallback.breaker_states() if self._fallback is not None else {}
+
+    @property
+    def residency(self):
+        return getattr(self._fallback, 'residency', None)
+
+    def prefetch_engines(self):
+        if self._fallback is not None:
+            self._fallback.prefetch_engines()
+
+
+def create_recognizer(config, thread_budget=None, log_result=None):
+    """Service client when RECOGNITION_SERVICE_URL is set, otherwise an in-process recognizer."""
+    if getattr(config, 'RECOGNITION_SERVICE_URL', None):
+        return RemoteRecognizer.from_config(config, thread_budget=thread_budget, log_result=log_result)
+    from recognizer.recognizer import LicensePlateRecognizer
+    return LicensePlateRecognizer(config, log_result=log_result, thread_budget=thread_budget)
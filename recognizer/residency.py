@@ -0,0 +1,221 @@
+"""Keeps the loaded OCR models within a memory budget.
+
+Each engine's resident size is measured as the process RSS growth across its
+``load()`` (falling back to the size it declares in its capabilities). When a load
+would exceed the budget, the least recently used idle engine is unloaded first;
+ties go to the engine that is cheapest to bring back. Engines that have not been
+used for ``idle_seconds`` are unloaded as well. Unloaded engines are reloaded
+lazily on their next use, or ahead of time with ``prefetch``.
+"""
+import gc
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ocr.base import BaseOCREngine
+
+
+def resident_memory_mb() -> Optional[float]:
+    """Current process RSS in MB, or None if it cannot be read on this platform."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@dataclass
+class ResidencyEvent:
+    kind: str  # 'load' or 'evict'
+    engine: str
+    reason: str
+    latency_ms: float
+    engine_mb: float
+    resident_mb: float  # all managed engines after the event
+    timestamp: float
+
+
+class _Slot:
+    def __init__(self, name: str, engine: BaseOCREngine):
+        self.name = name
+        self.engine = engine
+        self.size_mb = float(engine.capabilities.memory_mb)
+        self.load_ms = 0.0
+        self.last_used = 0.0
+        self.uses = 0
+        # Held while the engine runs so it is never unloaded mid-call
+        self.lock = threading.RLock()
+
+
+class ResidencyManager:
+    def __init__(self, budget_mb: Optional[float] = None, idle_seconds: Optional[float] = None,
+                 log: Optional[Callable[[str], None]] = None, history: int = 200):
+        self.budget_mb = budget_mb
+        self.idle_seconds = idle_seconds
+        self.log = log
+        self.events = deque(maxlen=history)
+        self.loads = 0
+        self.evictions = 0
+        self.load_time_ms = 0.0
+        self._slots: Dict[str, _Slot] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, log: Optional[Callable[[str], None]] = None) -> 'ResidencyManager':
+        return cls(
+            budget_mb=getattr(config, 'MEMORY_BUDGET_MB', None),
+            idle_seconds=getattr(config, 'ENGINE_IDLE_EVICT_SECONDS', None),
+            log=log,
+        )
+
+    def register(self, name: str, engine: BaseOCREngine):
+        with self._lock:
+            self._slots[name] = _Slot(name, engine)
+
+    def remove(self, name: str):
+        with self._lock:
+            self._slots.pop(name, None)
+
+    def resident_mb(self) -> float:
+        return sum(s.size_mb for s in self._slots.values() if s.engine.loaded)
+
+    def _record(self, kind: str, slot: _Slot, reason: str, latency_ms: float):
+        event = ResidencyEvent(kind, slot.name, reason, latency_ms, slot.size_mb, self.resident_mb(), time.time())
+        self.events.append(event)
+        if self.log:
+            verb = 'Loaded' if kind == 'load' else 'Evicted'
+            self.log(f"{verb} {slot.name} ({reason}): {slot.size_mb:.0f} MB in {latency_ms:.0f} ms, "
+                     f"{event.resident_mb:.0f} MB resident")
+
+    def _unload(self, slot: _Slot, reason: str) -> bool:
+        # Skip engines that are running right now
+        if not slot.lock.acquire(blocking=False):
+            return False
+        try:
+            if not slot.engine.loaded:
+                return False
+            start = time.perf_counter()
+            slot.engine.unload()
+            gc.collect()
+            self.evictions += 1
+            self._record('evict', slot, reason, (time.perf_counter() - start) * 1000)
+            return True
+        finally:
+            slot.lock.release()
+
+    def _make_room(self, needed_mb: float, keep: str):
+        if not self.budget_mb:
+            return
+        with self._lock:
+            candidates = [s for s in self._slots.values() if s.name != keep and s.engine.loaded]
+        # Least recently used first; among equals, the one that reloads fastest per MB freed
+        candidates.sort(key=lambda s: (s.last_used, s.load_ms / max(s.size_mb, 1.0)))
+        for slot in candidates:
+            if self.resident_mb() + needed_mb <= self.budget_mb:
+                break
+            self._unload(slot, 'over budget')
+
+    def _load(self, slot: _Slot, reason: str):
+        if slot.engine.loaded:
+            return
+        self._make_room(slot.size_mb, keep=slot.name)
+        before = resident_memory_mb()
+        start = time.perf_counter()
+        slot.engine.load()
+        slot.load_ms = (time.perf_counter() - start) * 1000
+        after = resident_memory_mb()
+        if before is not None and after is not None and after > before:
+            slot.size_mb = after - before
+        self.loads += 1
+        self.load_time_ms += slot.load_ms
+        self._record('load', slot, reason, slot.load_ms)
+        if self.budget_mb and self.resident_mb() > self.budget_mb:
+            # The measured size was larger than declared; trim other engines now
+            self._make_room(0.0, keep=slot.name)
+
+    def ensure(self, name: str, reason: str = 'startup'):
+        """Load an engine now if it is not resident."""
+        slot = self._slots[name]
+        with slot.lock:
+            self._load(slot, reason)
+
+    @contextmanager
+    def use(self, name: str):
+        """Yield the loaded engine, reloading it first if it was evicted."""
+        slot = self._slots[name]
+        with slot.lock:
+            self._load(slot, 'on demand')
+            slot.last_used = time.monotonic()
+            slot.uses += 1
+            yield slot.engine
+
+    def reconfigure(self, name: str, change: Callable[[BaseOCREngine], bool], timeout: float = 10.0) -> bool:
+        """Apply a settings change between calls to an engine.
+
+        change(engine) returns True if the models must be reloaded; they are then
+        unloaded here and come back on next use. Returns False if a running call
+        did not finish within timeout.
+        """
+        slot = self._slots[name]
+        if not slot.lock.acquire(timeout=timeout):
+            return False
+        try:
+            if change(slot.engine) and slot.engine.loaded:
+                start = time.perf_counter()
+                slot.engine.unload()
+                gc.collect()
+                self.evictions += 1
+                self._record('evict', slot, 'profile change', (time.perf_counter() - start) * 1000)
+            return True
+        finally:
+            slot.lock.release()
+
+    def evict_idle(self) -> List[str]:
+        """Unload engines unused for idle_seconds; returns their names."""
+        if not self.idle_seconds:
+            return []
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [s for s in self._slots.values() if s.engine.loaded and s.last_used and s.last_used < cutoff]
+        return [s.name for s in idle if self._unload(s, f'idle {self.idle_seconds:.0f}s')]
+
+    def prefetch(self, names: Iterable[str]):
+        """Reload evicted engines in the background if they fit without evicting anything."""
+        def load():
+            for name in names:
+                slot = self._slots.get(name)
+                if slot is None or slot.engine.loaded:
+                    continue
+                if self.budget_mb and self.resident_mb() + slot.size_mb > self.budget_mb:
+                    continue
+                if slot.lock.acquire(blocking=False):
+                    try:
+                        self._load(slot, 'prefetch')
+                    except Exception as e:
+                        if self.log:
+                            self.log(f"Prefetch of {name} failed: {e}")
+                    finally:
+                        slot.lock.release()
+        threading.Thread(target=load, name='engine-prefetch', daemon=True).start()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            slots = list(self._slots.values())
+        return {
+            'budget_mb': self.budget_mb,
+            'resident_mb': self.resident_mb(),
+            'engines': {s.name: {'loaded': s.engine.loaded, 'size_mb': s.size_mb, 'load_ms': s.load_ms, 'uses': s.uses}
+                        for s in slots},
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'load_time_ms': self.load_time_ms,
+        }
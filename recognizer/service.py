@@ -0,0 +1,246 @@
+"""Local recognition service: one set of loaded engines shared by every operator on the host.
+
+Clients POST frames to ``/recognize`` on localhost (see recognizer/remote.py). Requests
+that arrive within ``batch_window_ms`` of each other are merged into a single
+``recognize_batch`` call, so engines with batch support see them together. Admission
+is bounded: ``max_concurrent`` requests in flight overall and ``max_per_client`` per
+client, beyond which the service answers 503/429 and the client backs off and retries.
+
+Endpoints: POST /recognize, GET /stats, GET /health.
+"""
+import io
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.pipeline import BoundedQueue, QueueClosed
+
+DEFAULT_PORT = 8765
+
+
+def encode_frames(frames) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, *[np.ascontiguousarray(frame) for frame in frames])
+    return buffer.getvalue()
+
+
+def decode_frames(data: bytes) -> List[np.ndarray]:
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        return [archive[f'arr_{i}'] for i in range(len(archive.files))]
+
+
+class ClientStats:
+    """Request count, rejections and latency percentiles for one client."""
+    def __init__(self, window: int = 500):
+        self.requests = 0
+        self.frames = 0
+        self.rejected = 0
+        self.errors = 0
+        self.latencies_ms = deque(maxlen=window)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+        return {
+            'requests': self.requests, 'frames': self.frames, 'rejected': self.rejected, 'errors': self.errors,
+            'p50_ms': percentile(0.5), 'p95_ms': percentile(0.95), 'max_ms': latencies[-1] if latencies else 0.0,
+        }
+
+
+class _Request:
+    def __init__(self, frames, regions, client: str):
+        self.frames = frames
+        self.regions = regions
+        self.client = client
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.results = None
+        self.error: Optional[str] = None
+
+
+class RecognitionService:
+    def __init__(self, recognizer, host: str = '127.0.0.1', port: int = DEFAULT_PORT, batch_window_ms: float = 5.0,
+                 max_batch: int = 16, max_concurrent: int = 32, max_per_client: int = 4, request_timeout: float = 30.0):
+        self.recognizer = recognizer
+        self.host = host
+        self.port = port
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.max_per_client = max_per_client
+        self.request_timeout = request_timeout
+        self.clients: Dict[str, ClientStats] = {}
+        self.batches = 0
+        self.batched_frames = 0
+        self._in_flight: Dict[str, int] = {}
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._queue = BoundedQueue(max_concurrent)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._batcher = threading.Thread(target=self._batch_loop, name='recognition-batcher', daemon=True)
+
+    @classmethod
+    def from_config(cls, recognizer, config, host: Optional[str] = None, port: Optional[int] = None) -> 'RecognitionService':
+        return cls(
+            recognizer,
+            host=host or getattr(config, 'SERVICE_HOST', '127.0.0.1'),
+            port=port or getattr(config, 'SERVICE_PORT', DEFAULT_PORT),
+            batch_window_ms=getattr(config, 'SERVICE_BATCH_WINDOW_MS', 5.0),
+            max_batch=getattr(config, 'SERVICE_MAX_BATCH', 16),
+            max_concurrent=getattr(config, 'SERVICE_MAX_CONCURRENT', 32),
+            max_per_client=getattr(config, 'SERVICE_MAX_PER_CLIENT', 4),
+        )
+
+    def _client_stats(self, client: str) -> ClientStats:
+        with self._lock:
+            return self.clients.setdefault(client, ClientStats())
+
+    def submit(self, frames, regions, client: str):
+        """Queue a request and wait for its results. Returns (status, payload)."""
+        stats = self._client_stats(client)
+        with self._lock:
+            if self._in_flight.get(client, 0) >= self.max_per_client:
+                stats.rejected += 1
+                return 429, {'error': 'too many concurrent requests from this client'}
+            if not self._slots.acquire(blocking=False):
+                stats.rejected += 1
+                return 503, {'error': 'service busy'}
+            self._in_flight[client] = self._in_flight.get(client, 0) + 1
+        try:
+            request = _Request(frames, regions, client)
+            if not self._queue.put(request, timeout=0):
+                stats.rejected += 1
+                return 503, {'error': 'service busy'}
+            if not request.done.wait(self.request_timeout):
+                stats.errors += 1
+                return 504, {'error': 'recognition timed out'}
+            if request.error:
+                stats.errors += 1
+                return 500, {'error': request.error}
+            latency_ms = (time.monotonic() - request.enqueued) * 1000
+            with self._lock:
+                stats.requests += 1
+                stats.frames += len(frames)
+                stats.latencies_ms.append(latency_ms)
+            return 200, {'results': [asdict(r) for r in request.results], 'latency_ms': latency_ms}
+        finally:
+            with self._lock:
+                self._in_flight[client] -= 1
+            self._slots.release()
+
+    def _batch_loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except QueueClosed:
+                return
+            if first is None:
+                continue
+            batch = [first]
+            frame_count = len(first.frames)
+            # Gather whatever else arrives within the window of the first request
+            deadline = first.enqueued + self.batch_window
+            while frame_count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except QueueClosed:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+                frame_count += len(item.frames)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Request]):
+        frames = [frame for request in batch for frame in request.frames]
+        regions = [region for request in batch for region in request.regions]
+        try:
+            results = self.recognizer.recognize_batch(frames, regions)
+        except Exception as e:
+            for request in batch:
+                request.error = f"{type(e).__name__}: {e}"
+                request.done.set()
+            return
+        self.batches += 1
+        self.batched_frames += len(frames)
+        offset = 0
+        for request in batch:
+            request.results = results[offset:offset + len(request.frames)]
+            offset += len(request.frames)
+            request.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            clients = {name: stats.snapshot() for name, stats in self.clients.items()}
+        return {
+            'clients': clients,
+            'batches': self.batches,
+            'avg_batch_frames': self.batched_frames / self.batches if self.batches else 0.0,
+            'queue_depth': self._queue.depth,
+        }
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self, status: int, payload: dict):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/stats':
+                    self._reply(200, service.stats())
+                elif self.path == '/health':
+                    self._reply(200, {'status': 'ok', 'engines': service.recognizer.engine_count()})
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path != '/recognize':
+                    self._reply(404, {'error': 'not found'})
+                    return
+                client = self.headers.get('X-Client') or self.client_address[0]
+                try:
+                    body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                    frames = decode_frames(body)
+                    regions = json.loads(self.headers.get('X-Regions') or 'null') or [None] * len(frames)
+                except Exception as e:
+                    self._reply(400, {'error': f"bad request: {e}"})
+                    return
+                self._reply(*service.submit(frames, regions, client))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self._batcher.start()
+        print(f"Recognition service listening on http://{self.host}:{self.port}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._queue.close()
+            self._server.server_close()
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
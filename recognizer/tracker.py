@@ -0,0 +1,266 @@
+"""Following a plate between frames of the same scan region.
+
+Once a reading says where the plate is (``OCRResult.box``), later frames of that
+region are searched for it by normalized template matching around its last position,
+at a few scales either side, and only a padded crop around the match is sent to the
+engines. The whole region is read again when the match score drops below
+``min_score``, when the tracked crop reads nothing, or every ``redetect_every``
+tracked frames. Each track keeps a confidence-weighted vote over its last
+``vote_window`` readings, so a plate that stays in view reports one stable text
+instead of flickering between single-frame misreads. The vote only overrides
+uncertain readings (alerted or empty); a confident reading of a different text is
+a different plate and starts a new track.
+"""
+import itertools
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from models import OCRResult, RecognitionResult
+from utils.watchlist import levenshtein
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+# An uncertain reading within this many character edits of the track's text is taken as a misread of the same
+# plate and outvoted; further off, it is another plate. Confident readings only continue a track they match exactly
+SAME_PLATE_DISTANCE = 2
+
+
+@dataclass
+class Track:
+    id: int
+    box: Box  # in the region's frame
+    template: np.ndarray  # grayscale pixels of box
+    frame_shape: Tuple[int, int]
+    votes: deque = field(default_factory=deque)  # (text, confidence) of recent readings
+    age: int = 0  # tracked frames since the region was last read in full
+    score: float = 1.0  # last template match score
+
+    def leader(self) -> Optional[Tuple[str, float]]:
+        """Text with the most summed confidence, and its mean confidence."""
+        if not self.votes:
+            return None
+        weight, count = Counter(), Counter()
+        for text, confidence in self.votes:
+            weight[text] += confidence
+            count[text] += 1
+        text = max(weight, key=weight.get)
+        return text, weight[text] / count[text]
+
+
+@dataclass
+class TrackedCrop:
+    track: Track
+    crop: np.ndarray
+    offset: Tuple[int, int]  # crop origin in the frame
+
+
+def _gray(frame: np.ndarray) -> np.ndarray:
+    if frame.ndim == 2:
+        return frame
+    return cv2.cvtColor(frame, cv2.COLOR_RGBA2GRAY if frame.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+
+
+def _clip(box: Box, shape) -> Optional[Box]:
+    height, width = shape[:2]
+    x0, y0 = max(0, int(box[0])), max(0, int(box[1]))
+    x1, y1 = min(width, int(box[0] + box[2])), min(height, int(box[1] + box[3]))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _expand(box: Box, fx: float, fy: float) -> Box:
+    x, y, w, h = box
+    dx, dy = int(round(w * fx)), int(round(h * fy))
+    return x - dx, y - dy, w + 2 * dx, h + 2 * dy
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def plate_box(result: RecognitionResult) -> Optional[Box]:
+    """Where the consensus text was read: the most confident engine box agreeing with it, else any box."""
+    boxed = [r for r in result.engine_results if r.text and r.box]
+    agreeing = [r for r in boxed if r.text == result.text]
+    best = max(agreeing or boxed, key=lambda r: r.confidence, default=None)
+    return tuple(int(v) for v in best.box) if best is not None else None
+
+
+class RoiTracker:
+    def __init__(self, min_score: float = 0.6, search_margin: float = 0.5, pad: float = 0.25,
+                 scales: Sequence[float] = (0.9, 1.0, 1.1), redetect_every: int = 30, vote_window: int = 15,
+                 min_box_height: int = 8):
+        """
+        search_margin: how far around the last box to search, as a fraction of its size.
+        pad: margin added around the matched box in the crop sent to the engines, as a fraction of its height.
+        """
+        self.min_score = min_score
+        self.search_margin = search_margin
+        self.pad = pad
+        self.scales = tuple(scales) or (1.0,)
+        self.redetect_every = redetect_every
+        self.vote_window = max(1, int(vote_window))
+        self.min_box_height = min_box_height
+        self.tracks: Dict[str, Track] = {}
+        # 'tracked' (read through a crop), 'lost' (match or crop reading failed, or a different plate), 'redetect', 'full'
+        self.counts = Counter()
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_config(cls, config) -> Optional['RoiTracker']:
+        if not getattr(config, 'ROI_TRACKING', False):
+            return None
+        return cls(
+            min_score=getattr(config, 'ROI_TRACKING_MIN_SCORE', 0.6),
+            search_margin=getattr(config, 'ROI_TRACKING_SEARCH_MARGIN', 0.5),
+            redetect_every=getattr(config, 'ROI_TRACKING_REDETECT_EVERY', 30),
+            vote_window=getattr(config, 'ROI_TRACKING_VOTE_WINDOW', 15),
+        )
+
+    def _match(self, track: Track, gray: np.ndarray) -> Tuple[float, Optional[Box]]:
+        window = _clip(_expand(track.box, self.search_margin, self.search_margin), gray.shape)
+        if window is None:
+            return 0.0, None
+        wx, wy, ww, wh = window
+        search = gray[wy:wy + wh, wx:wx + ww]
+        best_score, best_box = 0.0, None
+        th, tw = track.template.shape[:2]
+        for scale in self.scales:
+            size = (max(1, round(tw * scale)), max(1, round(th * scale)))
+            if size[0] > ww or size[1] > wh:
+                continue
+            template = track.template if scale == 1.0 else cv2.resize(track.template, size)
+            _, score, _, (mx, my) = cv2.minMaxLoc(cv2.matchTemplate(search, template, cv2.TM_CCOEFF_NORMED))
+            if np.isfinite(score) and score > best_score:
+                best_score, best_box = float(score), (wx + mx, wy + my, size[0], size[1])
+        return best_score, best_box
+
+    def locate(self, region: Optional[str], frame: np.ndarray) -> Optional[TrackedCrop]:
+        """The crop to read for this frame, or None to read the whole frame."""
+        track = self.tracks.get(region) if region is not None else None
+        if track is None:
+            return None
+        if frame.shape[:2] != track.frame_shape:
+            self.lose(region)
+            return None
+        if track.age >= self.redetect_every:
+            self.counts['redetect'] += 1
+            return None
+        score, box = self._match(track, _gray(frame))
+        track.score = score
+        if box is None or score < self.min_score:
+            self.lose(region)
+            return None
+        track.box = box
+        crop_box = _clip(_expand(box, self.pad * box[3] / box[2], self.pad), frame.shape)
+        x, y, w, h = crop_box
+        self.counts['tracked'] += 1
+        return TrackedCrop(track, frame[y:y + h, x:x + w], (x, y))
+
+    def lose(self, region: Optional[str]):
+        if self.tracks.pop(region, None) is not None:
+            self.counts['lost'] += 1
+
+    def _to_frame(self, result: RecognitionResult, tracked: TrackedCrop) -> RecognitionResult:
+        """Move engine boxes from crop to frame coordinates; a box-less crop reading covers the whole crop."""
+        ox, oy = tracked.offset
+        ch, cw = tracked.crop.shape[:2]
+
+        def moved(r: OCRResult) -> OCRResult:
+            if not r.text:
+                return r
+            x, y, w, h = r.box if r.box else (0, 0, cw, ch)
+            return replace(r, box=(int(x) + ox, int(y) + oy, int(w), int(h)))
+        return replace(result, engine_results=[moved(r) for r in result.engine_results])
+
+    def _start(self, region: str, gray: np.ndarray, box: Box, text: str, confident: bool) -> Optional[Track]:
+        """Track the plate at box, continuing the region's current track if this is the same plate."""
+        box = _clip(box, gray.shape)
+        if box is None or box[3] < self.min_box_height:
+            return None
+        x, y, w, h = box
+        template = gray[y:y + h, x:x + w].copy()
+        # A flat patch matches everywhere equally well
+        if template.std() < 2.0:
+            return None
+        previous = self.tracks.get(region)
+        if previous is not None and _overlaps(box, previous.box):
+            if self._same_plate(previous, text, confident):
+                previous.box, previous.template, previous.age = box, template, 0
+                return previous
+        track = Track(next(self._ids), box, template, gray.shape[:2], deque(maxlen=self.vote_window))
+        self.tracks[region] = track
+        return track
+
+    @staticmethod
+    def _same_plate(track: Track, text: str, confident: bool) -> bool:
+        leader = track.leader()
+        if leader is None or text == leader[0]:
+            return True
+        return not confident and levenshtein(text, leader[0], SAME_PLATE_DISTANCE) <= SAME_PLATE_DISTANCE
+
+    def observe(self, region: Optional[str], frame: np.ndarray, result: RecognitionResult,
+                tracked: Optional[TrackedCrop] = None) -> RecognitionResult:
+        """Update the region's track from a reading and return the reading with the track's vote applied."""
+        if region is None:
+            return result
+        confident = bool(result.text) and not result.alert
+        if tracked is not None:
+            result = self._to_frame(result, tracked)
+            track = tracked.track
+            if result.text and not self._same_plate(track, result.text, confident):
+                # The template still matches but the crop holds another plate; its reading must not be
+                # outvoted by the old one. A confident reading starts a new track, any other drops this one
+                self.lose(region)
+                box = plate_box(result) if confident else None
+                track = self._start(region, _gray(frame), box, result.text, confident) if box is not None else None
+                if track is None:
+                    return result
+            else:
+                track.age += 1
+                box = plate_box(result)
+                # Re-anchor on confident readings only, so the template does not drift off the plate
+                if box is not None and confident:
+                    refreshed = _clip(box, frame.shape)
+                    if refreshed is not None and refreshed[3] >= self.min_box_height:
+                        x, y, w, h = refreshed
+                        track.box, track.template = refreshed, _gray(frame)[y:y + h, x:x + w].copy()
+        else:
+            self.counts['full'] += 1
+            box = plate_box(result) if result.text else None
+            track = self._start(region, _gray(frame), box, result.text, confident) if box is not None else None
+            if track is None:
+                self.lose(region)
+                return result
+        if result.text:
+            track.votes.append((result.text, float(result.confidence)))
+        leader = track.leader()
+        # Only uncertain readings take the vote; a confident one already matches the track's text
+        if not confident and leader is not None and leader[0] != result.text:
+            result = replace(result, text=leader[0], confidence=leader[1])
+        return replace(result, track=track.id)
+
+    def recognize(self, frames: List[np.ndarray], regions: List[Optional[str]],
+                  read: Callable[[List[np.ndarray], List[Optional[str]]], List[RecognitionResult]]) -> List[RecognitionResult]:
+        """read() each frame through its tracked crop where there is one; frames whose crop reads nothing are read in full."""
+        tracked = [self.locate(region, frame) for frame, region in zip(frames, regions)]
+        outcomes = read([t.crop if t is not None else frame for frame, t in zip(frames, tracked)], regions)
+        lost = [i for i, (t, outcome) in enumerate(zip(tracked, outcomes)) if t is not None and not outcome.text]
+        if lost:
+            for i in lost:
+                self.lose(regions[i])
+                tracked[i] = None
+            for i, outcome in zip(lost, read([frames[i] for i in lost], [regions[i] for i in lost])):
+                outcomes[i] = outcome
+        return [self.observe(region, frame, outcome, t) for frame, region, outcome, t in zip(frames, regions, outcomes, tracked)]
+
+    def snapshot(self) -> dict:
+        return {
+            'tracks': {region: {'id': t.id, 'box': t.box, 'score': round(t.score, 3), 'votes': len(t.votes),
+                                'leader': (t.leader() or ('', 0.0))[0]} for region, t in self.tracks.items()},
+            'counts': dict(self.counts),
+        }
@@ -0,0 +1,92 @@
+"""
+Script to benchmark the engine performance profiles (fast / balanced / accurate) on
+synthetic plates from utils/synthetic_plates.py. For each profile and each enabled
+engine it reports model load time and resident size, per-frame latency (mean and p95)
+and exact-match accuracy against the generated text, followed by the same figures
+for the full consensus.
+
+Example:
+  python scripts/benchmark_profiles.py --count 200 --engines easyocr doctr
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recognizer.config import CONFIGURATION
+from utils.thread_budget import ThreadBudget
+
+# Must run before numpy or any ML framework is imported so their thread pools honour it
+thread_budget = ThreadBudget.from_config(CONFIGURATION)
+thread_budget.apply_environment()
+
+
+def _summary(latencies, correct, total):
+    latencies = sorted(latencies)
+    mean = sum(latencies) / len(latencies) if latencies else 0.0
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0
+    return mean, p95, (correct / total if total else 0.0)
+
+
+def main():
+    from ocr.base import PROFILES, run_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=PROFILES)
+    parser.add_argument('--engines', nargs='+', default=None, help='Engines to benchmark (default ENABLED_ENGINES)')
+    parser.add_argument('--count', type=int, default=100, help='Plates per profile (default 100)')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed plates per engine after loading (default 5)')
+    parser.add_argument('--seed', type=int, default=0, help='Plate generator seed; every profile sees the same plates')
+    args = parser.parse_args()
+
+    from recognizer.recognizer import LicensePlateRecognizer
+    from utils.synthetic_plates import PlateGenerator
+
+    if args.engines:
+        CONFIGURATION.ENABLED_ENGINES = args.engines
+    CONFIGURATION.HISTORY_DB_PATH = None
+    CONFIGURATION.FRAME_RECORDER_PATH = None
+    CONFIGURATION.ENGINE_PROFILE = args.profiles[0]
+    CONFIGURATION.ENGINE_PROFILE_OVERRIDES = {}
+    recognizer = LicensePlateRecognizer(CONFIGURATION, thread_budget=thread_budget)
+    if recognizer.workers is not None:
+        sys.exit("Set ENGINE_WORKER_PROCESSES = False to benchmark profiles")
+    plates = PlateGenerator(seed=args.seed).batch(args.count + args.warmup)
+    warmup, timed = plates[:args.warmup], plates[args.warmup:]
+
+    rows = []
+    for profile in args.profiles:
+        recognizer.set_profile(profile)
+        for name, engine in recognizer.engines.items():
+            loads = recognizer.residency.loads
+            start = time.perf_counter()
+            recognizer.residency.ensure(name, 'benchmark')
+            load_ms = (time.perf_counter() - start) * 1000 if recognizer.residency.loads > loads else 0.0
+            size_mb = recognizer.residency.snapshot()['engines'][name]['size_mb']
+            run_engine(engine, [p.image for p in warmup], False, recognizer.crop_policy)
+            latencies, correct = [], 0
+            for plate in timed:
+                start = time.perf_counter()
+                result = run_engine(engine, [plate.image], False, recognizer.crop_policy)[0]
+                latencies.append((time.perf_counter() - start) * 1000)
+                correct += result.text == plate.text
+            rows.append((profile, name, load_ms, size_mb) + _summary(latencies, correct, len(timed)))
+
+        latencies, correct = [], 0
+        for plate in timed:
+            start = time.perf_counter()
+            result = recognizer.recognize_batch([plate.image])[0]
+            latencies.append((time.perf_counter() - start) * 1000)
+            correct += result.text == plate.text
+        rows.append((profile, 'consensus', 0.0, recognizer.residency.resident_mb()) + _summary(latencies, correct, len(timed)))
+
+    print(f"\n{'profile':10} {'engine':12} {'load ms':>9} {'MB':>7} {'mean ms':>9} {'p95 ms':>9} {'accuracy':>9}")
+    for profile, name, load_ms, size_mb, mean, p95, accuracy in rows:
+        load = f"{load_ms:9.0f}" if load_ms else f"{'-':>9}"
+        print(f"{profile:10} {name:12} {load} {size_mb:7.0f} {mean:9.1f} {p95:9.1f} {accuracy:9.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Script to pack every engine's downloaded model weights into one offline model bundle
+(utils/model_bundle.py), or to verify an existing bundle. Run it on a machine where the
+engines have already downloaded their models, copy the bundle directory to the offline
+hosts and set MODEL_BUNDLE_PATH to it.
+
+Weights are collected from each library's cache: EasyOCR's ~/.EasyOCR/model, PaddleOCR's
+~/.paddleocr/whl (English det/rec models and the angle classifier), DocTR's
+DOCTR_CACHE_DIR or ~/.cache/doctr (one file per architecture), Keras-OCR's KERAS_HOME or
+~/.keras-ocr, Tesseract's eng.traineddata and the ONNX exports in ONNX_MODEL_DIR. Use
+--from ENGINE=DIR to take an engine's files from somewhere else.
+
+Example:
+  python scripts/build_model_bundle.py --out models/bundle --version 2024.06
+  python scripts/build_model_bundle.py --verify models/bundle
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recognizer.config import CONFIGURATION
+from utils.model_bundle import BundleError, ModelBundle, build_bundle, bundle_summary
+
+BUNDLED_ENGINES = ('easyocr', 'paddleocr', 'doctr', 'keras-ocr', 'tesseract', 'onnx')
+TESSDATA_DIRS = ('/usr/share/tesseract-ocr/*/tessdata', '/usr/share/tessdata', '/usr/local/share/tessdata',
+                 '/opt/homebrew/share/tessdata', r'C:\Program Files\Tesseract-OCR\tessdata')
+
+
+def default_source(engine):
+    if engine == 'easyocr':
+        return os.path.expanduser('~/.EasyOCR/model')
+    if engine == 'paddleocr':
+        return os.path.join(os.environ.get('PADDLEOCR_HOME', os.path.expanduser('~/.paddleocr')), 'whl')
+    if engine == 'doctr':
+        return os.environ.get('DOCTR_CACHE_DIR', os.path.expanduser('~/.cache/doctr'))
+    if engine == 'keras-ocr':
+        return os.environ.get('KERAS_HOME', os.path.expanduser('~/.keras-ocr'))
+    if engine == 'tesseract':
+        candidates = [os.environ['TESSDATA_PREFIX']] if os.environ.get('TESSDATA_PREFIX') else []
+        for pattern in TESSDATA_DIRS:
+            candidates += sorted(glob.glob(pattern))
+        return next((d for d in candidates if os.path.exists(os.path.join(d, 'eng.traineddata'))), None)
+    if engine == 'onnx':
+        return CONFIGURATION.ONNX_MODEL_DIR
+    return None
+
+
+def _files_in(directory):
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if os.path.isfile(os.path.join(directory, name))]
+
+
+def collect(engine, source):
+    """Bundle relpath -> local file for one engine's weights under source."""
+    if not source or not os.path.isdir(source):
+        return {}
+    files = {}
+    if engine == 'easyocr':
+        files = {f'easyocr/{os.path.basename(p)}': p for p in _files_in(source) if p.endswith('.pth')}
+    elif engine == 'paddleocr':
+        # Inference model directories hold inference.pdmodel; the first English one of each kind is taken
+        for model, pattern in (('det', 'det/en/*'), ('rec', 'rec/en/*'), ('cls', 'cls/*')):
+            directories = [d for d in sorted(glob.glob(os.path.join(source, pattern)))
+                           if os.path.exists(os.path.join(d, 'inference.pdmodel'))]
+            if directories:
+                files.update({f'paddleocr/{model}/{os.path.basename(p)}': p for p in _files_in(directories[0])})
+    elif engine == 'doctr':
+        # Cached as <arch>-<hash>.pt; the engine looks them up by architecture
+        for path in sorted(glob.glob(os.path.join(source, '**', '*.pt'), recursive=True)):
+            files[f"doctr/{os.path.basename(path).split('-')[0]}.pt"] = path
+    elif engine == 'keras-ocr':
+        files = {f'keras-ocr/{os.path.basename(p)}': p
+                 for p in sorted(glob.glob(os.path.join(source, '**', '*.h5'), recursive=True))}
+    elif engine == 'tesseract':
+        files = {f'tesseract/{os.path.basename(p)}': p for p in _files_in(source) if p.endswith('.traineddata')}
+    elif engine == 'onnx':
+        for root, _, names in os.walk(source):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                files['onnx/' + os.path.relpath(path, source).replace(os.sep, '/')] = path
+    return files
+
+
+def verify(path):
+    try:
+        bundle = ModelBundle(path)
+    except BundleError as e:
+        sys.exit(str(e))
+    start = time.perf_counter()
+    problems = bundle.verify(full=True)
+    print(f"Model bundle {bundle.version} at {bundle.path}, built {time.ctime(bundle.created)}")
+    for engine, count, size in bundle_summary(bundle):
+        print(f"  {engine:10} {count:4} files {size:9.1f} MB")
+    for rel, problem in sorted(problems.items()):
+        print(f"  [!] {rel}: {problem}")
+    print(f"Hashed {len(bundle.files)} files in {time.perf_counter() - start:.1f}s: "
+          f"{'OK' if not problems else f'{len(problems)} problems'}")
+    return 1 if problems else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default='models/bundle', help='Bundle directory to write (replaced if it exists)')
+    parser.add_argument('--version', default=time.strftime('%Y.%m.%d'), help='Bundle version (default today)')
+    parser.add_argument('--engines', nargs='+', default=list(BUNDLED_ENGINES), choices=BUNDLED_ENGINES)
+    parser.add_argument('--from', dest='sources', action='append', default=[], metavar='ENGINE=DIR',
+                        help="Take an engine's files from DIR instead of its default cache")
+    parser.add_argument('--verify', metavar='BUNDLE', help='Hash every file of an existing bundle and exit')
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(verify(args.verify))
+
+    overrides = dict(item.split('=', 1) for item in args.sources)
+    sources = {}
+    for engine in args.engines:
+        source = overrides.get(engine) or default_source(engine)
+        files = collect(engine, source)
+        print(f"[{engine}] {len(files)} files from {source}")
+        if not files:
+            print(f"  [!] nothing found; the bundle will have no {engine} weights")
+        sources.update(files)
+    if not sources:
+        sys.exit("No model files found; run each engine once with network access first")
+    print(f"Writing bundle {args.version} to {args.out}")
+    bundle = build_bundle(args.out, sources, args.version, log=print)
+    total = sum(entry['size'] for entry in bundle.files.values()) / 1e6
+    print(f"Done: {len(bundle.files)} files, {total:.1f} MB. Set MODEL_BUNDLE_PATH = {bundle.path!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Script to export the EasyOCR, DocTR and PaddleOCR models to ONNX (optionally int8-quantized)
+and check the ONNX Runtime outputs against the original frameworks.
+Run this once per machine, then set CONFIGURATION.USE_ONNX_RUNTIME = True in recognizer/recognizer.py.
+
+Example:
+  python scripts/export_onnx_models.py --engines easyocr doctr --quantize --verify samples/
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ocr.onnx_engine import (ONNX_ENGINE_NAMES, OnnxOCREngine, export_doctr, export_easyocr,
+                             export_paddleocr, onnx_model_paths, quantize_onnx_model, results_match)
+from utils.validation import clean_license_plate
+
+
+def framework_engine(name):
+    """Return a callable(image) -> OCRResult running the original framework model."""
+    if name == 'easyocr':
+        import easyocr
+        from ocr.easyocr_engine import EasyOCREngine
+        reader = easyocr.Reader(['en'], gpu=False)
+        return reader, lambda image: EasyOCREngine().recognize(image, reader)
+    if name == 'doctr':
+        from doctr.models import ocr_predictor
+        from ocr.doctr_engine import doctr_ocr
+        predictor = ocr_predictor(pretrained=True)
+        return predictor, lambda image: doctr_ocr(image, predictor, clean_license_plate)
+    from ocr.paddleocr_engine import PaddleOCREngine
+    return None, PaddleOCREngine().recognize
+
+
+def export(name, model, out_dir, args):
+    engine_dir = os.path.join(out_dir, name)
+    if name == 'easyocr':
+        export_easyocr(model, engine_dir)
+    elif name == 'doctr':
+        export_doctr(engine_dir)
+    else:
+        if not (args.paddle_det_dir and args.paddle_rec_dir and args.paddle_dict):
+            print("[paddleocr] --paddle-det-dir, --paddle-rec-dir and --paddle-dict are required, skipping")
+            return False
+        export_paddleocr(args.paddle_det_dir, args.paddle_rec_dir, args.paddle_dict, engine_dir)
+    print(f"[{name}] Exported to {engine_dir}")
+    if args.quantize:
+        paths = onnx_model_paths(out_dir, name)
+        for key in ('det', 'rec'):
+            if os.path.exists(paths[key]):
+                print(f"[{name}] Quantized: {quantize_onnx_model(paths[key])}")
+    return True
+
+
+def load_images(folder):
+    import cv2
+    images = []
+    for f in sorted(os.listdir(folder)):
+        image = cv2.imread(os.path.join(folder, f))
+        if image is not None:
+            images.append((f, cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))
+    return images
+
+
+def timed(fn, image):
+    start = time.perf_counter()
+    result = fn(image)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def verify(name, reference_fn, out_dir, images, args):
+    onnx_engine = OnnxOCREngine(out_dir, name, quantized=args.quantize)
+    matched = 0
+    ref_total = onnx_total = 0.0
+    for f, image in images:
+        ref, ref_ms = timed(reference_fn, image)
+        got, onnx_ms = timed(onnx_engine.recognize, image)
+        ref_total += ref_ms
+        onnx_total += onnx_ms
+        ok = results_match(ref, got, args.tolerance)
+        matched += ok
+        print(f"[{name}] {f}: framework='{ref.text}' ({ref.confidence:.2f}, {ref_ms:.0f} ms) "
+              f"onnx='{got.text}' ({got.confidence:.2f}, {onnx_ms:.0f} ms) {'OK' if ok else 'MISMATCH'}")
+    if images:
+        print(f"[{name}] {matched}/{len(images)} within tolerance; "
+              f"mean latency {ref_total / len(images):.0f} ms -> {onnx_total / len(images):.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engines', nargs='+', default=list(ONNX_ENGINE_NAMES), choices=ONNX_ENGINE_NAMES)
+    parser.add_argument('--out', default='models/onnx', help='Output directory (CONFIGURATION.ONNX_MODEL_DIR)')
+    parser.add_argument('--quantize', action='store_true', help='Also write int8 dynamically quantized models')
+    parser.add_argument('--verify', metavar='IMAGE_DIR', help='Compare framework and ONNX results on these images')
+    parser.add_argument('--tolerance', type=float, default=0.05, help='Allowed confidence difference')
+    parser.add_argument('--paddle-det-dir', help='PaddleOCR det inference model directory')
+    parser.add_argument('--paddle-rec-dir', help='PaddleOCR rec inference model directory')
+    parser.add_argument('--paddle-dict', help='PaddleOCR recognition character dictionary')
+    args = parser.parse_args()
+
+    images = load_images(args.verify) if args.verify else []
+    for name in args.engines:
+        model, reference_fn = framework_engine(name)
+        if export(name, model, args.out, args) and images:
+            verify(name, reference_fn, args.out, images, args)
+
+    print("\nDone. Set CONFIGURATION.USE_ONNX_RUNTIME = True (and ONNX_QUANTIZED if you used --quantize) to use these models.")
+
+
+if __name__ == '__main__':
+    main()
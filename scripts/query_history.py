@@ -0,0 +1,57 @@
+"""
+Script to query the detection history database (CONFIGURATION.HISTORY_DB_PATH).
+
+Examples:
+  python scripts/query_history.py ABC1234            # every sighting of a plate, newest first
+  python scripts/query_history.py 'ABC*' --days 7    # plates starting with ABC seen in the last week
+  python scripts/query_history.py --recent 20        # the latest detections
+  python scripts/query_history.py --compact          # apply the retention policy now
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recognizer.config import CONFIGURATION
+from utils.history_store import open_history_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('plate', nargs='?', help="Plate to look up; a trailing '*' matches by prefix")
+    parser.add_argument('--days', type=float, help='Only detections from the last N days')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--recent', type=int, metavar='N', help='Show the latest N detections of any plate')
+    parser.add_argument('--engines', action='store_true', help="Also print each engine's raw reading")
+    parser.add_argument('--compact', action='store_true', help='Apply retention and reclaim space')
+    args = parser.parse_args()
+
+    store = open_history_store(CONFIGURATION)
+    if store is None:
+        print("History is disabled (HISTORY_DB_PATH is not set).")
+        return
+    if args.compact:
+        print(f"Deleted {store.compact()} detections; {store.count()} remain.")
+        return
+    since = time.time() - args.days * 86400 if args.days else None
+    if args.recent:
+        detections = store.recent(since=since, limit=args.recent)
+    elif args.plate:
+        detections = store.lookup(args.plate, since=since, limit=args.limit)
+    else:
+        parser.error('give a plate, --recent or --compact')
+    for d in detections:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(d.timestamp))
+        alert = ' ALERT' if d.alert else ''
+        print(f"{stamp}  {d.plate:<10} conf {d.confidence:.2f}  region {d.region or '-'}{alert}")
+        if args.engines:
+            for r in d.engine_results:
+                print(f"    {r.source:<12} '{r.text}' ({r.confidence:.2f})")
+    if not detections:
+        print("No matching detections.")
+
+
+if __name__ == '__main__':
+    main()
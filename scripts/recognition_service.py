@@ -0,0 +1,45 @@
+"""
+Script to run the shared recognition service on this host. Operators' GUIs connect to it
+when RECOGNITION_SERVICE_URL is set in recognizer/config.py, so the OCR models are loaded
+once instead of once per operator.
+
+Example:
+  python scripts/recognition_service.py --port 8765
+  curl http://127.0.0.1:8765/stats
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recognizer.config import CONFIGURATION
+from utils.thread_budget import ThreadBudget
+
+# Must run before numpy or any ML framework is imported so their thread pools honour it
+thread_budget = ThreadBudget.from_config(CONFIGURATION)
+thread_budget.apply_environment()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=None, help='Interface to listen on (default SERVICE_HOST, localhost)')
+    parser.add_argument('--port', type=int, default=None, help='Port to listen on (default SERVICE_PORT)')
+    args = parser.parse_args()
+
+    from recognizer.recognizer import LicensePlateRecognizer
+    from recognizer.service import RecognitionService
+    # Operators' regions can share names, so their frames are not tracked across requests
+    CONFIGURATION.ROI_TRACKING = False
+    recognizer = LicensePlateRecognizer(CONFIGURATION, thread_budget=thread_budget)
+    service = RecognitionService.from_config(recognizer, CONFIGURATION, host=args.host, port=args.port)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recognizer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Script to replay frames captured by the frame recorder (CONFIGURATION.FRAME_RECORDER_PATH)
+through the recognizer, for reproducing operator-reported misreads and for regression runs.
+Prints every frame whose plate differs from the recording and a summary at the end.
+
+Example:
+  python scripts/replay_frames.py ~/.license_plate_detector_frames.ring --realtime
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recognizer.config import CONFIGURATION
+from utils.frame_recorder import FrameReplayer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recording', help='Ring file written by the frame recorder')
+    parser.add_argument('--realtime', action='store_true', help='Replay at the original capture pace instead of maximum speed')
+    parser.add_argument('--list', action='store_true', help='Only list the recorded frames and their results')
+    args = parser.parse_args()
+
+    replayer = FrameReplayer(os.path.expanduser(args.recording))
+    if args.list:
+        for timestamp, frame, meta in replayer.frames():
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+            engines = ', '.join(f"{r['source']}='{r['text']}'" for r in meta.get('results', []))
+            print(f"#{meta['seq']} {stamp} {frame.shape} region={meta.get('region')} -> '{meta.get('text')}' [{engines}]")
+        return
+
+    # Never record the replay into the file being replayed
+    CONFIGURATION.FRAME_RECORDER_PATH = None
+    from recognizer.remote import create_recognizer
+    recognizer = create_recognizer(CONFIGURATION)
+
+    total = changed = 0
+    start = time.perf_counter()
+    for meta, result in replayer.replay(recognizer, realtime=args.realtime):
+        total += 1
+        if result.text != meta.get('text') or result.alert != meta.get('alert'):
+            changed += 1
+            print(f"#{meta['seq']}: recorded '{meta.get('text')}' (alert={meta.get('alert')}) "
+                  f"-> now '{result.text}' (alert={result.alert}, conf={result.confidence:.2f})")
+    elapsed = time.perf_counter() - start
+    recognizer.close()
+    print(f"\nDone. {total} frames replayed in {elapsed:.1f} s, {changed} changed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Script to soak-test the recognition pipeline for hours against synthetic plates.
+
+Runs the configured recognizer (in-process, worker processes or the shared service,
+as set in recognizer/config.py) behind the real RecognitionController capture,
+recognize and dispatch threads. Screen capture is replaced with plates from
+utils/synthetic_plates.py, so every frame has known text. Every --sample-seconds it
+records recognition latency and accuracy, RSS, threads, child processes and open
+handles. At the end it reports each metric's drift per hour and anything the
+pipeline left running after it stopped. It exits with status 1 if any drift is over
+its limit, or if a thread or child process was left behind.
+
+Example:
+  python scripts/soak_test.py --hours 4 --regions 2 --csv soak.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from recognizer.config import CONFIGURATION
+from utils.thread_budget import ThreadBudget
+
+# Must run before numpy or any ML framework is imported so their thread pools honour it
+thread_budget = ThreadBudget.from_config(CONFIGURATION)
+thread_budget.apply_environment()
+
+TRUTH_WINDOW = 256  # frames whose ground truth is kept while they wait in the frame queue
+
+
+class SyntheticScreen:
+    """Stands in for ScreenAutomation: every capture is a freshly generated plate per region."""
+    def __init__(self, generator):
+        self.generator = generator
+        self.target_field = None
+        self.truth = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_screens(self, screens):
+        pass
+
+    def capture_regions(self, scan_regions):
+        plates = [self.generator.generate() for _ in scan_regions]
+        with self._lock:
+            for plate in plates:
+                self.truth[id(plate.image)] = (plate.image, plate.text)
+            while len(self.truth) > TRUTH_WINDOW:
+                self.truth.popitem(last=False)
+        return [plate.image for plate in plates]
+
+    def pop_truth(self, image):
+        with self._lock:
+            entry = self.truth.pop(id(image), None)
+        return entry[1] if entry is not None and entry[0] is image else None
+
+    def click_and_type(self, text, position=None):
+        return None
+
+
+class TrackedRecognizer:
+    """Wraps the recognizer to time each batch and score it against the generated text."""
+    def __init__(self, recognizer, screen: SyntheticScreen):
+        self._recognizer = recognizer
+        self._screen = screen
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._frames = self._correct = 0
+
+    def __getattr__(self, name):
+        return getattr(self._recognizer, name)
+
+    def recognize_batch(self, images, regions=None):
+        start = time.perf_counter()
+        results = self._recognizer.recognize_batch(images, regions)
+        latency_ms = (time.perf_counter() - start) * 1000
+        truths = [self._screen.pop_truth(image) for image in images]
+        with self._lock:
+            self._latencies.append(latency_ms)
+            for truth, result in zip(truths, results):
+                if truth is not None:
+                    self._frames += 1
+                    self._correct += result.text == truth
+        return results
+
+    def take_metrics(self) -> dict:
+        """Latency percentiles and accuracy since the previous call."""
+        with self._lock:
+            latencies, self._latencies = sorted(self._latencies), []
+            frames, correct = self._frames, self._correct
+            self._frames = self._correct = 0
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+        return {
+            'batches': len(latencies),
+            'latency_p50_ms': percentile(0.5),
+            'latency_p95_ms': percentile(0.95),
+            'accuracy': correct / frames if frames else None,
+        }
+
+
+class SoakWidget:
+    """The parts of MainWidget the RecognitionController reads."""
+    def __init__(self, recognizer, screen_automation, scan_regions, interval: float):
+        from gui.settings_manager import SettingsStore
+        self.recognizer = recognizer
+        self.screen_automation = screen_automation
+        self.target_field = None
+        # In memory only, so the operator's settings file is left alone
+        self.settings = SettingsStore(None, initial={
+            'scan_regions': [r.to_dict() for r in scan_regions], 'scan_interval': interval,
+        })
+
+
+def _fmt(value, digits=1):
+    return '-' if value is None else f"{value:.{digits}f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=float, default=1.0, help='How long to run (default 1)')
+    parser.add_argument('--regions', type=int, default=1, help='Scan regions captured per frame (default 1)')
+    parser.add_argument('--interval', type=float, default=0.2, help='Scan interval in seconds (default 0.2)')
+    parser.add_argument('--sample-seconds', type=float, default=60.0, help='Seconds between resource samples (default 60)')
+    parser.add_argument('--warmup-seconds', type=float, default=300.0,
+                        help='Ignored when computing drift, so model loading and caches settle first (default 300)')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for the plate generator')
+    parser.add_argument('--csv', help='Append every sample to this CSV file')
+    parser.add_argument('--chrome', action='store_true', help='Also send every plate to the Chrome extension host')
+    parser.add_argument('--max-rss-mb-per-hour', type=float, default=25.0)
+    parser.add_argument('--max-latency-ms-per-hour', type=float, default=50.0)
+    parser.add_argument('--max-leaks-per-hour', type=float, default=1.0,
+                        help='Allowed growth per hour in threads, child processes and open handles')
+    args = parser.parse_args()
+
+    from PyQt5.QtCore import QCoreApplication, Qt
+    import gui.recognition_controller as recognition_controller
+    from gui.recognition_controller import RecognitionController
+    from models import ScanRegion
+    from recognizer.remote import create_recognizer
+    from utils.resource_monitor import ResourceMonitor, drift, sample_resources
+    from utils.synthetic_plates import PlateGenerator
+
+    app = QCoreApplication(sys.argv)
+    # Keep the operator's history and recordings out of the soak run
+    workdir = tempfile.mkdtemp(prefix='lpd-soak-')
+    CONFIGURATION.HISTORY_DB_PATH = os.path.join(workdir, 'history.db')
+    CONFIGURATION.FRAME_RECORDER_PATH = None
+    if not args.chrome:
+        recognition_controller.send_plate_to_chrome = lambda plate: None
+
+    screen = SyntheticScreen(PlateGenerator(seed=args.seed))
+    recognizer = TrackedRecognizer(create_recognizer(CONFIGURATION, thread_budget=thread_budget), screen)
+    regions = [ScanRegion(f'region{i + 1}', (0, 0, 240, 120)) for i in range(max(1, args.regions))]
+    controller = RecognitionController(SoakWidget(recognizer, screen, regions, args.interval))
+    errors = []
+    controller.error_signal.connect(errors.append, Qt.DirectConnection)
+
+    writer = None
+    csv_file = open(args.csv, 'a', newline='') if args.csv else None
+
+    def on_sample(sample):
+        nonlocal writer
+        row = sample.as_row()
+        if csv_file is not None:
+            if writer is None:
+                writer = csv.DictWriter(csv_file, fieldnames=list(row))
+                if csv_file.tell() == 0:
+                    writer.writeheader()
+            writer.writerow(row)
+            csv_file.flush()
+        print(f"[{row['elapsed'] / 60:7.1f} min] batches={row.get('batches', 0)} "
+              f"p50={_fmt(row.get('latency_p50_ms'))} ms p95={_fmt(row.get('latency_p95_ms'))} ms "
+              f"acc={_fmt(row.get('accuracy'), 3)} rss={_fmt(row['rss_mb'])} MB threads={row['python_threads']}/"
+              f"{row['os_threads']} children={row['children']} handles={row['handles']} errors={len(errors)}")
+
+    monitor = ResourceMonitor(args.sample_seconds, extra=recognizer.take_metrics, on_sample=on_sample)
+    monitor.start()
+    baseline = monitor.samples[0]
+    controller.start()
+    deadline = time.monotonic() + args.hours * 3600
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+            app.processEvents()
+    except KeyboardInterrupt:
+        print("Interrupted, stopping early")
+    monitor.stop()
+    controller.stop()
+    for thread in controller._threads:
+        thread.join(timeout=30)
+    # Engine threads start on first use, after the baseline sample, so they count unless closed
+    recognizer.close()
+    time.sleep(1.0)
+    after = sample_resources()
+    if csv_file is not None:
+        csv_file.close()
+
+    limits = {
+        'rss_mb': args.max_rss_mb_per_hour,
+        'latency_p95_ms': args.max_latency_ms_per_hour,
+        'python_threads': args.max_leaks_per_hour,
+        'os_threads': args.max_leaks_per_hour,
+        'children': args.max_leaks_per_hour,
+        'handles': args.max_leaks_per_hour,
+    }
+    print(f"\nDrift per hour after {args.warmup_seconds:.0f} s warm-up ({len(monitor.samples)} samples, "
+          f"{len(errors)} pipeline errors):")
+    failed = []
+    for metric, limit in limits.items():
+        slope = drift(monitor.samples, metric, skip_seconds=args.warmup_seconds)
+        over = slope is not None and slope > limit
+        if over:
+            failed.append(metric)
+        print(f"  {metric:16} {_fmt(slope, 2):>10} / h  (limit {limit:g}){'  OVER LIMIT' if over else ''}")
+    # Pipeline threads and child processes must all be gone once the controller has stopped
+    print("Left behind after stop (vs. before start):")
+    for metric in ('python_threads', 'os_threads', 'children', 'handles'):
+        before, now = getattr(baseline, metric), getattr(after, metric)
+        growth = now - before if before is not None and now is not None else None
+        leaked = metric in ('python_threads', 'children') and growth is not None and growth > 0
+        if leaked:
+            failed.append(f'{metric} after stop')
+        print(f"  {metric:16} {_fmt(growth, 0):>10}{'  LEAKED' if leaked else ''}")
+    if errors:
+        print(f"Last pipeline error: {errors[-1]}")
+    if failed:
+        print(f"FAILED: {', '.join(failed)}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
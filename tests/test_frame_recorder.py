@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from models import OCRResult
+from utils.frame_recorder import FrameRecorder, FrameReplayer
+
+
+class FrameRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'frames.ring')
+        self.logged = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_frames_replay_oldest_first_after_wrapping(self):
+        recorder = FrameRecorder(self.path, slot_count=3, slot_size=4096)
+        for i in range(5):
+            frame = np.full((10, 20, 3), i, dtype=np.uint8)
+            self.assertTrue(recorder.record(frame, [OCRResult(f'ABC{i}', 0.9, 'easyocr')], text=f'ABC{i}'))
+        recorder.close()
+        replayer = FrameReplayer(self.path)
+        recorded = list(replayer.frames())
+        self.assertEqual([meta['text'] for _, _, meta in recorded], ['ABC2', 'ABC3', 'ABC4'])
+        self.assertEqual(recorded[0][1].shape, (10, 20, 3))
+        self.assertEqual(int(recorded[-1][1][0, 0, 0]), 4)
+        self.assertEqual(recorded[-1][2]['results'][0]['source'], 'easyocr')
+        del recorded
+        replayer.close()
+
+    def test_oversize_frames_are_skipped_and_logged_once(self):
+        recorder = FrameRecorder(self.path, slot_count=2, slot_size=1024, log=self.logged.append)
+        for _ in range(3):
+            self.assertFalse(recorder.record(np.zeros((40, 40), dtype=np.uint8)))
+        self.assertTrue(recorder.record(np.zeros((8, 8), dtype=np.uint8)))
+        recorder.close()
+        self.assertEqual(recorder.skipped, 3)
+        self.assertEqual(len(self.logged), 1)
+        self.assertIn('40x40x1', self.logged[0])
+        self.assertIn('1024', self.logged[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from models import OCRResult, RecognitionResult
+from utils.history_store import HistoryStore
+
+
+def detection(plate, confidence=0.9, alert=False, region='Lane 1'):
+    readings = [OCRResult(plate, confidence, 'easyocr'), OCRResult(plate, confidence - 0.1, 'tesseract')]
+    return RecognitionResult(plate, confidence, alert, region, readings)
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.logged = []
+        self.store = self.open()
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def open(self, **kwargs):
+        path = os.path.join(self.directory.name, 'history.db')
+        return HistoryStore(path, flush_interval=0.05, maintenance_interval=0, log=self.logged.append, **kwargs)
+
+    def test_flush_commits_everything_queued(self):
+        for plate in ('ABC1234', 'XYZ9876', 'ABC1234'):
+            self.assertTrue(self.store.record(detection(plate)))
+        self.assertTrue(self.store.flush(timeout=5))
+        self.assertEqual(self.store.count(), 3)
+        self.assertEqual(self.store.written, 3)
+        self.assertEqual(self.store.dropped, 0)
+
+    def test_queries_return_engine_readings_newest_first(self):
+        now = time.time()
+        for i in range(5):
+            self.store.record(detection('ABC1234', confidence=0.5 + i / 10), timestamp=now + i)
+        self.store.record(detection('ABD5678'), timestamp=now + 10)
+        self.store.flush(timeout=5)
+        found = self.store.lookup('ABC1234', limit=3)
+        self.assertEqual([round(d.confidence, 2) for d in found], [0.9, 0.8, 0.7])
+        self.assertTrue(all(len(d.engine_results) == 2 for d in found))
+        self.assertEqual({r.source for r in found[0].engine_results}, {'easyocr', 'tesseract'})
+        self.assertEqual([d.plate for d in self.store.lookup('AB*')][:2], ['ABD5678', 'ABC1234'])
+        self.assertEqual(self.store.last_seen('abd5678').timestamp, now + 10)
+        self.assertEqual(len(self.store.recent(since=now + 3)), 3)
+
+    def test_queries_with_a_large_limit_are_not_bound_per_row(self):
+        for i in range(1200):
+            self.store.record(detection(f'ABC{i:04d}'))
+        self.store.flush(timeout=10)
+        found = self.store.recent(limit=100_000)
+        self.assertEqual(len(found), 1200)
+        self.assertEqual(sum(len(d.engine_results) for d in found), 2400)
+
+    def test_retention_drops_old_and_excess_detections(self):
+        self.store.close()
+        self.store = self.open(retention_days=1, max_rows=3)
+        now = time.time()
+        self.store.record(detection('OLD1234'), timestamp=now - 2 * 86400)
+        for i in range(5):
+            self.store.record(detection(f'NEW{i:04d}'), timestamp=now + i)
+        self.assertEqual(self.store.compact(), 3)
+        self.assertEqual([d.plate for d in self.store.recent()], ['NEW0004', 'NEW0003', 'NEW0002'])
+        with sqlite3.connect(self.store.path) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM engine_results').fetchone()[0], 6)
+
+    def test_a_failed_batch_is_counted_and_does_not_stop_the_writer(self):
+        with sqlite3.connect(self.store.path) as conn:
+            conn.execute("CREATE TRIGGER reject BEFORE INSERT ON detections WHEN NEW.plate = 'BAD0000' "
+                         "BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+        self.store.record(detection('BAD0000'))
+        self.assertTrue(self.store.flush(timeout=5))
+        self.assertEqual(self.store.failed, 1)
+        self.assertEqual(self.store.dropped, 1)
+        self.assertIn('rejected', self.logged[0])
+        self.store.record(detection('ABC1234'))
+        self.assertTrue(self.store.flush(timeout=5))
+        self.assertEqual(self.store.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
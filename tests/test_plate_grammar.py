@@ -0,0 +1,55 @@
+import unittest
+
+from models import OCRResult
+from utils.plate_grammar import PlateGrammar
+from utils.validation import CORRECTION_PENALTY, get_consensus_result
+
+
+class PlateGrammarTest(unittest.TestCase):
+    def setUp(self):
+        self.grammar = PlateGrammar({'TX': ['LLLDDDD'], 'QC': ['DDDLLL']})
+
+    def test_matches_reports_the_accepting_jurisdictions(self):
+        self.assertEqual(self.grammar.matches('ABC1234'), frozenset({'TX'}))
+        self.assertEqual(self.grammar.matches('123ABC'), frozenset({'QC'}))
+        self.assertEqual(self.grammar.matches('AB12345'), frozenset())
+
+    def test_correct_substitutes_the_cheapest_confusables(self):
+        match = self.grammar.correct('AB01234')
+        self.assertEqual(match.text, 'ABO1234')
+        self.assertEqual(match.cost, 1.0)
+
+    def test_correct_leaves_valid_text_alone(self):
+        match = self.grammar.correct('ABC1234')
+        self.assertEqual((match.text, match.cost), ('ABC1234', 0.0))
+
+    def test_correct_gives_up_beyond_max_cost(self):
+        self.assertIsNone(self.grammar.correct('A801234', max_cost=0.5))
+        self.assertIsNone(self.grammar.correct('AB-1234'))
+
+
+class GrammarConsensusTest(unittest.TestCase):
+    def setUp(self):
+        self.grammar = PlateGrammar({'TX': ['LLLDDDD'], 'QC': ['DDDLLL']})
+
+    def consensus(self, *readings):
+        results = [OCRResult(text, confidence, f'engine{i}') for i, (text, confidence) in enumerate(readings)]
+        return get_consensus_result(results, len(results), 0.5, 0.5, self.grammar)
+
+    def test_valid_readings_are_never_corrected(self):
+        text, confidence, alert = self.consensus(('ABC1234', 0.9), ('ABC1234', 0.9))
+        self.assertEqual((text, confidence, alert), ('ABC1234', 0.9, False))
+
+    def test_confusable_misreads_vote_together_but_alert(self):
+        text, confidence, alert = self.consensus(('ABO1234', 0.9), ('AB01234', 0.9))
+        self.assertEqual(text, 'ABO1234')
+        self.assertAlmostEqual(confidence, 0.9 * (1 - CORRECTION_PENALTY / 2))
+        self.assertTrue(alert)
+
+    def test_without_a_grammar_nothing_is_corrected(self):
+        results = [OCRResult('AB01234', 0.9, 'a'), OCRResult('AB01234', 0.9, 'b')]
+        self.assertEqual(get_consensus_result(results, 2, 0.5, 0.5), ('AB01234', 0.9, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from models import OCRResult
+from ocr.base import BaseOCREngine, EngineCapabilities
+from ocr.registry import EngineRegistry, PlanStep, convert_color, plan_execution
+from recognizer.breaker import CircuitBreaker, EngineGuard
+
+
+def engine(name, **capabilities):
+    return type(name, (BaseOCREngine,), {'name': name, 'capabilities': EngineCapabilities(**capabilities)})()
+
+
+class PlanExecutionTest(unittest.TestCase):
+    def setUp(self):
+        self.engines = {
+            'heavy': engine('heavy', batch=True, latency_ms=600, memory_mb=700, color='rgb'),
+            'light': engine('light', thread_safe=True, latency_ms=3, memory_mb=5, color='any'),
+            'mid': engine('mid', latency_ms=150, memory_mb=400, color='gray'),
+            'lean': engine('lean', thread_safe=True, latency_ms=150, memory_mb=50, color='gray'),
+        }
+
+    def test_cheapest_first_with_memory_breaking_ties(self):
+        self.assertEqual([s.name for s in plan_execution(self.engines)], ['light', 'lean', 'mid', 'heavy'])
+
+    def test_steps_carry_batching_color_and_concurrency(self):
+        plan = {s.name: s for s in plan_execution(self.engines, frame_count=3)}
+        self.assertEqual(plan['heavy'], PlanStep('heavy', True, 'rgb', False))
+        self.assertEqual(plan['lean'], PlanStep('lean', False, 'gray', True))
+        self.assertFalse(plan_execution(self.engines, frame_count=1)[-1].batched)
+
+    def test_engines_larger_than_the_memory_budget_are_left_out(self):
+        self.assertEqual([s.name for s in plan_execution(self.engines, memory_budget_mb=500)], ['light', 'lean', 'mid'])
+
+
+class ConvertColorTest(unittest.TestCase):
+    def test_frames_are_converted_to_the_preferred_color(self):
+        rgba = np.zeros((4, 6, 4), dtype=np.uint8)
+        gray = np.zeros((4, 6), dtype=np.uint8)
+        self.assertEqual(convert_color(rgba, 'rgb').shape, (4, 6, 3))
+        self.assertEqual(convert_color(rgba, 'gray').shape, (4, 6))
+        self.assertEqual(convert_color(gray, 'rgb').shape, (4, 6, 3))
+        self.assertIs(convert_color(gray, 'gray'), gray)
+        self.assertIs(convert_color(rgba, 'any'), rgba)
+
+
+class EngineRegistryTest(unittest.TestCase):
+    def test_registered_classes_and_targets_resolve(self):
+        registry = EngineRegistry()
+        light = type(engine('light', latency_ms=3))
+        registry.register('light', light)
+        registry.register('base', 'ocr.base:BaseOCREngine')
+        self.assertEqual(registry.names(), ['light', 'base'])
+        self.assertIs(registry.engine_class('base'), BaseOCREngine)
+        self.assertEqual(registry.capabilities('light').latency_ms, 3)
+        with self.assertRaises(KeyError):
+            registry.engine_class('missing')
+
+    def test_non_engine_classes_are_rejected(self):
+        registry = EngineRegistry()
+        registry.register('bad', OCRResult)
+        with self.assertRaises(TypeError):
+            registry.engine_class('bad')
+
+
+class EngineGuardTest(unittest.TestCase):
+    def guard(self, name, timeout=None):
+        guard = EngineGuard(name, CircuitBreaker(name, failure_threshold=1), timeout=timeout)
+        self.addCleanup(guard.close)
+        return guard
+
+    def test_submitted_calls_run_side_by_side(self):
+        barrier = threading.Barrier(2, timeout=2)
+        first, second = self.guard('first'), self.guard('second')
+        calls = [first.submit(barrier.wait), second.submit(barrier.wait)]
+        self.assertEqual(sorted([first.wait(calls[0]), second.wait(calls[1])]), [0, 1])
+        self.assertEqual(first.breaker.state, 'closed')
+
+    def test_wait_counts_the_timeout_from_submission(self):
+        guard = self.guard('slow', timeout=0.2)
+        call = guard.submit(time.sleep, 0.5)
+        time.sleep(0.3)
+        start = time.perf_counter()
+        self.assertIsNone(guard.wait(call))
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(guard.timeouts, 1)
+        self.assertEqual(guard.breaker.state, 'open')
+
+
+if __name__ == '__main__':
+    unittest.main()
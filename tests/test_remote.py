@@ -0,0 +1,96 @@
+import socket
+import threading
+import unittest
+
+import numpy as np
+
+from models import OCRResult, RecognitionResult
+from recognizer.remote import BUSY_RETRIES, RemoteRecognizer
+from recognizer.service import RecognitionService
+
+
+class Config:
+    AGREEMENT_THRESHOLD = 0.5
+    CONFIDENCE_THRESHOLD = 0.5
+    PLATE_GRAMMAR_ENABLED = False
+
+
+class FakeRecognizer:
+    def __init__(self, source):
+        self.source = source
+        self.calls = 0
+        self.closed = False
+
+    def recognize_batch(self, frames, regions=None):
+        self.calls += 1
+        regions = regions or [None] * len(frames)
+        return [RecognitionResult('ABC1234', 0.9, False, region, [OCRResult('ABC1234', 0.9, self.source)], 'native', 7)
+                for region in regions]
+
+    def engine_count(self):
+        return 1
+
+    def close(self):
+        self.closed = True
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class RemoteRecognizerTest(unittest.TestCase):
+    def setUp(self):
+        self.port = free_port()
+        self.fallbacks = []
+
+    def fallback(self):
+        self.fallbacks.append(FakeRecognizer('local'))
+        return self.fallbacks[-1]
+
+    def client(self, retry_seconds=0.0):
+        client = RemoteRecognizer(f'http://127.0.0.1:{self.port}', Config(), self.fallback, timeout=5,
+                                  retry_seconds=retry_seconds)
+        self.addCleanup(client.close)
+        return client
+
+    def serve(self, **kwargs):
+        service = RecognitionService(FakeRecognizer('service'), port=self.port, batch_window_ms=1, **kwargs)
+        thread = threading.Thread(target=service.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(service.shutdown)
+        while service._server is None:
+            threading.Event().wait(0.01)
+        return service
+
+    def frames(self, count=2):
+        return [np.zeros((20, 60, 3), dtype=np.uint8)] * count
+
+    def test_results_round_trip_with_their_track(self):
+        self.serve()
+        results = self.client().recognize_batch(self.frames(), ['Lane 1', 'Lane 2'])
+        self.assertEqual([(r.region, r.track, r.engine_results[0].source) for r in results],
+                         [('Lane 1', 7, 'service'), ('Lane 2', 7, 'service')])
+        self.assertEqual(self.fallbacks, [])
+
+    def test_a_busy_service_is_retried_and_never_replaced(self):
+        service = self.serve(max_per_client=0)
+        results = self.client().recognize_batch(self.frames(), ['Lane 1', 'Lane 2'])
+        self.assertEqual([(r.text, r.alert, r.region) for r in results], [('', True, 'Lane 1'), ('', True, 'Lane 2')])
+        self.assertEqual(sum(stats.rejected for stats in service.clients.values()), BUSY_RETRIES + 1)
+        self.assertEqual(self.fallbacks, [])
+
+    def test_an_unreachable_service_falls_back_until_it_answers(self):
+        client = self.client()
+        self.assertEqual(client.recognize_batch(self.frames(1))[0].engine_results[0].source, 'local')
+        self.assertEqual(len(self.fallbacks), 1)
+        self.serve()
+        self.assertEqual(client.recognize_batch(self.frames(1))[0].engine_results[0].source, 'service')
+        self.assertTrue(self.fallbacks[0].closed)
+        self.assertIsNone(client._fallback)
+
+
+if __name__ == '__main__':
+    unittest.main()
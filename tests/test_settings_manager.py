@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from gui.settings_manager import MIN_SCAN_INTERVAL, PipelineSettings, SettingsStore
+
+
+class SettingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'settings.json')
+
+    def store(self, write_delay=0.1):
+        store = SettingsStore(self.path, write_delay=write_delay)
+        self.addCleanup(store.flush)
+        return store
+
+    def saved(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_a_burst_of_changes_is_written_once_after_the_delay(self):
+        store = self.store(write_delay=0.2)
+        for interval in (1.0, 1.5, 2.5):
+            store.update(scan_interval=interval)
+        store.update({'input_mode': 'chrome'})
+        self.assertFalse(os.path.exists(self.path))
+        deadline = time.monotonic() + 5
+        while store.writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.3)
+        self.assertEqual(store.writes, 1)
+        self.assertEqual(self.saved(), {'scan_interval': 2.5, 'input_mode': 'chrome'})
+        self.assertEqual(os.listdir(self.directory.name), ['settings.json'])
+
+    def test_updates_merge_into_the_saved_settings(self):
+        with open(self.path, 'w') as f:
+            json.dump({'scan_interval': 3.0, 'engine_profile': 'fast'}, f)
+        store = self.store(write_delay=60)
+        store.update(engine_profile='balanced')
+        store.flush()
+        self.assertEqual(self.saved(), {'scan_interval': 3.0, 'engine_profile': 'balanced'})
+        self.assertEqual(store.writes, 1)
+        store.flush()
+        self.assertEqual(store.writes, 1)
+
+    def test_subscribers_see_only_changed_keys(self):
+        store = self.store(write_delay=60)
+        store.update(scan_interval=2.0)
+        seen = []
+        unsubscribe = store.subscribe(lambda snapshot, changed: seen.append(dict(changed)))
+        store.update(scan_interval=2.0, input_mode='keystroke')
+        store.update(scan_interval=2.0)
+        unsubscribe()
+        store.update(scan_interval=4.0)
+        self.assertEqual(seen, [{'input_mode': 'keystroke'}])
+
+    def test_snapshots_are_frozen_and_survive_later_changes(self):
+        store = self.store(write_delay=60)
+        region = {'name': 'Lane 1', 'region': [0, 0, 200, 60]}
+        store.update(scan_regions=[region])
+        snapshot = store.snapshot()
+        region['name'] = 'changed'
+        store.update(scan_interval=5.0)
+        self.assertEqual(snapshot['scan_regions'][0]['name'], 'Lane 1')
+        self.assertNotIn('scan_interval', snapshot)
+        with self.assertRaises(TypeError):
+            snapshot['scan_interval'] = 1.0
+
+    def test_a_failed_write_is_retried_on_the_next_flush(self):
+        self.path = os.path.join(self.directory.name, 'missing', 'settings.json')
+        store = SettingsStore(self.path, write_delay=60)
+        store.update(scan_interval=2.0)
+        store.flush()
+        self.assertEqual(store.writes, 0)
+        os.mkdir(os.path.dirname(self.path))
+        store.flush()
+        self.assertEqual(self.saved(), {'scan_interval': 2.0})
+
+    def test_memory_only_store_never_writes(self):
+        store = SettingsStore(None, initial={'scan_interval': 1.0})
+        store.update(scan_interval=2.0)
+        store.flush()
+        self.assertEqual((store.get('scan_interval'), store.writes), (2.0, 0))
+
+
+class PipelineSettingsTest(unittest.TestCase):
+    def test_interval_is_clamped_and_legacy_region_used(self):
+        settings = PipelineSettings.from_settings({'scan_interval': 0.0, 'scan_region': [1, 2, 3, 4]})
+        self.assertEqual(settings.scan_interval, MIN_SCAN_INTERVAL)
+        self.assertEqual([(r.name, r.region) for r in settings.scan_regions], [('default', (1, 2, 3, 4))])
+
+    def test_named_regions_win_over_the_legacy_key(self):
+        settings = PipelineSettings.from_settings({
+            'scan_interval': 'bad', 'scan_region': [1, 2, 3, 4],
+            'scan_regions': [{'name': 'Lane 2', 'region': [5, 6, 7, 8], 'screen': 1}],
+        })
+        self.assertEqual(settings.scan_interval, 2.0)
+        self.assertEqual([(r.name, r.region, r.screen) for r in settings.scan_regions], [('Lane 2', (5, 6, 7, 8), 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from utils.shm_frames import FrameDescriptor, SharedFrameTransport
+
+
+class SharedFrameTransportTest(unittest.TestCase):
+    def transport(self, consumers=2, slot_count=2, slot_size=1024):
+        transport = SharedFrameTransport(consumers, slot_count, slot_size)
+        self.addCleanup(transport.close)
+        return transport
+
+    def free_permits(self, transport):
+        permits = 0
+        while transport._free.acquire(timeout=0):
+            permits += 1
+        for _ in range(permits):
+            transport._free.release()
+        return permits
+
+    def test_a_slot_is_free_once_every_consumer_released_it(self):
+        transport = self.transport()
+        frame = np.arange(60, dtype=np.uint8).reshape(6, 10)
+        transport.send([frame], 'request')
+        for consumer in (0, 1):
+            descriptors, payload = transport.receive(consumer, timeout=1)
+            self.assertEqual(payload, 'request')
+            with transport.frames(descriptors, consumer) as views:
+                np.testing.assert_array_equal(views[0], frame)
+            self.assertEqual(transport.in_use(), 1 - consumer)
+        self.assertEqual(self.free_permits(transport), 2)
+
+    def test_a_full_ring_returns_the_slots_already_claimed(self):
+        transport = self.transport(slot_count=2)
+        frames = [np.zeros((10, 10), dtype=np.uint8)] * 3
+        self.assertIsNone(transport.send(frames, timeout=0.05))
+        self.assertEqual(transport.in_use(), 0)
+        self.assertEqual(self.free_permits(transport), 2)
+        self.assertIsNone(transport.receive(0, timeout=0.05))
+
+    def test_frames_larger_than_a_slot_are_sent_as_arrays(self):
+        transport = self.transport(slot_size=1024)
+        small, large = np.ones((8, 8), dtype=np.uint8), np.full((40, 40, 3), 7, dtype=np.uint8)
+        sent = transport.send([small, large])
+        self.assertIsInstance(sent[0], FrameDescriptor)
+        self.assertIsInstance(sent[1], np.ndarray)
+        self.assertEqual((transport.copied, transport.in_use()), (1, 1))
+        for consumer in (0, 1):
+            descriptors, _ = transport.receive(consumer, timeout=1)
+            with transport.frames(descriptors, consumer) as views:
+                np.testing.assert_array_equal(views[1], large)
+        self.assertEqual(transport.in_use(), 0)
+        self.assertEqual(self.free_permits(transport), 2)
+        with self.assertRaises(ValueError):
+            transport.write(large)
+
+    def test_nothing_is_claimed_without_an_active_consumer(self):
+        transport = self.transport(consumers=1)
+        transport.detach(0)
+        self.assertIsNone(transport.write(np.zeros((4, 4), dtype=np.uint8), timeout=0))
+        self.assertIsNone(transport.send([np.zeros((4, 4), dtype=np.uint8)], timeout=0))
+        self.assertEqual(transport.in_use(), 0)
+        self.assertEqual(self.free_permits(transport), 2)
+
+    def test_dropping_a_consumer_frees_the_slots_it_held(self):
+        transport = self.transport()
+        transport.send([np.zeros((4, 4), dtype=np.uint8)] * 2)
+        descriptors, _ = transport.receive(0, timeout=1)
+        transport.release(descriptors, 0)
+        self.assertEqual(transport.drop(1), 2)
+        self.assertEqual(transport.in_use(), 0)
+        self.assertEqual(self.free_permits(transport), 2)
+        transport.send([np.zeros((4, 4), dtype=np.uint8)])
+        self.assertEqual(transport.in_use(), 1)
+        descriptors, _ = transport.receive(0, timeout=1)
+        transport.release(descriptors, 0)
+        self.assertEqual(transport.in_use(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from utils.state_filters import build_index, is_state_name_or_abbreviation, strip_jurisdiction_text
+
+
+class StripJurisdictionTextTest(unittest.TestCase):
+    def test_plates_without_jurisdiction_text_are_unchanged(self):
+        for text in ('AB 1234', 'IN 4567 AB', 'ME 2 U', 'DEALERSHIP', 'GEORGIA1', 'OHIO123'):
+            with self.subTest(text=text):
+                self.assertEqual(strip_jurisdiction_text(text), text)
+
+    def test_whole_word_names_and_slogans_are_removed(self):
+        self.assertEqual(strip_jurisdiction_text('TEXAS ABC1234'), 'ABC1234')
+        self.assertEqual(strip_jurisdiction_text('New York ABC1234'), 'ABC1234')
+        self.assertEqual(strip_jurisdiction_text('ABC1234 USA'), 'ABC1234')
+        self.assertEqual(strip_jurisdiction_text('Pure Michigan BXY 1234'), 'BXY 1234')
+
+    def test_names_glued_to_a_plate_shaped_word_are_cut_off(self):
+        self.assertEqual(strip_jurisdiction_text('TEXASABC123'), 'ABC123')
+        self.assertEqual(strip_jurisdiction_text('ABC1234TEXAS'), 'ABC1234')
+        self.assertEqual(strip_jurisdiction_text('NEW YORKABC123'), 'ABC123')
+        self.assertEqual(strip_jurisdiction_text('DEALER4567'), '4567')
+
+    def test_only_the_found_jurisdictions_abbreviation_is_removed(self):
+        self.assertEqual(strip_jurisdiction_text('TEXAS TX ABC1234'), 'ABC1234')
+        self.assertEqual(strip_jurisdiction_text('The Lone Star State TX ABC 1234'), 'ABC 1234')
+        self.assertEqual(strip_jurisdiction_text('TEXAS AB 1234'), 'AB 1234')
+        self.assertEqual(strip_jurisdiction_text('Sunshine State FL 1AB 23C'), '1AB 23C')
+
+    def test_a_bare_jurisdiction_strips_to_nothing(self):
+        self.assertEqual(strip_jurisdiction_text('Florida'), '')
+        self.assertTrue(is_state_name_or_abbreviation('florida'))
+        self.assertTrue(is_state_name_or_abbreviation('TX'))
+        self.assertFalse(is_state_name_or_abbreviation('ABC123'))
+
+    def test_canada_can_be_left_out(self):
+        index = build_index(include_canada=False)
+        self.assertFalse(index.contains('Ontario'))
+        self.assertEqual(index.strip('ONTARIO ABCD123'), 'ONTARIO ABCD123')
+
+
+if __name__ == '__main__':
+    unittest.main()
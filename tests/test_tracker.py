@@ -0,0 +1,88 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from models import OCRResult, RecognitionResult
+from recognizer.tracker import RoiTracker
+
+PLATE_BOX = (100, 70, 200, 60)
+
+
+def plate_frame(text, dx=0):
+    frame = np.full((200, 400, 3), 90, dtype=np.uint8)
+    cv2.rectangle(frame, (100 + dx, 70), (300 + dx, 130), (255, 255, 255), -1)
+    cv2.putText(frame, text, (110 + dx, 115), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 3)
+    return frame
+
+
+class Reader:
+    """Stands in for the recognizer: reads whatever text and confidence it is told to."""
+    def __init__(self):
+        self.text, self.confidence, self.alert = 'ABC1234', 0.95, False
+        self.sizes = []
+
+    def __call__(self, frames, regions):
+        results = []
+        for frame, region in zip(frames, regions):
+            self.sizes.append(frame.shape[:2])
+            full = frame.shape[:2] == (200, 400)
+            box = PLATE_BOX if full else (0, 0, frame.shape[1], frame.shape[0])
+            reading = OCRResult(self.text, self.confidence, 'engine', box)
+            results.append(RecognitionResult(self.text, self.confidence, self.alert, region, [reading]))
+        return results
+
+
+class RoiTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tracker = RoiTracker()
+        self.read = Reader()
+
+    def recognize(self, frame):
+        return self.tracker.recognize([frame], ['Lane 1'], self.read)[0]
+
+    def test_a_moving_plate_is_read_through_a_crop_on_one_track(self):
+        first = self.recognize(plate_frame('ABC1234'))
+        for dx in (5, 10, 15):
+            result = self.recognize(plate_frame('ABC1234', dx))
+            self.assertEqual((result.text, result.track), ('ABC1234', first.track))
+        self.assertEqual(self.tracker.counts['tracked'], 3)
+        self.assertLess(self.read.sizes[1][0], 200)
+
+    def test_a_confident_different_reading_starts_a_new_track(self):
+        first = self.recognize(plate_frame('ABC1234'))
+        self.recognize(plate_frame('ABC1234'))
+        self.read.text = 'ABC1235'
+        for _ in range(7):
+            result = self.recognize(plate_frame('ABC1235'))
+            self.assertEqual((result.text, result.alert), ('ABC1235', False))
+            self.assertNotEqual(result.track, first.track)
+
+    def test_an_uncertain_near_reading_takes_the_tracks_vote(self):
+        first = self.recognize(plate_frame('ABC1234'))
+        self.recognize(plate_frame('ABC1234'))
+        self.read.text, self.read.confidence, self.read.alert = 'A8C1234', 0.4, True
+        result = self.recognize(plate_frame('ABC1234'))
+        self.assertEqual((result.text, result.track, result.alert), ('ABC1234', first.track, True))
+        self.assertAlmostEqual(result.confidence, 0.95)
+
+    def test_an_uncertain_far_reading_is_not_outvoted(self):
+        self.recognize(plate_frame('ABC1234'))
+        self.read.text, self.read.confidence, self.read.alert = 'XYZ9876', 0.4, True
+        result = self.recognize(plate_frame('ABC1234'))
+        self.assertEqual((result.text, result.track), ('XYZ9876', None))
+        self.assertNotIn('Lane 1', self.tracker.tracks)
+
+    def test_a_full_read_of_another_plate_in_the_same_place_starts_a_new_track(self):
+        tracker = RoiTracker(redetect_every=1)
+        first = tracker.recognize([plate_frame('ABC1234')], ['Lane 1'], self.read)[0]
+        tracker.recognize([plate_frame('ABC1234')], ['Lane 1'], self.read)
+        self.read.text = 'ABC1235'
+        result = tracker.recognize([plate_frame('ABC1235')], ['Lane 1'], self.read)[0]
+        self.assertEqual(tracker.counts['redetect'], 1)
+        self.assertEqual(result.text, 'ABC1235')
+        self.assertNotEqual(result.track, first.track)
+
+
+if __name__ == '__main__':
+    unittest.main()
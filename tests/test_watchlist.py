@@ -0,0 +1,71 @@
+import os
+import random
+import string
+import tempfile
+import unittest
+
+from utils.watchlist import Watchlist, levenshtein
+
+ALPHABET = string.ascii_uppercase + string.digits
+
+
+def mutate(rng, plate, edits):
+    chars = list(plate)
+    for _ in range(edits):
+        op, i = rng.choice('sdi'), rng.randrange(len(chars))
+        if op == 's':
+            chars[i] = rng.choice(ALPHABET)
+        elif op == 'd' and len(chars) > 1:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice(ALPHABET))
+    return ''.join(chars)
+
+
+class WatchlistTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.rng = rng
+        self.plates = sorted({''.join(rng.choice(ALPHABET) for _ in range(rng.randint(5, 8))) for _ in range(2000)})
+
+    def brute_force(self, query, max_distance):
+        if query in self.plates:
+            return {(query, 0)}
+        return {(p, d) for p in self.plates for d in [levenshtein(query, p, max_distance)] if d <= max_distance}
+
+    def test_fuzzy_matches_agree_with_brute_force(self):
+        for max_distance in (1, 2):
+            watchlist = Watchlist(max_distance=max_distance)
+            watchlist.load_plates(self.plates)
+            for _ in range(150):
+                query = mutate(self.rng, self.rng.choice(self.plates), self.rng.randint(0, max_distance))
+                with self.subTest(max_distance=max_distance, query=query):
+                    found = {(h.listed, h.distance) for h in watchlist.match(query)}
+                    self.assertEqual(found, self.brute_force(query, max_distance))
+
+    def test_hits_are_sorted_closest_first(self):
+        watchlist = Watchlist(max_distance=2)
+        watchlist.load_plates(['ABC1234', 'ABC1235', 'XBC1299'])
+        self.assertEqual([(h.listed, h.distance) for h in watchlist.match('ABC1239')],
+                         [('ABC1234', 1), ('ABC1235', 1), ('XBC1299', 2)])
+
+    def test_distance_is_capped_at_the_index_depth(self):
+        watchlist = Watchlist(max_distance=1)
+        watchlist.load_plates(['ABC1234'])
+        self.assertEqual(watchlist.match('XBC1294', max_distance=2), [])
+        self.assertEqual([h.distance for h in watchlist.match('XBC1234', max_distance=2)], [1])
+        self.assertEqual(watchlist.match('XBC1234', max_distance=0), [])
+
+    def test_csv_notes_survive_a_reload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hotlist.csv')
+            with open(path, 'w') as f:
+                f.write('plate,reason\nabc-1234,stolen\nXYZ 987,\n')
+            watchlist = Watchlist(path, max_distance=1)
+            self.assertEqual(len(watchlist), 2)
+            self.assertEqual(watchlist.match('ABC1234')[0].note, 'stolen')
+            self.assertEqual(watchlist.match('XYZ988')[0].listed, 'XYZ987')
+
+
+if __name__ == '__main__':
+    unittest.main()
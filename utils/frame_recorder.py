@@ -0,0 +1,162 @@
+"""Fixed-size, memory-mapped ring file of captured frames and their recognition results.
+
+Layout: a header, an index of ``slot_count`` fixed-size entries, then ``slot_count``
+data slots of ``slot_size`` bytes each holding the raw uint8 frame followed by a JSON
+blob with the per-engine results. Recording is a memcpy into the mapping plus one
+small struct write, so it can stay on the recognition hot path. The oldest frame is
+overwritten once the ring is full.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import asdict
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b'LPDRING1'
+HEADER = struct.Struct('<8sIIQd')  # magic, slot_count, slot_size, last_seq, created
+HEADER_SIZE = 64
+ENTRY = struct.Struct('<QdIIIII')  # seq, timestamp, height, width, channels, image_nbytes, meta_nbytes
+ENTRY_SIZE = 48
+
+
+class FrameRecorder:
+    def __init__(self, path: str, slot_count: int = 256, slot_size: int = 512 * 1024,
+                 log: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.slot_count = int(slot_count)
+        self.slot_size = int(slot_size)
+        self.log = log
+        self.skipped = 0
+        self._lock = threading.Lock()
+        size = HEADER_SIZE + self.slot_count * (ENTRY_SIZE + self.slot_size)
+        reuse = False
+        if os.path.exists(path) and os.path.getsize(path) == size:
+            with open(path, 'rb') as f:
+                magic, count, slot, _, _ = HEADER.unpack(f.read(HEADER.size))
+            reuse = magic == MAGIC and count == self.slot_count and slot == self.slot_size
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if not reuse:
+            with open(path, 'wb') as f:
+                f.truncate(size)
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), size)
+        if reuse:
+            self.seq = HEADER.unpack_from(self._map, 0)[3]
+        else:
+            self.seq = 0
+            HEADER.pack_into(self._map, 0, MAGIC, self.slot_count, self.slot_size, 0, time.time())
+        self._data_offset = HEADER_SIZE + self.slot_count * ENTRY_SIZE
+
+    def record(self, frame, results=None, **extra) -> bool:
+        """Store a frame and its results; returns False if the frame does not fit in a slot."""
+        image = np.ascontiguousarray(np.asarray(frame, dtype=np.uint8))
+        if image.ndim == 2:
+            height, width, channels = image.shape[0], image.shape[1], 1
+        else:
+            height, width, channels = image.shape[:3]
+        meta = dict(extra)
+        if results is not None:
+            meta['results'] = [asdict(r) if hasattr(r, '__dataclass_fields__') else r for r in results]
+        meta_bytes = json.dumps(meta, default=str).encode('utf-8')
+        if image.nbytes + len(meta_bytes) > self.slot_size:
+            self.skipped += 1
+            if self.skipped == 1 and self.log:
+                # Once only: every frame of an oversize region would repeat it
+                self.log(f"Frame recorder skipped a {width}x{height}x{channels} frame of "
+                         f"{image.nbytes + len(meta_bytes)} bytes; slots hold {self.slot_size} bytes "
+                         f"(raise FRAME_RECORDER_SLOT_BYTES to record it)")
+            return False
+        with self._lock:
+            self.seq += 1
+            slot = (self.seq - 1) % self.slot_count
+            entry_offset = HEADER_SIZE + slot * ENTRY_SIZE
+            data_offset = self._data_offset + slot * self.slot_size
+            # Invalidate the entry while its slot is rewritten so a concurrent reader skips it
+            ENTRY.pack_into(self._map, entry_offset, 0, 0.0, 0, 0, 0, 0, 0)
+            self._map[data_offset:data_offset + image.nbytes] = memoryview(image).cast('B')
+            self._map[data_offset + image.nbytes:data_offset + image.nbytes + len(meta_bytes)] = meta_bytes
+            ENTRY.pack_into(self._map, entry_offset, self.seq, time.time(), height, width, channels, image.nbytes, len(meta_bytes))
+            struct.pack_into('<Q', self._map, 16, self.seq)
+        return True
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+
+
+class FrameReplayer:
+    """Reads a FrameRecorder ring file back in recording order."""
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slot_count, self.slot_size, self.last_seq, self.created = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a frame recording")
+        self._data_offset = HEADER_SIZE + self.slot_count * ENTRY_SIZE
+
+    def _entries(self) -> List[Tuple[int, tuple]]:
+        entries = []
+        for slot in range(self.slot_count):
+            entry = ENTRY.unpack_from(self._map, HEADER_SIZE + slot * ENTRY_SIZE)
+            if entry[0]:
+                entries.append((slot, entry))
+        entries.sort(key=lambda e: e[1][0])
+        return entries
+
+    def __len__(self):
+        return len(self._entries())
+
+    def frames(self) -> Iterator[Tuple[float, np.ndarray, dict]]:
+        """Yield (timestamp, frame, meta) oldest first; frames are read-only views into the file."""
+        for slot, (seq, timestamp, height, width, channels, image_nbytes, meta_nbytes) in self._entries():
+            offset = self._data_offset + slot * self.slot_size
+            image = np.frombuffer(self._map, dtype=np.uint8, count=image_nbytes, offset=offset)
+            shape = (height, width) if channels == 1 else (height, width, channels)
+            meta = json.loads(bytes(self._map[offset + image_nbytes:offset + image_nbytes + meta_nbytes]).decode('utf-8'))
+            meta['seq'] = seq
+            yield timestamp, image.reshape(shape), meta
+
+    def replay(self, recognizer, realtime: bool = False) -> Iterator[Tuple[dict, object]]:
+        """Feed recorded frames back through a recognizer at original or maximum speed.
+
+        Yields (recorded meta, new RecognitionResult) so callers can diff against the recording.
+        """
+        start_wall = time.perf_counter()
+        first_ts = None
+        for timestamp, frame, meta in self.frames():
+            if realtime:
+                if first_ts is None:
+                    first_ts = timestamp
+                delay = (timestamp - first_ts) - (time.perf_counter() - start_wall)
+                if delay > 0:
+                    time.sleep(delay)
+            result = recognizer.recognize_batch([frame], [meta.get('region')])[0]
+            yield meta, result
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def open_recorder(config, log: Optional[Callable[[str], None]] = None) -> Optional[FrameRecorder]:
+    """Create the recorder configured by FRAME_RECORDER_PATH, or None when recording is off."""
+    path = getattr(config, 'FRAME_RECORDER_PATH', None)
+    if not path:
+        return None
+    return FrameRecorder(
+        os.path.expanduser(path),
+        slot_count=getattr(config, 'FRAME_RECORDER_SLOTS', 256),
+        slot_size=getattr(config, 'FRAME_RECORDER_SLOT_BYTES', 512 * 1024),
+        log=log,
+    )
@@ -0,0 +1,274 @@
+"""SQLite-backed history of detections: the consensus outcome plus every engine's raw reading.
+
+Writes are queued and group-committed by a background thread (one transaction per
+batch), so the recognition loop never waits on disk. Reads use their own connection
+and, with WAL journaling, never block the writer.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from models import OCRResult, RecognitionResult
+from utils.pipeline import BoundedQueue, QueueClosed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    region TEXT,
+    plate TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    alert INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_detections_plate_ts ON detections (plate, ts);
+CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections (ts);
+CREATE TABLE IF NOT EXISTS engine_results (
+    detection_id INTEGER NOT NULL REFERENCES detections (id) ON DELETE CASCADE,
+    engine TEXT NOT NULL,
+    text TEXT NOT NULL,
+    confidence REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_engine_results_detection ON engine_results (detection_id);
+"""
+
+
+@dataclass
+class Detection:
+    id: int
+    timestamp: float
+    region: Optional[str]
+    plate: str
+    confidence: float
+    alert: bool
+    engine_results: List[OCRResult] = field(default_factory=list)
+
+
+class HistoryStore:
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0,
+                 retention_days: Optional[float] = 90, max_rows: Optional[int] = 1_000_000,
+                 queue_size: int = 10_000, maintenance_interval: float = 3600.0,
+                 log: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.maintenance_interval = maintenance_interval
+        self.log = log
+        self.written = 0
+        # Detections lost because their batch failed to commit
+        self.failed = 0
+        self._queue = BoundedQueue(queue_size)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        # auto_vacuum only takes effect if set before the first table is created
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    @property
+    def dropped(self) -> int:
+        """Detections never written: turned away by a full queue or lost with a failed batch."""
+        return self._queue.dropped + self.failed
+
+    def _log(self, message: str):
+        if self.log:
+            self.log(message)
+
+    def record(self, result: RecognitionResult, timestamp: Optional[float] = None) -> bool:
+        """Queue a detection for writing; never blocks. Returns False if the write queue is full."""
+        engine_rows = [(r.source, r.text, float(r.confidence)) for r in result.engine_results]
+        row = (timestamp or time.time(), result.region, result.text or '', float(result.confidence), int(bool(result.alert)))
+        return self._queue.put((row, engine_rows), timeout=0)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been committed."""
+        done = threading.Event()
+        if not self._queue.put(done, timeout=timeout):
+            return False
+        return done.wait(timeout)
+
+    def close(self):
+        self._queue.close()
+        self._writer.join()
+        with self._read_lock:
+            self._read_conn.close()
+
+    def _write_loop(self):
+        conn = self._connect()
+        last_maintenance = time.monotonic()
+        closed = False
+        while not closed:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            # Collect until the batch is full or the flush interval has elapsed
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()) if batch else self.flush_interval)
+                except QueueClosed:
+                    closed = True
+                    break
+                if item is None:
+                    if batch:
+                        break
+                    continue
+                batch.append(item)
+                if isinstance(item, threading.Event):
+                    break
+            records = [item for item in batch if not isinstance(item, threading.Event)]
+            # A failed batch is counted and logged, never allowed to end the thread and leave flush() waiting
+            try:
+                self._commit(conn, records)
+            except Exception as e:
+                self.failed += len(records)
+                self._log(f"Detection history: batch of {len(records)} not written: {e}")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if self.maintenance_interval and time.monotonic() - last_maintenance >= self.maintenance_interval:
+                last_maintenance = time.monotonic()
+                try:
+                    self._maintain(conn)
+                except Exception as e:
+                    self._log(f"Detection history: retention pass failed: {e}")
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch):
+        if not batch:
+            return
+        conn.execute('BEGIN')
+        try:
+            for row, engine_rows in batch:
+                detection_id = conn.execute(
+                    'INSERT INTO detections (ts, region, plate, confidence, alert) VALUES (?, ?, ?, ?, ?)', row
+                ).lastrowid
+                conn.executemany(
+                    'INSERT INTO engine_results (detection_id, engine, text, confidence) VALUES (?, ?, ?, ?)',
+                    [(detection_id,) + r for r in engine_rows],
+                )
+            conn.execute('COMMIT')
+            self.written += len(batch)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+
+    def _maintain(self, conn: sqlite3.Connection) -> int:
+        """Apply the retention policy and return the number of detections deleted."""
+        deleted = 0
+        conn.execute('BEGIN')
+        try:
+            if self.retention_days:
+                cutoff = time.time() - self.retention_days * 86400
+                deleted += conn.execute('DELETE FROM detections WHERE ts < ?', (cutoff,)).rowcount
+            if self.max_rows:
+                # Rowids grow with insertion order, so the newest max_rows have the largest ids
+                row = conn.execute('SELECT id FROM detections ORDER BY id DESC LIMIT 1 OFFSET ?', (self.max_rows,)).fetchone()
+                if row:
+                    deleted += conn.execute('DELETE FROM detections WHERE id <= ?', (row[0],)).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        if deleted:
+            conn.execute('PRAGMA incremental_vacuum')
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return deleted
+
+    def compact(self) -> int:
+        """Apply retention now (normally done hourly by the writer) and reclaim the freed pages."""
+        self.flush()
+        with self._read_lock:
+            return self._maintain(self._read_conn)
+
+    def _query(self, sql: str, params=()) -> List[Detection]:
+        with self._read_lock:
+            # One read transaction so both statements see the same snapshot of the writer's commits
+            self._read_conn.execute('BEGIN')
+            try:
+                rows = self._read_conn.execute(sql, params).fetchall()
+                detections = [Detection(r[0], r[1], r[2], r[3], r[4], bool(r[5])) for r in rows]
+                by_id = {d.id: d for d in detections}
+                if detections:
+                    # Re-run the detection query as a subquery rather than binding one parameter per id
+                    for detection_id, engine, text, confidence in self._read_conn.execute(
+                            f'SELECT detection_id, engine, text, confidence FROM engine_results '
+                            f'WHERE detection_id IN (SELECT id FROM ({sql}))', params):
+                        by_id[detection_id].engine_results.append(OCRResult(text, confidence, engine))
+            finally:
+                self._read_conn.execute('COMMIT')
+        return detections
+
+    def last_seen(self, plate: str) -> Optional[Detection]:
+        """Most recent detection of exactly this plate, or None."""
+        found = self._query(
+            'SELECT id, ts, region, plate, confidence, alert FROM detections WHERE plate = ? ORDER BY ts DESC LIMIT 1',
+            (plate.upper(),),
+        )
+        return found[0] if found else None
+
+    def lookup(self, plate: str, since: Optional[float] = None, until: Optional[float] = None,
+               limit: int = 100) -> List[Detection]:
+        """Detections of a plate, newest first. A trailing '*' matches by prefix."""
+        plate = plate.upper()
+        if plate.endswith('*'):
+            # Range scan on the plate index rather than LIKE, which SQLite may not index
+            prefix = plate[:-1]
+            clause, params = 'plate >= ? AND plate < ?', [prefix, prefix + '\uffff']
+        else:
+            clause, params = 'plate = ?', [plate]
+        if since is not None:
+            clause += ' AND ts >= ?'
+            params.append(since)
+        if until is not None:
+            clause += ' AND ts < ?'
+            params.append(until)
+        params.append(limit)
+        return self._query(
+            f'SELECT id, ts, region, plate, confidence, alert FROM detections WHERE {clause} ORDER BY ts DESC LIMIT ?',
+            params,
+        )
+
+    def recent(self, since: Optional[float] = None, limit: int = 100) -> List[Detection]:
+        """Latest detections of any plate, newest first."""
+        return self._query(
+            'SELECT id, ts, region, plate, confidence, alert FROM detections WHERE ts >= ? ORDER BY ts DESC LIMIT ?',
+            (since or 0.0, limit),
+        )
+
+    def count(self) -> int:
+        with self._read_lock:
+            return self._read_conn.execute('SELECT COUNT(*) FROM detections').fetchone()[0]
+
+
+def open_history_store(config, log: Optional[Callable[[str], None]] = None) -> Optional[HistoryStore]:
+    """Create the store configured by HISTORY_DB_PATH, or None when history is off."""
+    path = getattr(config, 'HISTORY_DB_PATH', None)
+    if not path:
+        return None
+    store = HistoryStore(
+        os.path.expanduser(path),
+        batch_size=getattr(config, 'HISTORY_BATCH_SIZE', 256),
+        flush_interval=getattr(config, 'HISTORY_FLUSH_SECONDS', 1.0),
+        retention_days=getattr(config, 'HISTORY_RETENTION_DAYS', 90),
+        max_rows=getattr(config, 'HISTORY_MAX_ROWS', 1_000_000),
+        log=log,
+    )
+    atexit.register(store.close)
+    return store
@@ -14,3 +14,11 @@ def preprocess_image(image):
         new_width = int(width * scale_factor)
         cleaned = cv2.resize(cleaned, (new_width, 50), interpolation=cv2.INTER_CUBIC)
     return cleaned
+
+def resize_to_height(image, height: int):
+    """Scale an image to the given height, keeping its aspect ratio."""
+    h, w = image.shape[:2]
+    if h == height or h == 0:
+        return image
+    interpolation = cv2.INTER_AREA if h > height else cv2.INTER_CUBIC
+    return cv2.resize(image, (max(1, round(w * height / h)), height), interpolation=interpolation)
@@ -0,0 +1,199 @@
+"""Versioned, checksummed bundle of every engine's model weights for offline hosts.
+
+A bundle is one directory::
+
+    manifest.json       {"format": 1, "version": ..., "created": ..., "files": {relpath: {"size", "sha256"}}}
+    <engine>/...        the weights, laid out the way each engine loads them
+
+``scripts/build_model_bundle.py`` packs it from the library caches of a machine that
+has downloaded the models. Copy the directory to the offline hosts and set
+``MODEL_BUNDLE_PATH``. Engines then load only from the bundle with their downloaders
+switched off. An engine whose files are missing or corrupt fails to load instead of
+going to the network.
+
+Startup verification is quick. Each file's size and modification time are compared
+with the values recorded the last time this host hashed it (``.verified.json`` in the
+bundle, ignored when copied from another host). Only files that changed, or were
+never hashed here, are hashed again.
+"""
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+MANIFEST = 'manifest.json'
+VERIFIED = '.verified.json'
+FORMAT = 1
+_CHUNK = 4 * 1024 * 1024
+
+
+class BundleError(Exception):
+    pass
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    def __init__(self, path: str):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        try:
+            with open(os.path.join(self.path, MANIFEST), 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise BundleError(f"Model bundle {self.path} has no readable manifest: {e}")
+        if manifest.get('format') != FORMAT:
+            raise BundleError(f"Model bundle {self.path} has unsupported format {manifest.get('format')!r}")
+        self.version: str = manifest.get('version', '')
+        self.created: float = manifest.get('created', 0.0)
+        self.files: Dict[str, dict] = manifest.get('files', {})
+        # relpath -> reason, from the last verify()
+        self.problems: Dict[str, str] = {}
+
+    def engines(self) -> List[str]:
+        return sorted({rel.split('/', 1)[0] for rel in self.files})
+
+    def _under(self, rel: str) -> List[str]:
+        return [name for name in self.files if name == rel or name.startswith(rel + '/')]
+
+    def has(self, engine: str, *parts: str) -> bool:
+        return bool(self._under('/'.join((engine,) + parts)))
+
+    def path_for(self, engine: str, *parts: str) -> str:
+        """Local path of a bundled file or directory; BundleError if it is missing or failed verification."""
+        rel = '/'.join((engine,) + parts)
+        listed = self._under(rel)
+        if not listed:
+            raise BundleError(f"{rel} is not in model bundle {self.version} ({self.path})")
+        failed = [f"{name}: {self.problems[name]}" for name in listed if name in self.problems]
+        if failed:
+            raise BundleError(f"Model bundle {self.version} failed verification for {'; '.join(failed)}")
+        return os.path.join(self.path, *rel.split('/'))
+
+    def _load_verified(self) -> Dict[str, list]:
+        try:
+            with open(os.path.join(self.path, VERIFIED), 'r') as f:
+                verified = json.load(f)
+            if verified.get('version') != self.version or verified.get('host') != socket.gethostname():
+                return {}
+            return verified.get('files', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_verified(self, verified: Dict[str, list]) -> bool:
+        path = os.path.join(self.path, VERIFIED)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': self.version, 'host': socket.gethostname(), 'files': verified}, f)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            # A read-only bundle is fine; it is just hashed in full on every start
+            return False
+
+    def verify(self, full: bool = False) -> Dict[str, str]:
+        """Check every file against the manifest; returns relpath -> problem (empty when all is well).
+
+        Unless full, files whose size and mtime match this host's last successful hash are not re-read.
+        """
+        verified = {} if full else self._load_verified()
+        updated, problems = {}, {}
+        for rel, entry in self.files.items():
+            path = os.path.join(self.path, *rel.split('/'))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                problems[rel] = 'missing'
+                continue
+            if stat.st_size != entry['size']:
+                problems[rel] = f"size {stat.st_size}, expected {entry['size']}"
+                continue
+            stamp = [stat.st_size, stat.st_mtime_ns, entry['sha256']]
+            if verified.get(rel) != stamp and file_sha256(path) != entry['sha256']:
+                problems[rel] = 'checksum mismatch'
+                continue
+            updated[rel] = stamp
+        self.problems = problems
+        if updated != verified:
+            self._save_verified(updated)
+        return problems
+
+
+def build_bundle(out_dir: str, sources: Dict[str, str], version: str,
+                 log: Optional[Callable[[str], None]] = None) -> ModelBundle:
+    """Copy sources (bundle relpath -> local file) into a new bundle at out_dir, replacing any bundle there.
+
+    The bundle is assembled next to out_dir and moved into place at the end, so an
+    interrupted build never leaves a half-written bundle behind.
+    """
+    out_dir = os.path.abspath(os.path.expanduser(out_dir))
+    staging = f"{out_dir}.building"
+    shutil.rmtree(staging, ignore_errors=True)
+    files = {}
+    for rel, source in sorted(sources.items()):
+        target = os.path.join(staging, *rel.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+        files[rel] = {'size': os.path.getsize(target), 'sha256': file_sha256(target)}
+        if log:
+            log(f"  {rel} ({files[rel]['size'] / 1e6:.1f} MB)")
+    with open(os.path.join(staging, MANIFEST), 'w') as f:
+        json.dump({'format': FORMAT, 'version': version, 'created': time.time(), 'files': files}, f, indent=2)
+    previous = f"{out_dir}.previous"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, previous)
+    os.replace(staging, out_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return ModelBundle(out_dir)
+
+
+_bundles: Dict[str, ModelBundle] = {}
+_bundles_lock = threading.Lock()
+
+
+def open_bundle(config, log: Optional[Callable[[str], None]] = None) -> Optional[ModelBundle]:
+    """The bundle at MODEL_BUNDLE_PATH, opened and verified once per process; None when none is configured.
+
+    Raises BundleError if the bundle cannot be opened at all.
+    """
+    path = getattr(config, 'MODEL_BUNDLE_PATH', None)
+    if not path:
+        return None
+    path = os.path.abspath(os.path.expanduser(path))
+    with _bundles_lock:
+        bundle = _bundles.get(path)
+        if bundle is not None:
+            return bundle
+        bundle = ModelBundle(path)
+        mode = getattr(config, 'MODEL_BUNDLE_VERIFY', 'quick')
+        if mode:
+            start = time.perf_counter()
+            problems = bundle.verify(full=mode == 'full')
+            elapsed = (time.perf_counter() - start) * 1000
+            messages = [f"Model bundle {bundle.version}: {len(bundle.files)} files verified ({mode}) in {elapsed:.0f} ms"]
+            messages += [f"Model bundle file {rel}: {problem}" for rel, problem in sorted(problems.items())]
+            for message in messages:
+                (log or print)(message)
+        _bundles[path] = bundle
+        return bundle
+
+
+def bundle_summary(bundle: ModelBundle) -> List[Tuple[str, int, float]]:
+    """(engine, files, MB) for each engine in the bundle."""
+    totals: Dict[str, List[float]] = {}
+    for rel, entry in bundle.files.items():
+        total = totals.setdefault(rel.split('/', 1)[0], [0, 0.0])
+        total[0] += 1
+        total[1] += entry['size'] / 1e6
+    return [(engine, int(count), size) for engine, (count, size) in sorted(totals.items())]
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class QueueClosed(Exception):
+    """Raised by BoundedQueue.get once the queue is closed and drained."""
+
+
+class BoundedQueue:
+    """Thread-safe bounded FIFO connecting two pipeline stages.
+
+    With drop_oldest=True a put on a full queue evicts the oldest item instead of
+    blocking, so a slow consumer always sees the freshest frames.
+    """
+    def __init__(self, maxsize: int, drop_oldest: bool = False):
+        self.maxsize = max(1, int(maxsize))
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self._items = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """Add an item. Returns False if it could not be queued (closed, or full after timeout)."""
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.drop_oldest:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif not self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed, timeout):
+                    self.dropped += 1
+                    return False
+                if self._closed:
+                    return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Remove and return the oldest item, waiting up to timeout. Returns None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                raise QueueClosed()
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+
+class StageStats:
+    """Per-stage counters: items processed, time spent waiting for input and time spent working."""
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.wait_time = 0.0
+        self.busy_time = 0.0
+        self.last_wait = 0.0
+        self.last_busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, busy: float):
+        with self._lock:
+            self.processed += 1
+            self.wait_time += wait
+            self.busy_time += busy
+            self.last_wait = wait
+            self.last_busy = busy
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            n = max(1, self.processed)
+            return {
+                'processed': self.processed,
+                'avg_wait_ms': self.wait_time / n * 1000,
+                'avg_busy_ms': self.busy_time / n * 1000,
+                'last_wait_ms': self.last_wait * 1000,
+                'last_busy_ms': self.last_busy * 1000,
+            }
+
+
+class Stopwatch:
+    def __init__(self):
+        self.start = time.perf_counter()
+
+    def lap(self) -> float:
+        now = time.perf_counter()
+        elapsed = now - self.start
+        self.start = now
+        return elapsed
@@ -0,0 +1,171 @@
+"""Plate-format grammar with confusable-character correction.
+
+Formats are written with one symbol per character: ``L`` letter, ``D`` digit,
+``A`` either. All formats of all jurisdictions are compiled into a single
+deterministic automaton over character classes, so a candidate is checked against
+every format in one pass. ``correct`` finds the cheapest set of letter/digit
+confusable substitutions (O/0, I/1, B/8, S/5, ...) that makes a candidate valid.
+"""
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_FORMATS: Dict[str, List[str]] = {
+    'AZ': ['LLLDDDD'],
+    'CA': ['DLLLDDD', 'DLDDDDD'],
+    'FL': ['LLLLDD', 'LLLDLL', 'DDDDLL'],
+    'GA': ['LLLDDDD'],
+    'IL': ['LLDDDDD', 'LDDDDDD'],
+    'MA': ['DLLLDD', 'DDLLDD'],
+    'MI': ['LLLDDDD'],
+    'NC': ['LLLDDDD'],
+    'NJ': ['LDDLLL'],
+    'NY': ['LLLDDDD'],
+    'OH': ['LLLDDDD'],
+    'PA': ['LLLDDDD'],
+    'TX': ['LLLDDDD', 'LLDLDDD'],
+    'VA': ['LLLDDDD'],
+    'WA': ['LLLDDDD'],
+    'ON': ['LLLLDDD'],
+    'QC': ['DDDLLL', 'LDDLLL'],
+    'BC': ['LLDDDLL', 'DDDLLL'],
+    'GENERIC': ['LLLDDD', 'DDDLLL', 'LLDDDD'],
+}
+
+# Single-character confusions between letters and digits with their substitution cost.
+# Same-class confusions (e.g. O/Q) never change format validity and are left to consensus.
+CONFUSABLES: Dict[str, Tuple[str, float]] = {
+    'O': ('0', 1.0), '0': ('O', 1.0),
+    'I': ('1', 1.0), '1': ('I', 1.0),
+    'B': ('8', 1.0), '8': ('B', 1.0),
+    'S': ('5', 1.0), '5': ('S', 1.0),
+    'Z': ('2', 1.0), '2': ('Z', 1.0),
+    'D': ('0', 1.5), 'Q': ('0', 1.5), 'U': ('0', 2.0),
+    'L': ('1', 1.5), 'J': ('1', 2.0),
+    'G': ('6', 1.5), '6': ('G', 1.5),
+    'A': ('4', 2.0), '4': ('A', 2.0),
+    'T': ('7', 1.5), '7': ('T', 1.5),
+    'E': ('3', 2.0), '3': ('E', 2.0),
+    '9': ('G', 2.0),
+}
+
+
+def _char_class(ch: str) -> Optional[str]:
+    if 'A' <= ch <= 'Z':
+        return 'L'
+    if '0' <= ch <= '9':
+        return 'D'
+    return None
+
+
+@dataclass
+class PlateMatch:
+    text: str
+    cost: float
+    jurisdictions: FrozenSet[str]
+
+
+class PlateGrammar:
+    def __init__(self, formats: Optional[Dict[str, Iterable[str]]] = None,
+                 confusables: Optional[Dict[str, Tuple[str, float]]] = None):
+        self.formats = {j: list(p) for j, p in (formats or DEFAULT_FORMATS).items()}
+        self.confusables = confusables or CONFUSABLES
+        self._compile()
+
+    def _compile(self):
+        # Trie over pattern symbols, then subset construction over the two input classes
+        children: List[Dict[str, int]] = [{}]
+        accepts: List[set] = [set()]
+        for jurisdiction, patterns in self.formats.items():
+            for pattern in patterns:
+                node = 0
+                for sym in pattern.upper():
+                    if sym not in 'LDA':
+                        raise ValueError(f"Invalid plate format symbol {sym!r} in {pattern!r}")
+                    nxt = children[node].get(sym)
+                    if nxt is None:
+                        nxt = len(children)
+                        children[node][sym] = nxt
+                        children.append({})
+                        accepts.append(set())
+                    node = nxt
+                accepts[node].add(jurisdiction)
+        start = frozenset([0])
+        index = {start: 0}
+        states = [start]
+        self.transitions: List[Dict[str, int]] = []
+        self.accepting: List[FrozenSet[str]] = []
+        i = 0
+        while i < len(states):
+            state = states[i]
+            self.accepting.append(frozenset(j for n in state for j in accepts[n]))
+            transitions = {}
+            for cls in 'LD':
+                nxt = frozenset(c for n in state for sym, c in children[n].items() if sym == cls or sym == 'A')
+                if not nxt:
+                    continue
+                if nxt not in index:
+                    index[nxt] = len(states)
+                    states.append(nxt)
+                transitions[cls] = index[nxt]
+            self.transitions.append(transitions)
+            i += 1
+
+    def matches(self, text: str) -> FrozenSet[str]:
+        """Jurisdictions whose formats accept text exactly (empty if none)."""
+        state = 0
+        for ch in text.upper():
+            cls = _char_class(ch)
+            state = self.transitions[state].get(cls, -1) if cls else -1
+            if state < 0:
+                return frozenset()
+        return self.accepting[state]
+
+    def correct(self, text: str, max_cost: float = 2.0) -> Optional[PlateMatch]:
+        """Cheapest confusable substitution that makes text match some format, or None."""
+        text = text.upper()
+        # best[state] = (cost, corrected prefix)
+        best: Dict[int, Tuple[float, str]] = {0: (0.0, '')}
+        for ch in text:
+            cls = _char_class(ch)
+            if cls is None:
+                return None
+            options = [(cls, ch, 0.0)]
+            swap = self.confusables.get(ch)
+            if swap and _char_class(swap[0]) != cls:
+                options.append((_char_class(swap[0]), swap[0], swap[1]))
+            nxt: Dict[int, Tuple[float, str]] = {}
+            for state, (cost, prefix) in best.items():
+                for opt_cls, opt_ch, opt_cost in options:
+                    target = self.transitions[state].get(opt_cls)
+                    total = cost + opt_cost
+                    if target is None or total > max_cost:
+                        continue
+                    if target not in nxt or total < nxt[target][0]:
+                        nxt[target] = (total, prefix + opt_ch)
+            if not nxt:
+                return None
+            best = nxt
+        finals = [(cost, corrected, self.accepting[s]) for s, (cost, corrected) in best.items() if self.accepting[s]]
+        if not finals:
+            return None
+        # On equal cost prefer the format shared by more jurisdictions
+        cost, corrected, jurisdictions = min(finals, key=lambda f: (f[0], -len(f[2])))
+        return PlateMatch(corrected, cost, jurisdictions)
+
+
+_default_grammar: Optional[PlateGrammar] = None
+
+
+def get_default_grammar() -> PlateGrammar:
+    global _default_grammar
+    if _default_grammar is None:
+        _default_grammar = PlateGrammar()
+    return _default_grammar
+
+
+def grammar_from_config(config) -> Optional[PlateGrammar]:
+    """The grammar PLATE_GRAMMAR_ENABLED and PLATE_FORMATS ask for, or None."""
+    if not getattr(config, 'PLATE_GRAMMAR_ENABLED', False):
+        return None
+    formats = getattr(config, 'PLATE_FORMATS', None)
+    return PlateGrammar(formats) if formats else get_default_grammar()
@@ -0,0 +1,150 @@
+"""Process resource sampling for long-running soak tests.
+
+``ResourceMonitor`` periodically records RSS, thread counts, child processes and
+open file handles, together with any extra metrics a caller provides (e.g.
+recognition latency). ``drift`` fits a line through a metric over time, so slow
+leaks show up as a per-hour slope rather than as noise between two readings.
+"""
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from recognizer.residency import resident_memory_mb
+
+
+def os_thread_count() -> Optional[int]:
+    """Native threads in this process, including ones started by ML runtimes."""
+    try:
+        import psutil
+        return psutil.Process().num_threads()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir('/proc/self/task'))
+    except OSError:
+        return None
+
+
+def open_handle_count() -> Optional[int]:
+    """Open file descriptors (POSIX) or handles (Windows)."""
+    try:
+        import psutil
+        process = psutil.Process()
+        return process.num_handles() if os.name == 'nt' else process.num_fds()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def child_process_count() -> Optional[int]:
+    try:
+        import psutil
+        return len(psutil.Process().children(recursive=True))
+    except ImportError:
+        pass
+    try:
+        pid = str(os.getpid())
+        count = 0
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                with open(f'/proc/{entry}/stat') as f:
+                    # Field 4 is the parent pid; the command name before it may contain spaces
+                    if f.read().rsplit(')', 1)[1].split()[1] == pid:
+                        count += 1
+        return count
+    except (OSError, IndexError):
+        return None
+
+
+@dataclass
+class ResourceSample:
+    elapsed: float  # seconds since the monitor started
+    rss_mb: Optional[float]
+    python_threads: int
+    os_threads: Optional[int]
+    children: Optional[int]
+    handles: Optional[int]
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    def as_row(self) -> dict:
+        row = asdict(self)
+        row.update(row.pop('extra'))
+        return row
+
+
+def sample_resources(elapsed: float = 0.0, extra: Optional[Dict[str, float]] = None) -> ResourceSample:
+    return ResourceSample(
+        elapsed=elapsed,
+        rss_mb=resident_memory_mb(),
+        python_threads=threading.active_count(),
+        os_threads=os_thread_count(),
+        children=child_process_count(),
+        handles=open_handle_count(),
+        extra=dict(extra or {}),
+    )
+
+
+def drift(samples: List[ResourceSample], metric: str, skip_seconds: float = 0.0) -> Optional[float]:
+    """Least-squares slope of a metric per hour, ignoring the first skip_seconds (warm-up)."""
+    points = []
+    for sample in samples:
+        if sample.elapsed < skip_seconds:
+            continue
+        value = sample.as_row().get(metric)
+        if value is not None:
+            points.append((sample.elapsed, float(value)))
+    if len(points) < 3:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    variance = sum((t - mean_t) ** 2 for t, _ in points)
+    if variance == 0:
+        return None
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / variance
+    return slope * 3600
+
+
+class ResourceMonitor:
+    def __init__(self, interval: float = 30.0, extra: Optional[Callable[[], Dict[str, float]]] = None,
+                 on_sample: Optional[Callable[[ResourceSample], None]] = None):
+        """
+        extra: called at every sample for additional metrics, e.g. latency percentiles.
+        on_sample: called with each new sample, e.g. to print or append to a CSV file.
+        """
+        self.interval = interval
+        self.extra = extra
+        self.on_sample = on_sample
+        self.samples: List[ResourceSample] = []
+        self._start = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> ResourceSample:
+        sample = sample_resources(time.monotonic() - self._start, self.extra() if self.extra else None)
+        self.samples.append(sample)
+        if self.on_sample:
+            self.on_sample(sample)
+        return sample
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._start = time.monotonic()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='resource-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> ResourceSample:
+        """Stop sampling and take a final sample."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.sample()
@@ -0,0 +1,243 @@
+"""Frame transport between processes over ``multiprocessing.shared_memory``.
+
+One shared block holds ``slot_count`` fixed-size slots. The producer copies each
+frame into a free slot once and sends every consumer a small descriptor (slot,
+sequence number, shape) through its own queue. Consumers map the slot as a numpy
+view without copying or unpickling pixels, and release it when done. Each slot
+records which consumers still hold it, so the slots of a consumer that died can
+be given back with ``drop``. A slot returns to the free pool when all consumers
+have released it, and the producer
+blocks (up to a timeout) while every slot is still in use. That is the
+back-pressure when consumers fall behind. A frame larger than a slot is sent
+pickled through the queues instead, which costs a copy per consumer but keeps
+recognition going.
+
+The transport object is passed to worker processes as a ``Process`` argument;
+only the block name, locks and queues cross the boundary.
+"""
+import multiprocessing
+import queue
+import struct
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+SLOT_HEADER = struct.Struct('<QI')  # sequence number, bitmask of consumers still reading
+MAX_CONSUMERS = 32
+SLOT_HEADER_SIZE = 64  # keeps every slot's pixel data 64-byte aligned
+
+
+class FrameDescriptor(NamedTuple):
+    slot: int
+    seq: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+# What send() publishes per frame: a slot descriptor, or the frame itself if it did not fit a slot
+SentFrame = Union[FrameDescriptor, np.ndarray]
+
+
+class SharedFrameTransport:
+    def __init__(self, consumers: int = 1, slot_count: int = 8, slot_size: int = 8 * 1024 * 1024, ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.consumers = max(1, int(consumers))
+        if self.consumers > MAX_CONSUMERS:
+            raise ValueError(f"At most {MAX_CONSUMERS} consumers are supported, not {self.consumers}")
+        self.slot_count = max(1, int(slot_count))
+        self.slot_size = int(slot_size)
+        self._stride = SLOT_HEADER_SIZE + self.slot_size
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_count * self._stride)
+        self._owner = True
+        self._lock = ctx.Lock()
+        self._free = ctx.Semaphore(self.slot_count)
+        self._queues = [ctx.Queue() for _ in range(self.consumers)]
+        self._seq = ctx.Value('Q', 0, lock=False)
+        self._active = ctx.Array('b', [1] * self.consumers, lock=False)
+        for slot in range(self.slot_count):
+            SLOT_HEADER.pack_into(self._shm.buf, slot * self._stride, 0, 0)
+        self.dropped = 0
+        # Frames too large for a slot, sent through the queues instead
+        self.copied = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shm'] = self._shm.name
+        state['_owner'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=state['_shm'])
+
+    def _claim_slot(self, timeout: Optional[float]) -> Optional[int]:
+        if not self._free.acquire(timeout=timeout):
+            return None
+        with self._lock:
+            readers = self._active_mask()
+            if readers == 0:
+                # Nobody would ever release it
+                self._free.release()
+                return None
+            for slot in range(self.slot_count):
+                offset = slot * self._stride
+                if SLOT_HEADER.unpack_from(self._shm.buf, offset)[1] == 0:
+                    self._seq.value += 1
+                    # Mark busy before releasing the lock so no other producer picks it
+                    SLOT_HEADER.pack_into(self._shm.buf, offset, self._seq.value, readers)
+                    return slot
+        # Semaphore and headers disagree only if a consumer died mid-release
+        self._free.release()
+        return None
+
+    def write(self, frame, timeout: Optional[float] = None) -> Optional[FrameDescriptor]:
+        """Copy one frame into a free slot; None if none frees up within timeout or no consumer is active."""
+        frame = np.asarray(frame)
+        if frame.nbytes > self.slot_size:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit a {self.slot_size}-byte slot")
+        slot = self._claim_slot(timeout)
+        if slot is None:
+            self.dropped += 1
+            return None
+        offset = slot * self._stride + SLOT_HEADER_SIZE
+        seq = SLOT_HEADER.unpack_from(self._shm.buf, slot * self._stride)[0]
+        descriptor = FrameDescriptor(slot, seq, tuple(frame.shape), frame.dtype.str)
+        try:
+            target = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._shm.buf, offset=offset)
+            np.copyto(target, frame)
+        except BaseException:
+            self._release_slot(descriptor, ~0)
+            raise
+        return descriptor
+
+    def send(self, frames: Sequence, payload: Any = None, timeout: Optional[float] = None) -> Optional[List[SentFrame]]:
+        """Write frames and publish (sent frames, payload) to every consumer.
+
+        Frames larger than a slot are published as arrays rather than descriptors.
+        All-or-nothing: if the ring cannot take every frame within timeout the slots
+        already claimed are returned and None is returned.
+        """
+        sent: List[SentFrame] = []
+        published = False
+        try:
+            for frame in frames:
+                frame = np.asarray(frame)
+                if frame.nbytes > self.slot_size:
+                    sent.append(np.ascontiguousarray(frame))
+                    continue
+                descriptor = self.write(frame, timeout)
+                if descriptor is None:
+                    return None
+                sent.append(descriptor)
+            for consumer, q in enumerate(self._queues):
+                if self._active[consumer]:
+                    q.put((sent, payload))
+            published = True
+        finally:
+            if not published:
+                for item in sent:
+                    if isinstance(item, FrameDescriptor):
+                        self._release_slot(item, ~0)
+        self.copied += sum(1 for item in sent if not isinstance(item, FrameDescriptor))
+        return sent
+
+    def active_consumers(self) -> int:
+        return sum(self._active)
+
+    def _active_mask(self) -> int:
+        return sum(1 << consumer for consumer in range(self.consumers) if self._active[consumer])
+
+    def detach(self, consumer: int):
+        """Stop sending to a consumer (e.g. a worker that failed to start); later frames need one fewer release."""
+        with self._lock:
+            self._active[consumer] = 0
+
+    def attach(self, consumer: int):
+        """Resume sending to a detached consumer, from the next frame on."""
+        with self._lock:
+            self._active[consumer] = 1
+
+    def drop(self, consumer: int) -> int:
+        """Detach a consumer that is gone (e.g. a crashed worker) and release every slot it still held.
+
+        Returns the number of slots that became free.
+        """
+        freed = 0
+        bit = 1 << consumer
+        with self._lock:
+            self._active[consumer] = 0
+            for slot in range(self.slot_count):
+                offset = slot * self._stride
+                seq, readers = SLOT_HEADER.unpack_from(self._shm.buf, offset)
+                if readers & bit:
+                    SLOT_HEADER.pack_into(self._shm.buf, offset, seq, readers & ~bit)
+                    if readers == bit:
+                        freed += 1
+        for _ in range(freed):
+            self._free.release()
+        return freed
+
+    def notify(self, consumer: int, payload: Any):
+        """Send a frameless message, e.g. a shutdown request."""
+        self._queues[consumer].put(([], payload))
+
+    def view(self, descriptor: FrameDescriptor) -> np.ndarray:
+        """Read-only numpy view of a frame; valid until it is released."""
+        offset = descriptor.slot * self._stride
+        seq = SLOT_HEADER.unpack_from(self._shm.buf, offset)[0]
+        if seq != descriptor.seq:
+            raise RuntimeError(f"Frame slot {descriptor.slot} was reused before it was released")
+        array = np.ndarray(descriptor.shape, dtype=np.dtype(descriptor.dtype), buffer=self._shm.buf,
+                           offset=offset + SLOT_HEADER_SIZE)
+        array.flags.writeable = False
+        return array
+
+    def _release_slot(self, descriptor: FrameDescriptor, mask: int):
+        offset = descriptor.slot * self._stride
+        with self._lock:
+            seq, readers = SLOT_HEADER.unpack_from(self._shm.buf, offset)
+            if seq != descriptor.seq or not readers & mask:
+                return
+            readers &= ~mask & 0xFFFFFFFF
+            SLOT_HEADER.pack_into(self._shm.buf, offset, seq, readers)
+        if readers == 0:
+            self._free.release()
+
+    def release(self, descriptors: Sequence[SentFrame], consumer: int):
+        for descriptor in descriptors:
+            if isinstance(descriptor, FrameDescriptor):
+                self._release_slot(descriptor, 1 << consumer)
+
+    def receive(self, consumer: int, timeout: Optional[float] = None) -> Optional[Tuple[List[SentFrame], Any]]:
+        """Next (descriptors, payload) for this consumer, or None on timeout."""
+        try:
+            return self._queues[consumer].get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    @contextmanager
+    def frames(self, descriptors: Sequence[SentFrame], consumer: int):
+        """Views of the frames, released by this consumer when the block exits."""
+        try:
+            yield [self.view(d) if isinstance(d, FrameDescriptor) else d for d in descriptors]
+        finally:
+            self.release(descriptors, consumer)
+
+    def in_use(self) -> int:
+        with self._lock:
+            return sum(1 for slot in range(self.slot_count)
+                       if SLOT_HEADER.unpack_from(self._shm.buf, slot * self._stride)[1] > 0)
+
+    def close(self):
+        """Detach; the creating process also frees the shared block."""
+        for q in self._queues:
+            q.cancel_join_thread()
+        try:
+            self._shm.close()
+        except BufferError:
+            # A view handed out by view()/frames() is still referenced; the mapping goes with the process
+            pass
+        if self._owner:
+            self._shm.unlink()
@@ -1,3 +1,6 @@
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
 US_STATE_NAMES = [
     'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware',
     'Florida', 'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa', 'Kansas', 'Kentucky',
@@ -12,15 +15,209 @@ US_STATE_ABBREVIATIONS = [
     'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY',
     'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
 ]
+CANADIAN_PROVINCE_NAMES = [
+    'Alberta', 'British Columbia', 'Manitoba', 'New Brunswick', 'Newfoundland', 'Labrador',
+    'Nova Scotia', 'Ontario', 'Prince Edward Island', 'Quebec', 'Saskatchewan',
+    'Northwest Territories', 'Nunavut', 'Yukon'
+]
+CANADIAN_PROVINCE_ABBREVIATIONS = [
+    'AB', 'BC', 'MB', 'NB', 'NL', 'NS', 'ON', 'PE', 'QC', 'SK', 'NT', 'NU', 'YT'
+]
+CANADIAN_PROVINCE_CODES = {
+    'Alberta': 'AB', 'British Columbia': 'BC', 'Manitoba': 'MB', 'New Brunswick': 'NB', 'Newfoundland': 'NL',
+    'Labrador': 'NL', 'Nova Scotia': 'NS', 'Ontario': 'ON', 'Prince Edward Island': 'PE', 'Quebec': 'QC',
+    'Saskatchewan': 'SK', 'Northwest Territories': 'NT', 'Nunavut': 'NU', 'Yukon': 'YT',
+}
+# Slogans and other plate decorations that OCR engines commonly read along with the plate
+DEFAULT_SLOGANS = [
+    'USA', 'Canada', 'The Lone Star State', 'Lone Star State', 'Sunshine State', 'Empire State',
+    'Garden State', 'Land of Lincoln', 'Live Free or Die', 'Famous Potatoes', 'First in Flight',
+    'Keystone State', 'Grand Canyon State', 'Big Sky Country', 'Land of Enchantment', 'Aloha State',
+    'Ocean State', 'Green Mountain State', 'The First State', 'Show Me State', 'Peach State',
+    'Great Lakes', 'Pure Michigan', 'Wild Wonderful', 'Americas Dairyland', 'Spirit of America',
+    'Greatest Snow on Earth', 'Yours to Discover', 'Je me souviens', 'Beautiful British Columbia',
+    'Wild Rose Country', 'Land of Living Skies', 'Friendly Manitoba', 'Dealer', 'Temporary',
+]
+# The jurisdiction each state-specific slogan belongs to
+SLOGAN_JURISDICTIONS = {
+    'The Lone Star State': 'TX', 'Lone Star State': 'TX', 'Sunshine State': 'FL', 'Empire State': 'NY',
+    'Garden State': 'NJ', 'Land of Lincoln': 'IL', 'Live Free or Die': 'NH', 'Famous Potatoes': 'ID',
+    'First in Flight': 'NC', 'Keystone State': 'PA', 'Grand Canyon State': 'AZ', 'Big Sky Country': 'MT',
+    'Land of Enchantment': 'NM', 'Aloha State': 'HI', 'Ocean State': 'RI', 'Green Mountain State': 'VT',
+    'The First State': 'DE', 'Show Me State': 'MO', 'Peach State': 'GA', 'Great Lakes': 'MI',
+    'Pure Michigan': 'MI', 'Wild Wonderful': 'WV', 'Americas Dairyland': 'WI', 'Spirit of America': 'MA',
+    'Greatest Snow on Earth': 'UT', 'Yours to Discover': 'ON', 'Je me souviens': 'QC',
+    'Beautiful British Columbia': 'BC', 'Wild Rose Country': 'AB', 'Land of Living Skies': 'SK',
+    'Friendly Manitoba': 'MB',
+}
+
+# A name glued to the plate (TEXASABC123) is only cut off when at least this long, and when
+# what is left looks like a plate: PLATE_MIN_LENGTH to PLATE_MAX_LENGTH characters with a digit
+MIN_EMBEDDED_LENGTH = 4
+PLATE_MIN_LENGTH = 4
+PLATE_MAX_LENGTH = 8
+
+def _normalize(text: str) -> str:
+    return ''.join(ch for ch in text.upper() if ch.isalnum())
+
+
+def _plate_shaped(text: str) -> bool:
+    return PLATE_MIN_LENGTH <= len(text) <= PLATE_MAX_LENGTH and any(ch.isdigit() for ch in text)
+
+
+class _AhoCorasick:
+    """Multi-pattern matcher; reports every pattern occurrence in one pass over the text."""
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        # Lengths of the patterns ending at each node, longest first, including those reached by failure links
+        self.out: List[Tuple[int, ...]] = [()]
+        for pattern in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.out.append(())
+                node = nxt
+            self.out[node] = (len(pattern),)
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                if node:
+                    f = self.fail[node]
+                    while f and ch not in self.goto[f]:
+                        f = self.fail[f]
+                    self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = tuple(sorted(set(self.out[nxt] + self.out[self.fail[nxt]]), reverse=True))
+                queue.append(nxt)
+
+    def matches(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) spans, end exclusive, of every match, longest first at each end position."""
+        spans = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            spans.extend((i + 1 - length, i + 1) for length in self.out[node])
+        return spans
+
+
+class JurisdictionIndex:
+    """Precomputed state/province names, abbreviations and slogans.
+
+    Exact lookups are a single hash-set probe on the normalized text. ``strip`` finds
+    names and slogans in one Aho-Corasick pass and removes them where they make up whole
+    words (NEW YORK), or where one is glued to the start or end of a word and the rest of
+    that word is plate-shaped (TEXASABC123, but not DEALERSHIP or GEORGIA1). Two-letter
+    abbreviations are real plate characters as often as not (AB 1234, ME 2 U), so one is
+    removed only when the name or slogan of that same jurisdiction was found as well
+    (TEXAS TX ABC1234, but not TEXAS AB 1234).
+    """
+    def __init__(self, names: Iterable[str], abbreviations: Iterable[str], slogans: Iterable[str] = (),
+                 jurisdictions: Optional[Mapping[str, str]] = None):
+        """jurisdictions: name or slogan -> the abbreviation of the jurisdiction it belongs to."""
+        phrases = [_normalize(p) for p in list(names) + list(slogans)]
+        self.phrases = frozenset(p for p in phrases if p)
+        self.abbreviations = frozenset(_normalize(a) for a in abbreviations)
+        self.jurisdictions = {_normalize(p): _normalize(a) for p, a in (jurisdictions or {}).items()}
+        self._matcher = _AhoCorasick(self.phrases)
+
+    def contains(self, text: str) -> bool:
+        t = _normalize(text)
+        return t in self.phrases or t in self.abbreviations
+
+    def _accepts(self, compact: str, start: int, end: int, begins: List[int], ends: List[int]) -> bool:
+        at_begin, at_end = start in begins, end in ends
+        if at_begin and at_end:
+            return True
+        if end - start < MIN_EMBEDDED_LENGTH:
+            return False
+        if at_begin:
+            # Prefix of a word: the rest of that word must be the plate
+            return _plate_shaped(compact[end:min(e for e in ends if e > end)])
+        if at_end:
+            return _plate_shaped(compact[max(b for b in begins if b < start):start])
+        return False
+
+    def strip(self, text: str) -> str:
+        """Remove jurisdiction names and slogans, and their own abbreviations; words are joined by spaces."""
+        words = [w for w in (_normalize(w) for w in text.upper().split()) if w]
+        compact = ''.join(words)
+        if not compact:
+            return ''
+        # Word start and end offsets in the compact text
+        begins, pos = [], 0
+        for w in words:
+            begins.append(pos)
+            pos += len(w)
+        ends = begins[1:] + [len(compact)]
+        spans = sorted((s for s in self._matcher.matches(compact) if self._accepts(compact, s[0], s[1], begins, ends)),
+                       key=lambda s: (s[0], -s[1]))
+        removed = []
+        cursor = 0
+        for start, end in spans:
+            if start >= cursor:
+                removed.append((start, end))
+                cursor = end
+        if not removed:
+            return ' '.join(words)
+        found = {self.jurisdictions.get(compact[start:end]) for start, end in removed}
+        # What is left of each word, split where a glued name was cut out
+        pieces = []
+        for begin, end in zip(begins, ends):
+            piece = ''
+            for i in range(begin, end):
+                if any(a <= i < b for a, b in removed):
+                    if piece:
+                        pieces.append(piece)
+                    piece = ''
+                else:
+                    piece += compact[i]
+            if piece:
+                pieces.append(piece)
+        return ' '.join(p for p in pieces if not (p in self.abbreviations and p in found))
+
+
+def build_index(extra_names: Iterable[str] = (), extra_abbreviations: Iterable[str] = (),
+                slogans: Optional[Iterable[str]] = None, include_canada: bool = True) -> JurisdictionIndex:
+    """Build an index from the US lists plus optional Canadian provinces, custom names and slogans."""
+    names = list(US_STATE_NAMES) + list(extra_names)
+    abbreviations = list(US_STATE_ABBREVIATIONS) + list(extra_abbreviations)
+    jurisdictions = dict(zip(US_STATE_NAMES, US_STATE_ABBREVIATIONS))
+    if include_canada:
+        names += CANADIAN_PROVINCE_NAMES
+        abbreviations += CANADIAN_PROVINCE_ABBREVIATIONS
+        jurisdictions.update(CANADIAN_PROVINCE_CODES)
+    jurisdictions.update(SLOGAN_JURISDICTIONS)
+    return JurisdictionIndex(names, abbreviations, DEFAULT_SLOGANS if slogans is None else slogans, jurisdictions)
+
+
+_default_index = build_index()
+
+
+def set_default_index(index: JurisdictionIndex):
+    """Replace the index used by the module-level helpers (e.g. with custom slogans)."""
+    global _default_index
+    _default_index = index
+
 
 def is_state_name_or_abbreviation(text):
     """
-    Returns True if the text matches a US state name or abbreviation (case-insensitive, ignores spaces).
+    Returns True if the text matches a state/province name, abbreviation or slogan (case-insensitive, ignores spaces).
     """
-    t = text.replace(' ', '').upper()
-    for name in US_STATE_NAMES:
-        if t == name.replace(' ', '').upper():
-            return True
-    if t in US_STATE_ABBREVIATIONS:
-        return True
-    return False
+    return _default_index.contains(text)
+
+
+def strip_jurisdiction_text(text):
+    """
+    Returns the text with state/province names and slogans removed, as whole words or glued to a
+    plate-shaped word, along with the abbreviations of the jurisdictions they name.
+    """
+    return _default_index.strip(text)
@@ -0,0 +1,168 @@
+"""Synthetic licence plate images with known text, for soak tests and accuracy checks.
+
+Plate text is drawn from the plate-format grammar (``L`` letter, ``D`` digit, ``A``
+either), so every plate is valid for some jurisdiction. It is rendered in one of
+several fonts and layouts, then degraded with controlled perspective, blur and
+noise. Images are RGB, like the frames ``ScreenAutomation.capture_regions`` returns.
+The same seed always gives the same sequence of plates.
+"""
+import random
+import string
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from utils.plate_grammar import DEFAULT_FORMATS
+
+# Built-in OpenCV vector fonts; TrueType files can be added with font_paths
+HERSHEY_FONTS = {
+    'simplex': cv2.FONT_HERSHEY_SIMPLEX,
+    'duplex': cv2.FONT_HERSHEY_DUPLEX,
+    'complex': cv2.FONT_HERSHEY_COMPLEX,
+    'triplex': cv2.FONT_HERSHEY_TRIPLEX,
+    'plain': cv2.FONT_HERSHEY_PLAIN,
+}
+
+# layout -> (background RGB, text RGB, header text or None)
+LAYOUTS = {
+    'plain': ((245, 245, 240), (20, 20, 20), None),
+    'header': ((250, 250, 250), (15, 30, 110), 'STATE'),
+    'dark': ((25, 25, 30), (235, 235, 235), None),
+    'yellow': ((240, 200, 30), (10, 10, 10), None),
+    'stacked': ((245, 245, 240), (120, 20, 20), None),
+}
+
+
+@dataclass
+class SyntheticPlate:
+    image: np.ndarray
+    text: str
+    jurisdiction: str
+    layout: str
+    font: str
+    params: Dict[str, float] = field(default_factory=dict)
+
+
+class PlateGenerator:
+    def __init__(self, formats: Optional[Dict[str, List[str]]] = None, seed: Optional[int] = None,
+                 fonts: Optional[Sequence[str]] = None, font_paths: Sequence[str] = (),
+                 layouts: Optional[Sequence[str]] = None, height: Tuple[int, int] = (24, 120),
+                 perspective: Tuple[float, float] = (0.0, 0.08), blur: Tuple[float, float] = (0.0, 1.5),
+                 noise: Tuple[float, float] = (0.0, 12.0)):
+        """
+        height, perspective, blur and noise are (min, max) ranges sampled per plate:
+        output height in pixels, corner displacement as a fraction of the plate size,
+        Gaussian blur sigma, and Gaussian pixel noise standard deviation.
+        """
+        self.formats = [(region, fmt) for region, fmts in (formats or DEFAULT_FORMATS).items() for fmt in fmts]
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.fonts = list(fonts or HERSHEY_FONTS)
+        self.font_paths = list(font_paths)
+        self.layouts = list(layouts or LAYOUTS)
+        self.height = height
+        self.perspective = perspective
+        self.blur = blur
+        self.noise = noise
+        self._truetype = {}
+
+    def random_text(self) -> Tuple[str, str]:
+        """(plate text, jurisdiction) for a random format."""
+        region, fmt = self.rng.choice(self.formats)
+        letters, digits = string.ascii_uppercase, string.digits
+        chars = [self.rng.choice(letters if c == 'L' else digits if c == 'D' else letters + digits) for c in fmt]
+        return ''.join(chars), region
+
+    def _draw_hershey(self, canvas: np.ndarray, text: str, font: str, color, box: Tuple[int, int, int, int]):
+        x, y, w, h = box
+        face = HERSHEY_FONTS[font]
+        thickness = max(1, h // 12)
+        (tw, th), baseline = cv2.getTextSize(text, face, 1.0, thickness)
+        scale = min(w / tw, h / (th + baseline))
+        (tw, th), baseline = cv2.getTextSize(text, face, scale, thickness)
+        origin = (x + (w - tw) // 2, y + (h + th) // 2)
+        cv2.putText(canvas, text, origin, face, scale, color, thickness, cv2.LINE_AA)
+
+    def _draw_truetype(self, canvas: np.ndarray, text: str, path: str, color, box: Tuple[int, int, int, int]):
+        from PIL import Image, ImageDraw, ImageFont
+        x, y, w, h = box
+        font = self._truetype.get((path, h))
+        if font is None:
+            font = self._truetype[(path, h)] = ImageFont.truetype(path, h)
+        image = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(image)
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        scale = min(1.0, w / max(1, right - left))
+        if scale < 1.0:
+            font = ImageFont.truetype(path, max(8, int(h * scale)))
+            left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        draw.text((x + (w - (right - left)) // 2 - left, y + (h - (bottom - top)) // 2 - top), text, font=font, fill=color)
+        canvas[:] = np.asarray(image)
+
+    def _draw_text(self, canvas, text, font, color, box):
+        if font in HERSHEY_FONTS:
+            self._draw_hershey(canvas, text, font, color, box)
+        else:
+            self._draw_truetype(canvas, text, font, color, box)
+
+    def render(self, text: str, layout: str = 'plain', font: str = 'simplex', header: Optional[str] = None) -> np.ndarray:
+        """Clean, front-on plate image (RGB) at a fixed 120 px height."""
+        background, color, default_header = LAYOUTS[layout]
+        height, width = 120, 240
+        canvas = np.empty((height, width, 3), np.uint8)
+        canvas[:] = background
+        cv2.rectangle(canvas, (3, 3), (width - 4, height - 4), color, 2)
+        header = header if header is not None else default_header
+        if layout == 'stacked' and len(text) > 4:
+            split = len(text) // 2
+            self._draw_text(canvas, text[:split], font, color, (14, 10, width - 28, 46))
+            self._draw_text(canvas, text[split:], font, color, (14, 62, width - 28, 46))
+        elif header:
+            self._draw_text(canvas, header, font, color, (40, 8, width - 80, 18))
+            self._draw_text(canvas, text, font, color, (14, 34, width - 28, 70))
+        else:
+            self._draw_text(canvas, text, font, color, (14, 22, width - 28, 76))
+        return canvas
+
+    def degrade(self, image: np.ndarray, height: int, perspective: float, blur: float, noise: float) -> np.ndarray:
+        """Perspective warp, rescale to height, blur and add noise."""
+        h, w = image.shape[:2]
+        margin = int(round(h * 0.15))
+        padded = cv2.copyMakeBorder(image, margin, margin, margin, margin, cv2.BORDER_REPLICATE)
+        if perspective > 0:
+            ph, pw = padded.shape[:2]
+            src = np.float32([[margin, margin], [margin + w, margin], [margin + w, margin + h], [margin, margin + h]])
+            jitter = self.np_rng.uniform(-perspective, perspective, (4, 2)) * np.float32([w, h])
+            matrix = cv2.getPerspectiveTransform(src, (src + jitter).astype(np.float32))
+            padded = cv2.warpPerspective(padded, matrix, (pw, ph), borderMode=cv2.BORDER_REPLICATE)
+        ph, pw = padded.shape[:2]
+        interpolation = cv2.INTER_AREA if height < ph else cv2.INTER_CUBIC
+        out = cv2.resize(padded, (max(1, round(pw * height / ph)), height), interpolation=interpolation)
+        if blur > 0:
+            out = cv2.GaussianBlur(out, (0, 0), blur)
+        if noise > 0:
+            out = np.clip(out + self.np_rng.normal(0, noise, out.shape), 0, 255).astype(np.uint8)
+        return out
+
+    def generate(self) -> SyntheticPlate:
+        text, region = self.random_text()
+        layout = self.rng.choice(self.layouts)
+        font = self.rng.choice(self.fonts + self.font_paths)
+        params = {
+            'height': self.rng.randint(*self.height),
+            'perspective': self.rng.uniform(*self.perspective),
+            'blur': self.rng.uniform(*self.blur),
+            'noise': self.rng.uniform(*self.noise),
+        }
+        header = region if layout == 'header' else None
+        image = self.degrade(self.render(text, layout, font, header), **params)
+        return SyntheticPlate(image, text, region, layout, font, params)
+
+    def batch(self, count: int) -> List[SyntheticPlate]:
+        return [self.generate() for _ in range(count)]
+
+    def __iter__(self) -> Iterator[SyntheticPlate]:
+        while True:
+            yield self.generate()
@@ -0,0 +1,191 @@
+"""Central CPU thread budget for the ML runtimes loaded in one process.
+
+TensorFlow, PyTorch, Paddle, ONNX Runtime, OpenCV and the OpenMP/BLAS
+libraries each default to one worker per core. ``ThreadBudget`` splits a
+single configured total between them. ``apply_environment`` must run before
+numpy or any framework is imported, because most pools read their size from
+the environment when they are first loaded.
+"""
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+FRAMEWORKS = ('torch', 'tensorflow', 'paddle', 'onnxruntime', 'opencv', 'openmp')
+
+# Which runtime each OCR engine spends its time in
+ENGINE_FRAMEWORKS = {
+    'easyocr': 'torch',
+    'doctr': 'torch',
+    'keras-ocr': 'tensorflow',
+    'paddleocr': 'paddle',
+    'tesseract': 'openmp',
+    'glyph': 'opencv',
+}
+
+OPENMP_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS')
+
+
+class ThreadBudget:
+    def __init__(self, total: Optional[int] = None, shares: Optional[Dict[str, float]] = None, inter_op: int = 1,
+                 affinity: Optional[Dict[str, Iterable[int]]] = None):
+        """
+        total: threads for the whole process (default: all logical cores).
+        shares: fraction of ``total`` per framework. Without shares every framework may use the
+            whole budget, which is safe while engines run one after another because idle pools
+            are told not to spin.
+        affinity: optional core sets per engine name. A worker process running one engine is
+            pinned for its whole life (``pin_process``); in-process, ``pinned`` only pins the
+            calling thread, so it is best-effort.
+        """
+        self.total = max(1, int(total or os.cpu_count() or 1))
+        self.shares = dict(shares or {})
+        self.inter_op = max(1, int(inter_op))
+        self.affinity = {name: sorted(set(cores)) for name, cores in (affinity or {}).items()}
+        self.configured: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ThreadBudget':
+        return cls(
+            total=getattr(config, 'THREAD_BUDGET_TOTAL', None),
+            shares=getattr(config, 'THREAD_BUDGET_SHARES', None),
+            inter_op=getattr(config, 'THREAD_BUDGET_INTER_OP', 1),
+            affinity=getattr(config, 'ENGINE_CORE_AFFINITY', None),
+        )
+
+    def threads_for(self, framework: str) -> int:
+        """Intra-op thread count allotted to a framework."""
+        share = self.shares.get(framework)
+        if share is None:
+            return self.total
+        return max(1, int(self.total * share))
+
+    def threads_for_engine(self, engine: str) -> int:
+        return self.threads_for(ENGINE_FRAMEWORKS.get(engine, 'openmp'))
+
+    def apply_environment(self):
+        """Export thread-count variables. Call before importing numpy or any ML framework."""
+        omp = str(self.threads_for('openmp'))
+        for var in OPENMP_ENV_VARS:
+            os.environ[var] = omp
+        # Idle OpenMP workers sleep instead of busy-waiting while another engine runs
+        os.environ['OMP_WAIT_POLICY'] = 'PASSIVE'
+        os.environ['KMP_BLOCKTIME'] = '0'
+        # pytesseract runs tesseract as a subprocess which would otherwise use its own OpenMP pool
+        os.environ['OMP_THREAD_LIMIT'] = omp
+        os.environ['TF_NUM_INTRAOP_THREADS'] = str(self.threads_for('tensorflow'))
+        os.environ['TF_NUM_INTEROP_THREADS'] = str(self.inter_op)
+        os.environ['CPU_NUM'] = str(self.threads_for('paddle'))
+        self.configured['openmp'] = omp
+        loaded = [name for name in ('numpy', 'torch', 'tensorflow', 'paddle') if name in sys.modules]
+        if loaded:
+            print(f"Thread budget applied after {', '.join(loaded)} was imported; their pools may ignore it")
+
+    def configure_framework(self, framework: str):
+        """Set runtime thread counts on a framework right before its first engine loads."""
+        with self._lock:
+            if framework in self.configured:
+                return
+            n = self.threads_for(framework)
+            try:
+                if framework == 'torch':
+                    import torch
+                    torch.set_num_threads(n)
+                    try:
+                        torch.set_num_interop_threads(self.inter_op)
+                    except RuntimeError:
+                        # Only settable before the first parallel op
+                        pass
+                elif framework == 'tensorflow':
+                    import tensorflow as tf
+                    try:
+                        tf.config.threading.set_intra_op_parallelism_threads(n)
+                        tf.config.threading.set_inter_op_parallelism_threads(self.inter_op)
+                    except RuntimeError:
+                        pass
+                elif framework == 'opencv':
+                    import cv2
+                    cv2.setNumThreads(n)
+            except ImportError:
+                return
+            self.configured[framework] = str(n)
+
+    def effective_settings(self) -> Dict[str, str]:
+        """Read back the thread counts each runtime is actually using."""
+        settings = {'total': str(self.total)}
+        settings['openmp'] = os.environ.get('OMP_NUM_THREADS', 'default')
+        if 'torch' in sys.modules:
+            torch = sys.modules['torch']
+            settings['torch'] = f"intra={torch.get_num_threads()} inter={torch.get_num_interop_threads()}"
+        if 'tensorflow' in sys.modules:
+            tf = sys.modules['tensorflow']
+            settings['tensorflow'] = (f"intra={tf.config.threading.get_intra_op_parallelism_threads()} "
+                                      f"inter={tf.config.threading.get_inter_op_parallelism_threads()}")
+        if 'cv2' in sys.modules:
+            settings['opencv'] = str(sys.modules['cv2'].getNumThreads())
+        for framework in ('paddle', 'onnxruntime'):
+            if framework in self.configured:
+                settings[framework] = self.configured[framework]
+        if self.affinity:
+            supported = hasattr(os, 'sched_setaffinity')
+            settings['affinity'] = ', '.join(f"{name}->{cores}" for name, cores in self.affinity.items())
+            if not supported:
+                settings['affinity'] += ' (not supported on this platform)'
+        return settings
+
+    def report(self) -> List[str]:
+        return [f"Thread budget {key}: {value}" for key, value in self.effective_settings().items()]
+
+    def mark_configured(self, framework: str, value):
+        """Record a thread count applied outside this class (e.g. an engine constructor argument)."""
+        self.configured[framework] = str(value)
+
+    def pin_process(self, engine: str) -> bool:
+        """Pin this process to the engine's core set; returns False if there is none or it cannot be applied.
+
+        Call before the engine's framework is imported: threads inherit the affinity of the
+        thread that starts them, so pools created afterwards stay on those cores. Threads that
+        already exist (e.g. numpy's BLAS pool) are pinned one by one where /proc lists them.
+        """
+        cores = self.affinity.get(engine)
+        if not cores or not hasattr(os, 'sched_setaffinity'):
+            return False
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            return False
+        try:
+            threads = [int(tid) for tid in os.listdir('/proc/self/task')]
+        except OSError:
+            threads = []
+        for tid in threads:
+            try:
+                os.sched_setaffinity(tid, cores)
+            except OSError:
+                pass
+        return True
+
+    @contextmanager
+    def pinned(self, engine: str):
+        """Pin the calling thread to the engine's core set for the duration of the block.
+
+        Best-effort: intra-op pools the framework started earlier keep their own affinity,
+        so only work done on the calling thread itself is confined to the cores.
+        """
+        cores = self.affinity.get(engine)
+        if not cores or not hasattr(os, 'sched_setaffinity'):
+            yield
+            return
+        # On Linux pid 0 targets only the calling thread
+        previous = os.sched_getaffinity(0)
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            yield
+            return
+        try:
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
@@ -1,6 +1,10 @@
 import re
-from models import OCRResult
-from typing import List, Tuple
+from models import OCRResult, RecognitionResult
+from typing import List, Optional, Tuple
+from utils.plate_grammar import PlateGrammar
+
+# Confidence is scaled by (1 - penalty * cost) for each grammar-corrected reading
+CORRECTION_PENALTY = 0.1
 
 def clean_license_plate(text: str) -> str:
     """Clean and validate license plate text"""
@@ -9,16 +13,31 @@ def clean_license_plate(text: str) -> str:
         return cleaned
     return ''
 
-def get_consensus_result(results: List[OCRResult], total_engines: int, agreement_threshold: float, confidence_threshold: float) -> Tuple[str, float, bool]:
-    """Get consensus from multiple OCR results"""
+def get_consensus_result(results: List[OCRResult], total_engines: int, agreement_threshold: float, confidence_threshold: float,
+                         grammar: Optional[PlateGrammar] = None) -> Tuple[str, float, bool]:
+    """Get consensus from multiple OCR results.
+
+    With a grammar, a reading that matches no plate format is corrected to its cheapest
+    valid format so confusable misreads (O/0, I/1, B/8, ...) vote together, at a small
+    confidence cost. A consensus that rests on any corrected reading is always alerted,
+    since the corrected text was never actually read.
+    """
     valid_results = [r for r in results if r.text and r.confidence > 0.1]
     if not valid_results:
         return '', 0, True
     cleaned_results = []
+    corrected = set()
     for result in valid_results:
         cleaned = clean_license_plate(result.text)
         if cleaned:
-            cleaned_results.append(OCRResult(cleaned, result.confidence, result.source))
+            confidence = result.confidence
+            match = grammar.correct(cleaned) if grammar is not None and not grammar.matches(cleaned) else None
+            if match is not None:
+                cleaned = match.text
+                confidence *= max(0.0, 1 - CORRECTION_PENALTY * match.cost)
+            cleaned_results.append(OCRResult(cleaned, confidence, result.source))
+            if match is not None:
+                corrected.add(id(cleaned_results[-1]))
     if not cleaned_results:
         return '', 0, True
     text_groups = {}
@@ -30,10 +49,27 @@ def get_consensus_result(results: List[OCRResult], total_engines: int, agreement
         agreement_ratio = len(group) / total_engines
         avg_confidence = sum(r.confidence for r in group) / len(group)
         if agreement_ratio >= agreement_threshold and avg_confidence >= confidence_threshold:
-            return text, avg_confidence, False
+            return text, avg_confidence, any(id(r) in corrected for r in group)
     if text_groups:
-        best_group = max(text_groups.values(), key=len)
+        if grammar is not None:
+            # Break ties between equally sized groups in favour of a valid plate format
+            best_group = max(text_groups.values(), key=lambda g: (len(g), bool(grammar.matches(g[0].text))))
+        else:
+            best_group = max(text_groups.values(), key=len)
         best_text = best_group[0].text
         best_confidence = sum(r.confidence for r in best_group) / len(best_group)
         return best_text, best_confidence, True
     return '', 0, True
+
+def combine_results(results: List[RecognitionResult], agreement_threshold: float, confidence_threshold: float,
+                    grammar: Optional[PlateGrammar] = None) -> RecognitionResult:
+    """Consensus over several readings of the same region, e.g. a burst of frames.
+
+    Every engine reading from every frame votes, so agreement is the share of all
+    readings that back a text.
+    """
+    readings = [r for result in results for r in result.engine_results]
+    text, confidence, alert = get_consensus_result(readings, max(1, len(readings)), agreement_threshold,
+                                                   confidence_threshold, grammar)
+    first = results[0]
+    return RecognitionResult(text, confidence, alert, first.region, readings, first.resolution, results[-1].track)
@@ -0,0 +1,287 @@
+"""Hotlist/watchlist matching for millions of plates with exact and fuzzy (edit distance) lookup.
+
+Plates are held in flat numpy arrays rather than Python objects:
+
+* a sorted fixed-width byte array for exact lookup (binary search), fronted by a
+  Bloom filter so the common "not on the list" answer costs a few bit tests;
+* a deletion-neighbourhood index: a sorted array of 32-bit hashes of every plate and
+  every plate with up to ``depth`` characters deleted, with the owning plate's row.
+  Two plates within edit distance d always share an entry of depth d, so a fuzzy
+  query is one vectorized ``searchsorted`` over the query's own deletions plus an
+  exact Levenshtein check of the few candidates.
+
+The index is built to the watchlist's max_distance (at most MAX_DISTANCE). Depth 1
+holds 1 + L entries for a plate of length L; depth 2 adds L(L-1)/2 more, about
+3.5 times the memory for seven-character plates, so only lists that need distance
+2 pay for it.
+
+Reloading builds a new index off-thread and swaps it in with one reference
+assignment, so lookups never wait on a reload.
+"""
+import csv
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+MAX_PLATE_LENGTH = 10
+MAX_DISTANCE = 2
+BLOOM_BITS_PER_PLATE = 10
+BLOOM_HASHES = 7
+
+_FNV_OFFSET = np.uint32(2166136261)
+_FNV_PRIME = np.uint32(16777619)
+
+
+def _normalize(text: str) -> str:
+    return ''.join(ch for ch in text.upper() if ch.isalnum())
+
+
+def _hash_rows(rows: np.ndarray, seed: int = 0) -> np.ndarray:
+    """FNV-1a over each row, vectorized across rows."""
+    h = np.full(rows.shape[0], _FNV_OFFSET ^ np.uint32(seed), dtype=np.uint32)
+    for column in range(rows.shape[1]):
+        h ^= rows[:, column]
+        h *= _FNV_PRIME
+    return h
+
+
+def _hash_bytes(data: bytes, seed: int = 0) -> int:
+    """Scalar _hash_rows for a single plate; cheaper than numpy for one row."""
+    h = 2166136261 ^ seed
+    for byte in data.ljust(MAX_PLATE_LENGTH, b'\0'):
+        h = ((h ^ byte) * 16777619) & 0xFFFFFFFF
+    return h
+
+
+def _delete_column(rows: np.ndarray, column: int) -> np.ndarray:
+    padding = np.zeros((rows.shape[0], 1), dtype=np.uint8)
+    return np.concatenate([rows[:, :column], rows[:, column + 1:], padding], axis=1)
+
+
+def _deletions(text: str) -> set:
+    return {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance between a and b, or max_distance + 1 once it is known to exceed it."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+@dataclass
+class WatchlistHit:
+    plate: str
+    listed: str
+    distance: int
+    note: str = ''
+
+
+class _WatchlistIndex:
+    """Immutable index over one version of the list, answering fuzzy queries up to depth edits."""
+    def __init__(self, plates: List[str], notes: Optional[List[str]] = None, depth: int = 1):
+        self.depth = max(0, min(int(depth), MAX_DISTANCE))
+        encoded = np.array([p.encode('ascii', 'ignore') for p in plates], dtype=f'S{MAX_PLATE_LENGTH}')
+        order = np.argsort(encoded, kind='stable')
+        self.plates = encoded[order]
+        self.notes = np.array(notes, dtype=object)[order] if notes and any(notes) else None
+        rows = self.plates.view(np.uint8).reshape(len(plates), MAX_PLATE_LENGTH)
+        self._build_bloom(rows)
+        self._build_deletions(rows)
+
+    def __len__(self):
+        return len(self.plates)
+
+    def _build_bloom(self, rows: np.ndarray):
+        self.bloom_bits = max(64, len(rows) * BLOOM_BITS_PER_PLATE)
+        bits = np.zeros(self.bloom_bits, dtype=bool)
+        for positions in self._bloom_positions(rows):
+            bits[positions] = True
+        self.bloom = np.packbits(bits)
+
+    def _bloom_positions(self, rows: np.ndarray):
+        # Double hashing: position_i = h1 + i * h2
+        h1 = _hash_rows(rows, seed=0).astype(np.uint64)
+        h2 = _hash_rows(rows, seed=0x9E3779B9).astype(np.uint64) | np.uint64(1)
+        for i in range(BLOOM_HASHES):
+            yield ((h1 + np.uint64(i) * h2) % np.uint64(self.bloom_bits)).astype(np.int64)
+
+    def _build_deletions(self, rows: np.ndarray):
+        lengths = (rows != 0).sum(axis=1)
+        ids = np.arange(len(rows), dtype=np.uint32)
+        keys = [_hash_rows(rows)]
+        owners = [ids]
+        for column in range(MAX_PLATE_LENGTH if self.depth >= 1 else 0):
+            mask = lengths > column
+            if not mask.any():
+                break
+            deleted = _delete_column(rows[mask], column)
+            keys.append(_hash_rows(deleted))
+            owners.append(ids[mask])
+            if self.depth >= 2:
+                # Second deletion at an earlier column, so each pair of positions is generated once
+                for first in range(column):
+                    keys.append(_hash_rows(_delete_column(deleted, first)))
+                    owners.append(ids[mask])
+        keys = np.concatenate(keys)
+        owners = np.concatenate(owners)
+        order = np.argsort(keys, kind='stable')
+        self.deletion_keys = keys[order]
+        self.deletion_owners = owners[order]
+
+    def might_contain(self, plate: str) -> bool:
+        data = plate.encode('ascii', 'ignore')
+        h1 = _hash_bytes(data, 0)
+        h2 = _hash_bytes(data, 0x9E3779B9) | 1
+        for i in range(BLOOM_HASHES):
+            position = (h1 + i * h2) % self.bloom_bits
+            if not self.bloom[position >> 3] & (0x80 >> (position & 7)):
+                return False
+        return True
+
+    def find(self, plate: str) -> int:
+        """Row of plate in the sorted array, or -1."""
+        if not self.might_contain(plate):
+            return -1
+        key = plate.encode('ascii', 'ignore')
+        i = int(np.searchsorted(self.plates, key))
+        return i if i < len(self.plates) and self.plates[i] == key else -1
+
+    def note(self, row: int) -> str:
+        return self.notes[row] if self.notes is not None else ''
+
+    def candidates(self, plate: str, max_distance: int) -> np.ndarray:
+        """Rows of every listed plate that may be within max_distance (capped at depth) edits of plate."""
+        probes = {plate}
+        for _ in range(min(max_distance, self.depth)):
+            for probe in list(probes):
+                probes |= _deletions(probe)
+        probes = [p.encode('ascii') for p in probes if p]
+        hashes = np.array([_hash_bytes(p) for p in probes], dtype=np.uint32)
+        lo = np.searchsorted(self.deletion_keys, hashes, side='left')
+        hi = np.searchsorted(self.deletion_keys, hashes, side='right')
+        found = [self.deletion_owners[a:b] for a, b in zip(lo, hi) if b > a]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.uint32)
+
+
+def load_plate_file(path: str) -> Tuple[List[str], List[str]]:
+    """Read plates from a text file (one per line) or CSV (plate in the first column, optional note in the second)."""
+    plates, notes = [], []
+    with open(path, newline='', encoding='utf-8', errors='ignore') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            plate = _normalize(row[0])
+            if not plate or len(plate) > MAX_PLATE_LENGTH or not plate.isascii():
+                continue
+            plates.append(plate)
+            notes.append(row[1].strip() if len(row) > 1 else '')
+    # A header row such as "plate,reason" normalizes to a plausible plate; drop it if it says so
+    if plates and plates[0] in ('PLATE', 'PLATES', 'LICENSEPLATE'):
+        plates, notes = plates[1:], notes[1:]
+    return plates, notes
+
+
+class Watchlist:
+    def __init__(self, path: Optional[str] = None, max_distance: int = 1,
+                 log: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.max_distance = max(0, min(int(max_distance), MAX_DISTANCE))
+        self.log = log
+        self._index = _WatchlistIndex([], depth=self.max_distance)
+        self._mtime = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        if path:
+            self.reload()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _log(self, message: str):
+        if self.log:
+            self.log(message)
+
+    def load_plates(self, plates: Iterable[str], notes: Optional[List[str]] = None):
+        """Replace the list from memory (plates are normalized; notes align with plates)."""
+        plates = [_normalize(p) for p in plates]
+        self._index = _WatchlistIndex(plates, notes, self.max_distance)
+
+    def reload(self) -> bool:
+        """Rebuild from the file if it changed; the old index keeps serving until the swap."""
+        if not self.path:
+            return False
+        with self._reload_lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError as e:
+                self._log(f"Watchlist not readable: {e}")
+                return False
+            if mtime == self._mtime:
+                return False
+            plates, notes = load_plate_file(self.path)
+            self._index = _WatchlistIndex(plates, notes, self.max_distance)
+            self._mtime = mtime
+        self._log(f"Watchlist loaded: {len(plates)} plates from {self.path}")
+        return True
+
+    def start_auto_reload(self, interval: float = 30.0):
+        """Poll the file's mtime in a background thread and reload when it changes."""
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    self._log(f"Watchlist reload failed: {e}")
+        threading.Thread(target=loop, name='watchlist-reload', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def match(self, plate: str, max_distance: Optional[int] = None) -> List[WatchlistHit]:
+        """Listed plates within max_distance edits of plate, closest first.
+
+        max_distance beyond the watchlist's own (the depth its index was built to) is cut to it.
+        """
+        index = self._index
+        plate = _normalize(plate)
+        if not plate or not len(index) or len(plate) > MAX_PLATE_LENGTH or not plate.isascii():
+            return []
+        max_distance = index.depth if max_distance is None else min(max_distance, index.depth)
+        row = index.find(plate)
+        if row >= 0:
+            return [WatchlistHit(plate, plate, 0, index.note(row))]
+        if max_distance <= 0:
+            return []
+        hits = []
+        for row in index.candidates(plate, max_distance):
+            listed = index.plates[row].decode('ascii')
+            distance = levenshtein(plate, listed, max_distance)
+            if distance <= max_distance:
+                hits.append(WatchlistHit(plate, listed, distance, index.note(int(row))))
+        hits.sort(key=lambda h: (h.distance, h.listed))
+        return hits
+
+
+def open_watchlist(config, log: Optional[Callable[[str], None]] = None) -> Optional[Watchlist]:
+    """Create the watchlist configured by WATCHLIST_PATH, loading and auto-reloading it in the background."""
+    path = getattr(config, 'WATCHLIST_PATH', None)
+    if not path:
+        return None
+    watchlist = Watchlist(None, getattr(config, 'WATCHLIST_MAX_DISTANCE', 1), log)
+    watchlist.path = os.path.expanduser(path)
+    # The initial load of a multi-million plate list takes seconds; don't hold up startup
+    threading.Thread(target=watchlist.reload, name='watchlist-load', daemon=True).start()
+    watchlist.start_auto_reload(getattr(config, 'WATCHLIST_RELOAD_SECONDS', 30.0))
+    return watchlist